@@ -6,6 +6,7 @@ from pathlib import Path
 from PySide6.QtWidgets import QApplication
 
 from ingestor.main_window import MainWindow
+from ingestor.services.ledger_partitions import compact_ledger
 from ingestor.theme import apply_dark_theme
 
 
@@ -16,11 +17,20 @@ def main() -> int:
     # UI-only registry file for the Existing Project dropdown.
     # For now it lives next to app.pyw (ingest PC local only).
     projects_registry_path = Path(__file__).resolve().parent / "projects_index.json"
-    ledger_path = Path(__file__).resolve().parent / "ingest_ledger.csv"
+    # SQLite ledger; an old ingest_ledger.csv next to it is imported on first open.
+    ledger_path = Path(__file__).resolve().parent / "ingest_ledger.db"
     settings_path = Path(__file__).resolve().parent / "settings.json"
 
     print("LEDGER PATH:", ledger_path.resolve())
 
+    # Once a year, old sessions move to ingest_ledger_<year>.db (still searchable)
+    try:
+        compacted = compact_ledger(ledger_path)
+        if compacted["moved"]:
+            print("LEDGER COMPACTED:", compacted["moved"])
+    except Exception as e:
+        print("ledger compaction failed:", e)
+
     # w = MainWindow(projects_registry_path=projects_registry_path, ledger_path=ledger_path)
     w = MainWindow(
         projects_registry_path=projects_registry_path,
@@ -0,0 +1,314 @@
+"""
+Headless entry point: runs ingest jobs without Qt (nothing here imports PySide6),
+for scripting, automated performance runs and render nodes.
+
+    python -m ingestor run job.json [--card G:\\ ...] [--json]
+    python -m ingestor watch job.json [--cards N]
+    python -m ingestor queue [--all] [--cancel ID]
+
+job.json holds the JobConfig fields (client_name, project_name, archive_path,
+proxy_path, keep_originals_on_proxy) - or the IngestArgs names (archive_root,
+ssd_root, client_project...) - plus optionally:
+
+    "cards": ["G:\\", "H:\\"]      cards for `run` (or --card)
+    "ingest_date": "2026-01-15"    default today
+    "base_folder_name": "Cactus"   default the registry's base folder
+    "first_sd_index": 1
+    "priority": 0                  lower runs first
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import queue
+import sys
+from dataclasses import fields
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .models import JobConfig
+from .services.card_fingerprint import describe_previous, find_previous_ingests, fingerprint_card
+from .services.footage_catalog import CATALOG_NAME
+from .services.ingest_queue import ACTIVE_STATES, DONE, IngestArgs, IngestJob, IngestQueue
+from .services.project_registry import DEFAULT_BASE_FOLDER
+from .services.settings_store import load_settings
+from .services.volume_profile import PROFILES_NAME
+
+
+# The headless runner keeps its own queue file. It can run next to the GUI on one
+# station: drives are locked per job across processes (see IngestQueue)
+HEADLESS_QUEUE_NAME = "ingest_queue_headless.json"
+DEFAULT_STATION = Path(__file__).resolve().parent.parent   # next to app.pyw, like the GUI
+
+
+def station_paths(station: Path) -> dict:
+    # Same station-local files the GUI uses
+    return {
+        "settings": station / "settings.json",
+        "ledger": station / "ingest_ledger.db",
+        "queue": station / HEADLESS_QUEUE_NAME,
+        "catalog": station / CATALOG_NAME,
+        "profiles": station / PROFILES_NAME,
+        "manifest": station / "ingest_manifest.db",
+        "probe_cache": station / "media_probe_cache.json",
+    }
+
+
+def load_job_spec(path: Path) -> Tuple[JobConfig, dict]:
+    """
+    (JobConfig, the whole spec). Raises ValueError when destinations are missing.
+    """
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(spec, dict):
+        raise ValueError("job spec must be a JSON object")
+    known = {f.name for f in fields(JobConfig)}
+    job = JobConfig(**{k: v for k, v in spec.items() if k in known})
+    # IngestArgs names work too
+    job.archive_path = job.archive_path or spec.get("archive_root", "")
+    job.proxy_path = job.proxy_path or spec.get("ssd_root", "")
+    if not job.archive_path or not job.proxy_path:
+        raise ValueError("job spec needs archive_path and proxy_path (or archive_root / ssd_root)")
+    return job, spec
+
+
+def card_args(job: JobConfig, spec: dict, paths: dict, sd_root: str, sd_index: int, fingerprint: str = "") -> IngestArgs:
+    return IngestArgs(
+        sd_root=sd_root,
+        archive_root=job.archive_path,
+        ssd_root=job.proxy_path,
+        base_folder_name=spec.get("base_folder_name") or DEFAULT_BASE_FOLDER,
+        client_project=spec.get("client_project") or job.safe_project_folder(),
+        ingest_date=spec.get("ingest_date") or date.today().isoformat(),
+        sd_index=sd_index,
+        keep_originals_on_proxy=job.keep_originals_on_proxy,
+        proxy_cache_max_bytes=int(load_settings(paths["settings"]).proxy_cache_gb * 1024**3),
+        probe_cache_path=str(paths["probe_cache"]),
+        manifest_path=str(paths["manifest"]),
+        catalog_path=str(paths["catalog"]),
+        profiles_path=str(paths["profiles"]),
+        card_fingerprint=fingerprint,
+    )
+
+
+def _fmt_bytes(n: int) -> str:
+    return f"{n / 1024**3:.1f} GB"
+
+
+def describe_job(job: IngestJob) -> str:
+    # One line per finished card, like the ingest screen's log
+    name = f"SD{job.args.sd_index} ({job.args.sd_root})"
+    result = job.result or {}
+    if job.state != DONE:
+        return f"{name} {job.state}: {job.error}" if job.error else f"{name} {job.state}"
+    text = f"{name} OK"
+    m = result.get("metrics") or {}
+    if m.get("files"):
+        text += f": {m['files']} files, {_fmt_bytes(m.get('bytes', 0))}"
+    if result.get("copy_seconds"):
+        text += f" in {result['copy_seconds'] / 60:.1f} min"
+    if m.get("archive_mb_s"):
+        speeds = f"Archive {m['archive_mb_s']:.0f} MB/s"
+        if m.get("ssd_mb_s"):
+            speeds += f", SSD {m['ssd_mb_s']:.0f} MB/s"
+        text += f" ({speeds})"
+    proxy = result.get("proxy") or {}
+    if proxy.get("message"):
+        text += f"; {proxy['message']}"
+    return text
+
+
+def write_session(ledger_path: Path, job: JobConfig, started_at: datetime, jobs: List[IngestJob]) -> None:
+    """
+    One ledger session for the cards run, like the GUI writes at the end of a session.
+    """
+    from .services.ledger import append_session_row
+
+    results = [j.result or {} for j in jobs]
+    append_session_row(
+        ledger_path,
+        started_at=started_at,
+        finished_at=datetime.now(),
+        status="OK" if all(j.state == DONE for j in jobs) else "FAILED",
+        job=job,
+        total_bytes=sum(int(r.get("bytes_copied") or 0) for r in results),
+        copy_seconds=sum(float(r.get("copy_seconds") or 0) for r in results),
+        cards=[r["metrics"] for r in results if r.get("metrics")],
+    )
+
+
+def _check_card(root: str, serial: str, paths: dict) -> Tuple[str, str]:
+    # (fingerprint digest, where it was ingested before or "")
+    fp = fingerprint_card(root, serial)
+    found = find_previous_ingests(fp, ledger_path=paths["ledger"], catalog_path=paths["catalog"])
+    return fp.digest, describe_previous(found)
+
+
+# ---------- commands ----------
+def cmd_run(ns) -> int:
+    paths = station_paths(ns.station)
+    job, spec = load_job_spec(ns.spec)
+    cards = ns.card or spec.get("cards") or ([spec["sd_root"]] if spec.get("sd_root") else [])
+    if not cards:
+        print("no cards: give --card or \"cards\" in the job spec", file=sys.stderr)
+        return 2
+    job.num_cards = len(cards)
+
+    def on_change(j: IngestJob):
+        if not j.active and not ns.json:
+            print(describe_job(j), flush=True)
+
+    # With --json, stdout carries the JSON document only; anything else printed
+    # on the way (ours or a library's, from any thread) goes to stderr
+    quiet = contextlib.redirect_stdout(sys.stderr) if ns.json else contextlib.nullcontext()
+    with quiet:
+        q = IngestQueue(paths["queue"], max_parallel=ns.parallel)
+        q.subscribe(on_change)
+        q.start()
+
+        started_at = datetime.now()
+        first = int(spec.get("first_sd_index") or 1)
+        submitted = [
+            q.submit(
+                card_args(job, spec, paths, root, first + i),
+                priority=int(spec.get("priority") or 0),
+                tag="cli",
+            )
+            for i, root in enumerate(cards)
+        ]
+        try:
+            finished = [q.wait(j.id) for j in submitted]
+        finally:
+            q.stop(timeout=0)
+
+        if not ns.no_ledger:
+            write_session(paths["ledger"], job, started_at, finished)
+    if ns.json:
+        print(json.dumps([j.to_dict() for j in finished], indent=2))
+    return 0 if all(j.state == DONE for j in finished) else 1
+
+
+def cmd_watch(ns) -> int:
+    from .services.drive_service import get_drive_service
+
+    paths = station_paths(ns.station)
+    job, spec = load_job_spec(ns.spec)
+    q = IngestQueue(paths["queue"], max_parallel=ns.parallel)
+    if ns.resume:
+        print(f"resumed {q.resume_held()} held job(s)")
+
+    # Everything is handled on this thread: card checks read the card, and the
+    # service / queue threads shouldn't wait on that
+    inbox: "queue.Queue" = queue.Queue()
+
+    def on_change(j: IngestJob):
+        if not j.active:
+            inbox.put(("job", j))
+
+    q.subscribe(on_change)
+    q.start()
+    service = get_drive_service()
+    service.on_card_inserted(lambda d, kind: inbox.put(("card", (d, kind))))
+
+    print(f"Watching for cards ({job.client_name} - {job.project_name}). Ctrl+C to stop.", flush=True)
+    started_at = datetime.now()
+    sd_index = int(spec.get("first_sd_index") or 1)
+    mine: dict = {}
+    finished: List[IngestJob] = []
+    try:
+        while not (ns.cards and len(finished) >= ns.cards):
+            try:
+                what, item = inbox.get(timeout=0.5)   # wakes up for Ctrl+C on Windows too
+            except queue.Empty:
+                continue
+
+            if what == "job":
+                if item.id in mine:
+                    finished.append(item)
+                    print(describe_job(item), flush=True)
+                continue
+
+            d, kind = item
+            if d.root in (job.archive_path, job.proxy_path):
+                continue
+            if ns.cards and len(mine) >= ns.cards:
+                print(f"Card in {d.root} ignored: {ns.cards} card(s) already queued.", flush=True)
+                continue
+            digest, previous = _check_card(d.root, d.serial, paths)
+            if previous and not ns.allow_duplicates:
+                print(f"Card in {d.root} skipped: {previous}.", flush=True)
+                continue
+            submitted = q.submit(
+                card_args(job, spec, paths, d.root, sd_index, digest),
+                priority=int(spec.get("priority") or 0),
+                tag="watch",
+                source_serial=d.serial,
+            )
+            mine[submitted.id] = sd_index
+            print(f"SD{sd_index} queued: {d.display}" + (f" ({kind})" if kind else ""), flush=True)
+            sd_index += 1
+    except KeyboardInterrupt:
+        print("Stopping: no new cards are taken; copies in progress finish first.", flush=True)
+        for job_id in mine:
+            q.cancel(job_id)
+        q.wait_idle(tag="watch")
+        finished = [j for j in map(q.job, mine) if j is not None]
+    finally:
+        q.stop(timeout=0)
+
+    if finished and not ns.no_ledger:
+        write_session(paths["ledger"], job, started_at, finished)
+    return 0 if all(j.state == DONE for j in finished) else 1
+
+
+def cmd_queue(ns) -> int:
+    q = IngestQueue(ns.queue or station_paths(ns.station)["queue"])
+    if ns.cancel:
+        print("canceled" if q.cancel(ns.cancel) else f"{ns.cancel}: not queued or held")
+    for j in q.jobs():
+        line = f"{j.id}  {j.state:<8} p{j.priority:<3} SD{j.args.sd_index:<3} {j.args.sd_root:<12} {j.args.client_project}"
+        if j.state in ACTIVE_STATES or ns.all:
+            print(line + (f"  - {j.error}" if j.error else ""))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="ingestor", description="Headless card ingest (no GUI).")
+    p.add_argument("--station", type=Path, default=DEFAULT_STATION,
+                   help="folder with settings.json / the ledger (default: next to app.pyw)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="ingest the given cards and exit")
+    run.add_argument("spec", type=Path, help="job spec (JSON)")
+    run.add_argument("--card", action="append", help="card root; repeat for more cards (overrides \"cards\")")
+    run.add_argument("--parallel", type=int, default=2, help="cards copied at once (different drives only)")
+    run.add_argument("--json", action="store_true", help="print the jobs and engine results as JSON")
+    run.add_argument("--no-ledger", action="store_true", help="don't record a ledger session")
+    run.set_defaults(func=cmd_run)
+
+    watch = sub.add_parser("watch", help="queue every card inserted until stopped")
+    watch.add_argument("spec", type=Path, help="job spec (JSON)")
+    watch.add_argument("--cards", type=int, default=0, help="stop after this many cards (0: until Ctrl+C)")
+    watch.add_argument("--parallel", type=int, default=2, help="cards copied at once (different drives only)")
+    watch.add_argument("--allow-duplicates", action="store_true", help="also queue cards ingested before")
+    watch.add_argument("--resume", action="store_true", help="resume jobs held from an earlier run")
+    watch.add_argument("--no-ledger", action="store_true", help="don't record a ledger session")
+    watch.set_defaults(func=cmd_watch)
+
+    # Jobs listed as HELD are picked up again by `watch --resume`
+    qs = sub.add_parser("queue", help="list / cancel jobs in the headless queue (while no run / watch uses it)")
+    qs.add_argument("--queue", type=Path, help="queue file (default: the station's headless queue)")
+    qs.add_argument("--all", action="store_true", help="include finished jobs")
+    qs.add_argument("--cancel", metavar="ID", help="cancel a queued or held job")
+    qs.set_defaults(func=cmd_queue)
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ns = build_parser().parse_args(argv)
+    try:
+        return ns.func(ns)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
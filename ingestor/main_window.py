@@ -26,6 +26,7 @@ class MainWindow(QMainWindow):
             projects_registry_path=projects_registry_path,
             on_open_ledger=self.open_ledger,
             settings_path=self.settings_path,
+            ledger_path=ledger_path,
         )
 
         self.ledger_path = ledger_path
@@ -33,6 +34,7 @@ class MainWindow(QMainWindow):
             on_done=self.close,
             on_back_to_setup=self.back_to_setup,
             ledger_path=self.ledger_path,
+            settings_path=self.settings_path,
         )
 
         self._ledger_window = None
@@ -53,11 +55,12 @@ class MainWindow(QMainWindow):
         #     self.ledger_screen.refresh()
         # except Exception:
         #     print("can't refresh ledger")
-        # If it's already open, just bring it to front
-        # if self._ledger_window is not None:
-        #     self._ledger_window.raise_()
-        #     self._ledger_window.activateWindow()
-        #     return
+        # Keep one ledger window around: reopening it only tails new sessions
+        if self._ledger_window is not None:
+            self._ledger_window.show()
+            self._ledger_window.raise_()
+            self._ledger_window.activateWindow()
+            return
 
         # w = LedgerScreen(ledger_path=self.ledger_path, parent=None)
         w = LedgerScreen(ledger_path=self.ledger_path)
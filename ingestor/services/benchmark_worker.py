@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from .drives import get_volume_info
+from .volume_profile import VolumeProfiles, benchmark_volume
+
+
+class BenchmarkWorker(QObject):
+    progress = Signal(str)
+    finished = Signal(dict)   # {root: VolumeProfile}
+
+    def __init__(self, profiles_path: Path, card_root: str, dest_roots: list[str]):
+        super().__init__()
+        self.profiles_path = Path(profiles_path)
+        self.card_root = card_root
+        self.dest_roots = dest_roots
+
+    @Slot()
+    def run(self):
+        profiles = VolumeProfiles(self.profiles_path)
+        done = {}
+        # The card is only ever read; destinations get scratch writes
+        jobs = ([(self.card_root, False)] if self.card_root else []) + [(r, True) for r in self.dest_roots if r]
+        for root, write in jobs:
+            label, serial = get_volume_info(root)
+            if not serial:
+                self.progress.emit(f"{root}: no volume serial, skipped.")
+                continue
+            self.progress.emit(f"Benchmarking {root} ({'read/write' if write else 'read only'})…")
+            try:
+                result = benchmark_volume(root, write=write)
+            except Exception as e:
+                self.progress.emit(f"{root}: benchmark failed - {e}")
+                continue
+            done[root] = profiles.record_benchmark(serial, label, result)
+        profiles.state.flush()
+        self.finished.emit(done)
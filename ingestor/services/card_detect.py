@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+# Folder layouts cameras write at the card root, most specific first: (path, what it is)
+CARD_LAYOUTS = [
+    ("PRIVATE/M4ROOT", "Sony XAVC"),
+    ("XDROOT", "Sony XDCAM"),
+    ("PRIVATE/AVCHD", "AVCHD"),
+    ("CONTENTS/CLIPS001", "Canon XF"),
+    ("CONTENTS/VIDEO", "Panasonic P2"),
+    ("AVCHD", "AVCHD"),
+    ("DCIM", "DCIM"),
+]
+
+
+def identify_card(root: str) -> str:
+    """
+    What wrote this card ("Sony XAVC", "DCIM"...), or "" if it doesn't look like a
+    camera card. A few stats at the root, nothing is read.
+    """
+    base = Path(root)
+    for rel, kind in CARD_LAYOUTS:
+        try:
+            if (base / rel).is_dir():
+                return kind
+        except OSError:
+            continue
+    return ""
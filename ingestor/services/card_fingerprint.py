@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .footage_catalog import find_card
+
+
+SAMPLE_CLIPS = 4
+SAMPLE_BYTES = 1024 * 1024      # first and last MB of each sampled clip
+MIN_CLIP_BYTES = 2 * SAMPLE_BYTES
+
+
+@dataclass(frozen=True)
+class CardFingerprint:
+    digest: str                 # hex; equal digests = same card contents
+    serial: str
+    files: int
+    total_bytes: int
+    entries: Tuple[Tuple[str, int], ...] = field(default=(), repr=False)  # (name, size) for the catalog check
+
+
+def _walk(root: Path) -> List[Tuple[str, str, int]]:
+    # (rel path, name, size) - metadata only
+    found = []
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            stack.append(Path(e.path))
+                        elif e.is_file(follow_symlinks=False):
+                            found.append((Path(e.path).relative_to(root).as_posix(), e.name, e.stat().st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return sorted(found)
+
+
+def _sample_hash(path: Path, size: int) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(SAMPLE_BYTES))
+        f.seek(max(0, size - SAMPLE_BYTES))
+        h.update(f.read(SAMPLE_BYTES))
+    return h.digest()
+
+
+def fingerprint_card(root: str, serial: str = "") -> CardFingerprint:
+    """
+    Identifies a card's contents in well under a second: volume serial, file count,
+    total bytes, and the first + last MB of a few clips spread over the card
+    (at most SAMPLE_CLIPS * 2 MB read). Reformatting or shooting more changes it.
+    """
+    base = Path(root)
+    files = _walk(base)
+    total = sum(size for _rel, _name, size in files)
+
+    clips = [(rel, size) for rel, _name, size in files if size >= MIN_CLIP_BYTES]
+    if len(clips) > SAMPLE_CLIPS:
+        step = (len(clips) - 1) / (SAMPLE_CLIPS - 1)
+        clips = [clips[round(i * step)] for i in range(SAMPLE_CLIPS)]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{serial}|{len(files)}|{total}".encode())
+    for rel, size in clips:
+        h.update(rel.encode("utf-8", "replace"))
+        try:
+            h.update(_sample_hash(base / rel, size))
+        except OSError:
+            h.update(b"?")
+
+    return CardFingerprint(
+        digest=h.hexdigest(),
+        serial=serial,
+        files=len(files),
+        total_bytes=total,
+        entries=tuple((name, size) for _rel, name, size in files),
+    )
+
+
+def find_previous_ingests(
+    fp: CardFingerprint,
+    *,
+    ledger_path: Optional[Path] = None,
+    catalog_path: Optional[Path] = None,
+) -> List[dict]:
+    """
+    Where this card already went: exact fingerprint matches in the ledger
+    (card_runs, all partitions) first, then archive folders in the footage catalog
+    holding most of its files (catches a card that was shot on after ingesting).
+
+        [{"source": "ledger"|"catalog", "project", "date", "sd_name", "where", "matched", "total"}]
+    """
+    found: List[dict] = []
+
+    if ledger_path is not None and Path(ledger_path).exists():
+        from .ledger_partitions import connect_all
+
+        conn = connect_all(ledger_path)
+        try:
+            rows = conn.execute(
+                "SELECT s.client, s.project, s.session_started_at, c.sd_name, s.archive_drive "
+                "FROM card_runs c JOIN sessions s ON s.id = c.session_id "
+                "WHERE c.fingerprint = ? AND c.status != 'FAILED' ORDER BY s.session_started_at DESC",
+                (fp.digest,),
+            ).fetchall()
+        finally:
+            conn.close()
+        for client, project, started, sd_name, archive in rows:
+            found.append({
+                "source": "ledger", "project": f"{client} - {project}", "date": started[:10],
+                "sd_name": sd_name, "where": archive, "matched": fp.files, "total": fp.files,
+            })
+
+    if catalog_path is not None and Path(catalog_path).exists() and fp.entries:
+        for hit in find_card(catalog_path, fp.entries):
+            parts = hit["folder"].split("/")
+            found.append({
+                "source": "catalog",
+                "project": hit["project"].replace("_-_", " - ").replace("_", " "),
+                "date": parts[3] if len(parts) > 4 else "",
+                "sd_name": parts[4] if len(parts) > 4 else "",
+                "where": f"{hit['label'] or hit['serial']} ({hit['folder']})",
+                "matched": hit["matched"],
+                "total": hit["total"],
+            })
+    return found
+
+
+def describe_previous(found: List[dict]) -> str:
+    """
+    One line for the operator, e.g.
+    'already ingested to Iriya - Yom HaAtsmaut on 2026-01-15 (SD2, MyBook 2)'.
+    """
+    if not found:
+        return ""
+    f = found[0]
+    text = f"already ingested to {f['project']}"
+    if f["date"]:
+        text += f" on {f['date']}"
+    details = [x for x in (f["sd_name"], f["where"]) if x]
+    if details:
+        text += f" ({', '.join(details)})"
+    if f["matched"] < f["total"]:
+        text += f" - {f['matched']} of {f['total']} files"
+    return text
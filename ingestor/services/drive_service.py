@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+from . import drives
+from .card_detect import identify_card
+from .drives import DriveInfo
+
+
+POLL_S = 2.0
+VOLUME_TTL_S = 60.0     # label / serial / removable: only change on re-format or re-mount
+SPACE_TTL_S = 5.0
+PROBE_TIMEOUT_S = 2.0   # longer than this and the drive is marked "not responding"
+CHANGE_WAIT_S = 5.0     # how long the mount watcher blocks per wait
+
+
+def _probe_volume(root: str) -> tuple[str, str, bool]:
+    label, serial = drives.get_volume_info(root)
+    return label, serial, drives.is_removable(root)
+
+
+class DriveService:
+    """
+    Keeps an up-to-date picture of the connected drives off the GUI thread.
+
+    A background thread lists the drive roots every POLL_S (cheap: no volume is
+    touched) and re-probes a volume's label/serial every VOLUME_TTL_S and its free
+    space every SPACE_TTL_S. Probes run in a small pool with PROBE_TIMEOUT_S: a
+    sleeping HDD or dead network share is reported as not responding (last known
+    values kept) and isn't probed again until its stuck call returns.
+
+    drives() / drive() / space() only read the cache and never block.
+    Subscribers are called from the service thread with the new list whenever
+    something changed (Qt code should go through ui.drive_watcher.DriveWatcher).
+
+    Mounts are also watched (drives.wait_for_change): a new volume is picked up
+    straight away, not at the next tick. A drive that shows up after the first
+    poll and is removable or laid out like a camera card is announced once to
+    the on_card_inserted subscribers, as (DriveInfo, card kind).
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_s: float = POLL_S,
+        volume_ttl_s: float = VOLUME_TTL_S,
+        space_ttl_s: float = SPACE_TTL_S,
+        probe_timeout_s: float = PROBE_TIMEOUT_S,
+    ):
+        self.poll_s = poll_s
+        self.volume_ttl_s = volume_ttl_s
+        self.space_ttl_s = space_ttl_s
+        self.probe_timeout_s = probe_timeout_s
+
+        self._lock = threading.Lock()
+        self._drives: Dict[str, DriveInfo] = {}
+        self._volume_at: Dict[str, float] = {}
+        self._space_at: Dict[str, float] = {}
+        self._pending: Dict[tuple, Future] = {}
+        self._subscribers: List[Callable[[List[DriveInfo]], None]] = []
+        self._card_subscribers: List[Callable[[DriveInfo, str], None]] = []
+        self._new_roots: set[str] = set()   # appeared after the first poll, not announced yet
+
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="drive-probe")
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watch_thread: Optional[threading.Thread] = None
+
+    # ---------- lifecycle ----------
+    def start(self) -> "DriveService":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="drive-service", daemon=True)
+            self._thread.start()
+            self._watch_thread = threading.Thread(target=self._watch_mounts, name="drive-watch", daemon=True)
+            self._watch_thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout_s + 1)
+            self._thread = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until the first poll is done (at most timeout seconds).
+        """
+        return self._ready.wait(timeout)
+
+    def refresh(self, *, force: bool = False) -> None:
+        """
+        Poll now instead of at the next tick; force=True also expires the caches.
+        """
+        if force:
+            with self._lock:
+                self._volume_at.clear()
+                self._space_at.clear()
+        self._wake.set()
+
+    # ---------- reads (cache only) ----------
+    def drives(self, *, removable_only: bool = False) -> List[DriveInfo]:
+        with self._lock:
+            found = sorted(self._drives.values(), key=lambda d: d.root)
+        return [d for d in found if d.removable] if removable_only else found
+
+    def drive(self, root: str) -> Optional[DriveInfo]:
+        with self._lock:
+            return self._drives.get(root)
+
+    def space(self, root: str) -> Optional[tuple[int, int]]:
+        """
+        (total, free) as last probed, or None if not known yet. A stale value
+        triggers a refresh in the background.
+        """
+        with self._lock:
+            d = self._drives.get(root)
+            stale = time.monotonic() - self._space_at.get(root, 0.0) > self.space_ttl_s
+        if stale:
+            self._wake.set()
+        if d is None or not d.checked_at:
+            return None
+        return d.total, d.free
+
+    # ---------- change notifications ----------
+    def subscribe(self, callback: Callable[[List[DriveInfo]], None]) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def on_card_inserted(self, callback: Callable[[DriveInfo, str], None]) -> Callable[[], None]:
+        """
+        callback(drive, kind) for each card inserted while the service runs.
+        Returns the unsubscribe function.
+        """
+        with self._lock:
+            self._card_subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._card_subscribers:
+                    self._card_subscribers.remove(callback)
+        return unsubscribe
+
+    def _announce_cards(self) -> None:
+        # Only once the volume answered (label / removable flag are known)
+        for root in list(self._new_roots):
+            with self._lock:
+                d = self._drives.get(root)
+            if d is None:
+                self._new_roots.discard(root)
+                continue
+            if not d.checked_at:
+                continue
+            self._new_roots.discard(root)
+            ok, kind = self._call(("card", root), identify_card, root)
+            kind = kind if ok else ""
+            if not (d.removable or kind):
+                continue
+            with self._lock:
+                subscribers = list(self._card_subscribers)
+            for cb in subscribers:
+                try:
+                    cb(d, kind)
+                except Exception:
+                    pass
+
+    def _notify(self) -> None:
+        snapshot = self.drives()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for cb in subscribers:
+            try:
+                cb(snapshot)
+            except Exception:
+                pass
+
+    # ---------- polling ----------
+    def _call(self, key: tuple, fn, *args):
+        """
+        Runs fn in the pool with a timeout. Returns (done, value); a call that is
+        still stuck from an earlier poll isn't started again.
+        """
+        fut = self._pending.get(key)
+        timeout = 0 if fut is not None else self.probe_timeout_s  # stuck ones get no second wait
+        if fut is None:
+            fut = self._pending[key] = self._pool.submit(fn, *args)
+        try:
+            value = fut.result(timeout=timeout)
+        except FutureTimeout:
+            return False, None
+        except Exception:
+            self._pending.pop(key, None)
+            return False, None
+        self._pending.pop(key, None)
+        return True, value
+
+    def _poll(self) -> bool:
+        ok, roots = self._call(("roots",), drives.list_roots)
+        if not ok:
+            return False
+
+        now = time.monotonic()
+        changed = False
+        with self._lock:
+            current = dict(self._drives)
+            gone = set(current) - set(roots)
+        for root in gone:
+            del current[root]
+            self._volume_at.pop(root, None)
+            self._space_at.pop(root, None)
+            self._new_roots.discard(root)
+            changed = True
+        if self._ready.is_set():
+            self._new_roots |= set(roots) - set(current)
+
+        for root in roots:
+            old = current.get(root) or DriveInfo(root=root)
+            new = replace(old, responsive=True)
+
+            if now - self._volume_at.get(root, 0.0) > self.volume_ttl_s:
+                ok, info = self._call(("volume", root), _probe_volume, root)
+                if ok:
+                    label, serial, removable = info
+                    new = replace(new, label=label, serial=serial, removable=removable)
+                    self._volume_at[root] = now
+                else:
+                    new = replace(new, responsive=False)
+
+            if new.responsive and now - self._space_at.get(root, 0.0) > self.space_ttl_s:
+                ok, space = self._call(("space", root), drives.get_drive_space, root)
+                if ok:
+                    new = replace(new, total=space[0], free=space[1], checked_at=now)
+                    self._space_at[root] = now
+                else:
+                    new = replace(new, responsive=False)
+
+            if new != old or root not in current:
+                current[root] = new
+                changed = True
+
+        with self._lock:
+            self._drives = current
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                changed = self._poll()
+            except Exception:
+                changed = False
+            self._ready.set()
+            if changed:
+                self._notify()
+            if self._new_roots:
+                self._announce_cards()
+            self._wake.wait(self.poll_s)
+            self._wake.clear()
+
+    def _watch_mounts(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if drives.wait_for_change(CHANGE_WAIT_S):
+                    self._wake.set()
+            except Exception:
+                self._stop.wait(self.poll_s)
+
+
+_service: Optional[DriveService] = None
+_service_lock = threading.Lock()
+
+
+def get_drive_service() -> DriveService:
+    """
+    The process-wide drive service (started on first use).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DriveService().start()
+        return _service
+
+
+@atexit.register
+def stop_drive_service() -> None:
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.stop()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+# One drive API for the rest of the app; the backend is picked per platform.
+if os.name == "nt":
+    from .drives_windows import (  # noqa: F401
+        list_roots, list_drives, list_removable_drives, get_volume_info, is_removable,
+        drive_display, get_drive_space, wait_for_change,
+    )
+else:
+    from .drives_linux import (  # noqa: F401
+        list_roots, list_drives, list_removable_drives, get_volume_info, is_removable,
+        drive_display, get_drive_space, wait_for_change,
+    )
+
+
+@dataclass(frozen=True)
+class DriveInfo:
+    root: str
+    label: str = ""
+    serial: str = ""
+    removable: bool = False
+    total: int = 0
+    free: int = 0
+    responsive: bool = True   # False: the last probe timed out / failed, values are the last known
+    checked_at: float = 0.0   # monotonic time of the last good probe
+
+    @property
+    def display(self) -> str:
+        text = drive_display(self.root, self.label)
+        return text if self.responsive else f"{text} (not responding)"
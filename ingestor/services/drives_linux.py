@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import re
+import select
+from pathlib import Path
+
+
+# Same surface as drives_windows, from /proc/mounts + statvfs, so the drive
+# service (and the engine) run on a Linux box / CI without Windows.
+
+# Pseudo / system filesystems that are never a card or an archive drive
+_SKIP_FS = {
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "cgroup", "cgroup2", "securityfs", "pstore",
+    "debugfs", "tracefs", "configfs", "fusectl", "mqueue", "hugetlbfs", "bpf", "autofs", "overlay",
+    "squashfs", "efivarfs", "binfmt_misc", "rpc_pipefs", "nsfs", "ramfs",
+}
+_SKIP_MOUNTS = {"/", "/boot", "/boot/efi", "/home", "/var", "/usr", "/tmp"}
+
+
+_ESCAPE = re.compile(rb"\\([0-3][0-7]{2})|\\x([0-9a-fA-F]{2})")
+
+
+def _unescape(field: str) -> str:
+    # /proc/mounts writes spaces etc. as octal escapes ("/media/SD\040CARD"), udev as "\x20".
+    # Everything else is already UTF-8 ("/media/user/Карта") - only the escapes are touched,
+    # on the bytes, so an escaped multi-byte character comes back whole.
+    raw = _ESCAPE.sub(
+        lambda m: bytes([int(m.group(1), 8) if m.group(1) else int(m.group(2), 16)]),
+        field.encode("utf-8", "surrogateescape"),
+    )
+    return raw.decode("utf-8", "replace")
+
+
+def _mounts() -> list[tuple[str, str, str]]:
+    """
+    [(device, mountpoint, fstype)] of the mounts that could be a drive.
+    """
+    try:
+        lines = Path("/proc/mounts").read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+    found = []
+    seen = set()
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        device, mountpoint, fstype = _unescape(parts[0]), _unescape(parts[1]), parts[2]
+        if fstype in _SKIP_FS or mountpoint in _SKIP_MOUNTS or mountpoint in seen:
+            continue
+        if not device.startswith("/dev/") or mountpoint.startswith(("/snap/", "/proc/", "/sys/", "/run/credentials")):
+            continue
+        seen.add(mountpoint)
+        found.append((device, mountpoint, fstype))
+    return found
+
+
+def _device_of(root: str) -> str:
+    root = os.path.normpath(root)
+    for device, mountpoint, _fs in _mounts():
+        if mountpoint == root:
+            return device
+    return ""
+
+
+def _by_link(kind: str, device: str) -> str:
+    # /dev/disk/by-label/<LABEL> and /dev/disk/by-uuid/<UUID> are symlinks to the device
+    folder = Path("/dev/disk") / kind
+    try:
+        target = os.path.realpath(device)
+        for link in folder.iterdir():
+            if os.path.realpath(link) == target:
+                return _unescape(link.name)  # udev escapes spaces as \x20
+    except OSError:
+        pass
+    return ""
+
+
+def list_roots() -> list[str]:
+    """
+    Mount points only - never touches the volumes themselves.
+    """
+    return [mountpoint for _device, mountpoint, _fs in _mounts()]
+
+
+def get_volume_info(root: str) -> tuple[str, str]:
+    """
+    (label, serial) for a mount point; the filesystem UUID plays the volume serial.
+    """
+    device = _device_of(root)
+    if not device:
+        return "", ""
+    label = _by_link("by-label", device) or os.path.basename(os.path.normpath(root))
+    return label, _by_link("by-uuid", device).upper()
+
+
+def is_removable(root: str) -> bool:
+    device = _device_of(root)
+    if not device.startswith("/dev/"):
+        return False
+    # /sys/class/block/sdb1 -> .../block/sdb/sdb1; the flag lives on the disk (sdb)
+    block = Path("/sys/class/block") / os.path.basename(os.path.realpath(device))
+    for candidate in (block / "removable", block.resolve().parent / "removable"):
+        try:
+            return candidate.read_text().strip() == "1"
+        except OSError:
+            continue
+    return False
+
+
+def list_drives() -> list[tuple[str, str]]:
+    """
+    Returns list of (root, label) like ("/media/cactus/MYBOOK", "MYBOOK").
+    """
+    return [(root, get_volume_info(root)[0]) for root in list_roots()]
+
+
+def list_removable_drives() -> list[tuple[str, str]]:
+    return [(root, label) for root, label in list_drives() if is_removable(root)]
+
+
+def drive_display(root: str, label: str) -> str:
+    if label:
+        return f"{root} - {label}"
+    return f"{root} - (No Label)"
+
+
+def get_drive_space(root: str) -> tuple[int, int]:
+    """
+    Returns (total_bytes, free_bytes); free is what an unprivileged copy can use.
+    """
+    st = os.statvfs(root)
+    return st.f_blocks * st.f_frsize, st.f_bavail * st.f_frsize
+
+
+def wait_for_change(timeout: float) -> bool:
+    """
+    Blocks until something is mounted / unmounted (True) or timeout (False).
+    The kernel flags /proc/mounts with POLLPRI when the mount table changes.
+    """
+    try:
+        with open("/proc/mounts", "rb") as f:
+            p = select.poll()
+            p.register(f, select.POLLPRI | select.POLLERR)
+            return bool(p.poll(int(timeout * 1000)))
+    except (OSError, AttributeError):
+        return False
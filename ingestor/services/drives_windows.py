@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import string
+import time
 import ctypes
 from ctypes import wintypes
 
@@ -25,6 +26,45 @@ GetVolumeInformationW.argtypes = [
 GetVolumeInformationW.restype = wintypes.BOOL
 
 
+def get_volume_info(root: str) -> tuple[str, str]:
+    """
+    (label, serial) for a drive root, serial formatted like Explorer's "1A2B-3C4D".
+    The serial follows the volume across letters and PCs; ("", "") if unreadable.
+    """
+    vol_name_buf = ctypes.create_unicode_buffer(261)
+    fs_name_buf = ctypes.create_unicode_buffer(261)
+    serial = wintypes.DWORD()
+    max_comp = wintypes.DWORD()
+    fs_flags = wintypes.DWORD()
+
+    ok = GetVolumeInformationW(
+        root,
+        vol_name_buf,
+        len(vol_name_buf),
+        ctypes.byref(serial),
+        ctypes.byref(max_comp),
+        ctypes.byref(fs_flags),
+        fs_name_buf,
+        len(fs_name_buf),
+    )
+    if not ok:
+        return "", ""
+    return vol_name_buf.value.strip(), f"{serial.value >> 16:04X}-{serial.value & 0xFFFF:04X}"
+
+
+def list_roots() -> list[str]:
+    """
+    Drive roots from the GetLogicalDrives bitmask (except C:). Cheap: it never
+    touches the volumes, so a sleeping HDD or dead network share can't block it.
+    """
+    drives_bitmask = GetLogicalDrives()
+    return [
+        f"{letter}:\\"
+        for letter in string.ascii_uppercase
+        if drives_bitmask & (1 << (ord(letter) - ord("A"))) and letter != "C"
+    ]
+
+
 def list_windows_drives() -> list[tuple[str, str]]:
     """
     Returns list of (root, label) like ("E:\\", "MyBook 2").
@@ -41,24 +81,7 @@ def list_windows_drives() -> list[tuple[str, str]]:
         if not os.path.exists(root) or letter == 'C':
             continue
 
-        vol_name_buf = ctypes.create_unicode_buffer(261)
-        fs_name_buf = ctypes.create_unicode_buffer(261)
-        serial = wintypes.DWORD()
-        max_comp = wintypes.DWORD()
-        fs_flags = wintypes.DWORD()
-
-        ok = GetVolumeInformationW(
-            root,
-            vol_name_buf,
-            len(vol_name_buf),
-            ctypes.byref(serial),
-            ctypes.byref(max_comp),
-            ctypes.byref(fs_flags),
-            fs_name_buf,
-            len(fs_name_buf),
-        )
-
-        label = vol_name_buf.value.strip() if ok else ""
+        label, _serial = get_volume_info(root)
         results.append((root, label))
 
     return results
@@ -72,6 +95,13 @@ GetDriveTypeW.restype = wintypes.UINT
 DRIVE_REMOVABLE = 2  # per WinAPI
 
 
+def is_removable(root: str) -> bool:
+    try:
+        return GetDriveTypeW(root) == DRIVE_REMOVABLE
+    except Exception:
+        return False
+
+
 def list_removable_drives() -> list[tuple[str, str]]:
     """
     Returns removable drives only (typically SD card readers / USB sticks):
@@ -103,4 +133,22 @@ def get_drive_space(root: str) -> tuple[int, int]:
     """
     import shutil
     usage = shutil.disk_usage(root)
-    return usage.total, usage.free
\ No newline at end of file
+    return usage.total, usage.free
+
+
+def wait_for_change(timeout: float) -> bool:
+    """
+    Blocks until a drive letter comes or goes (True) or timeout (False).
+    GetLogicalDrives is a bitmask read, so checking it 4x a second costs nothing;
+    the GUI also pokes the drive service on WM_DEVICECHANGE (ui.drive_watcher).
+    """
+    start = GetLogicalDrives()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.25)
+        if GetLogicalDrives() != start:
+            return True
+    return False
+
+
+list_drives = list_windows_drives
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from .card_fingerprint import find_previous_ingests, fingerprint_card
+
+
+class FingerprintWorker(QObject):
+    finished = Signal(str, object, list)   # root, CardFingerprint (None on error), previous ingests
+
+    def __init__(self, root: str, serial: str, ledger_path: Path, catalog_path: Path):
+        super().__init__()
+        self.root = root
+        self.serial = serial
+        self.ledger_path = Path(ledger_path)
+        self.catalog_path = Path(catalog_path)
+
+    @Slot()
+    def run(self):
+        try:
+            fp = fingerprint_card(self.root, self.serial)
+            found = find_previous_ingests(fp, ledger_path=self.ledger_path, catalog_path=self.catalog_path)
+        except Exception:
+            fp, found = None, []
+        self.finished.emit(self.root, fp, found)
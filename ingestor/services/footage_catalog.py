@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .project_registry import DEFAULT_BASE_FOLDER, split_project_folder
+
+
+CATALOG_NAME = "footage_catalog.db"
+BATCH_ROWS = 5000
+
+# Every clip on every archive drive this station has seen, keyed by the volume
+# serial (drive letters move around, serials don't). Paths are relative to the
+# volume root, so a hit still says where the clip is while the drive sits on a shelf.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS volumes (
+    id         INTEGER PRIMARY KEY,
+    serial     TEXT NOT NULL UNIQUE,
+    label      TEXT NOT NULL DEFAULT '',
+    last_root  TEXT NOT NULL DEFAULT '',
+    first_seen INTEGER NOT NULL,
+    last_seen  INTEGER NOT NULL,
+    indexed_at INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dirs (
+    id   INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS clips (
+    id        INTEGER PRIMARY KEY,
+    volume_id INTEGER NOT NULL REFERENCES volumes(id),
+    dir_id    INTEGER NOT NULL REFERENCES dirs(id),
+    name      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime     INTEGER NOT NULL,
+    hash      BLOB,
+    project   TEXT NOT NULL DEFAULT '',
+    UNIQUE (volume_id, dir_id, name)
+);
+CREATE INDEX IF NOT EXISTS ix_clips_name ON clips(name COLLATE NOCASE, size);
+CREATE INDEX IF NOT EXISTS ix_clips_hash ON clips(hash);
+CREATE INDEX IF NOT EXISTS ix_clips_project ON clips(project);
+"""
+
+
+@dataclass(frozen=True)
+class CatalogHit:
+    name: str
+    rel_path: str      # from the volume root, e.g. "Cactus/Iriya_-_X/Footage/2026-01-15/SD1/A001.MXF"
+    size: int
+    hash: str          # hex, "" if not hashed
+    project: str       # "Client_-_Project" folder ("" if outside the archive layout)
+    serial: str
+    label: str
+    last_root: str     # where the volume was last mounted, e.g. "E:\\"
+    last_seen: str
+
+    @property
+    def last_path(self) -> str:
+        return str(Path(self.last_root) / self.rel_path) if self.last_root else self.rel_path
+
+
+def connect(catalog_path: Path) -> sqlite3.Connection:
+    catalog_path = Path(catalog_path)
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(catalog_path), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _touch_volume(conn: sqlite3.Connection, serial: str, label: str, root: str) -> int:
+    now = int(time.time())
+    conn.execute(
+        "INSERT INTO volumes (serial, label, last_root, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(serial) DO UPDATE SET "
+        "label = CASE WHEN excluded.label != '' THEN excluded.label ELSE volumes.label END, "
+        "last_root = CASE WHEN excluded.last_root != '' THEN excluded.last_root ELSE volumes.last_root END, "
+        "last_seen = excluded.last_seen",
+        (serial, label, root, now, now),
+    )
+    (volume_id,) = conn.execute("SELECT id FROM volumes WHERE serial = ?", (serial,)).fetchone()
+    return volume_id
+
+
+def _project_of(rel_path: str, base_folder: str) -> str:
+    # <base>/<Client_-_Project>/...
+    parts = PurePosixPath(rel_path).parts
+    if len(parts) > 2 and parts[0] == base_folder and split_project_folder(parts[1]):
+        return parts[1]
+    return ""
+
+
+class CatalogWriter:
+    """
+    Upserts clips of one volume, BATCH_ROWS per transaction.
+
+        with CatalogWriter(path, serial=..., label=..., root="E:\\", prefix="Cactus/.../SD1") as w:
+            w.add(rel_path, size, mtime, hash_hex)
+
+    rel_path is relative to prefix (itself relative to the volume root), which
+    lets the ingest feed it the same card-relative paths as the manifest.
+    """
+
+    def __init__(
+        self,
+        catalog_path: Path,
+        *,
+        serial: str,
+        label: str = "",
+        root: str = "",
+        prefix: str = "",
+        base_folder: str = DEFAULT_BASE_FOLDER,
+    ):
+        self.conn = connect(catalog_path)
+        self.prefix = PurePosixPath(prefix.replace("\\", "/")) if prefix else None
+        self.base_folder = base_folder
+        self._buffer: list[tuple] = []
+        self._dir_ids: Dict[str, int] = {}
+        self.count = 0
+        with self.conn:
+            self.volume_id = _touch_volume(self.conn, serial, label, root)
+
+    def _dir_id(self, rel_dir: str) -> int:
+        cached = self._dir_ids.get(rel_dir)
+        if cached is not None:
+            return cached
+        self.conn.execute("INSERT OR IGNORE INTO dirs(path) VALUES (?)", (rel_dir,))
+        (dir_id,) = self.conn.execute("SELECT id FROM dirs WHERE path = ?", (rel_dir,)).fetchone()
+        self._dir_ids[rel_dir] = dir_id
+        return dir_id
+
+    def add(self, rel_path: str, size: int, mtime: float, hash_hex: str = "") -> None:
+        rel = PurePosixPath(rel_path.replace("\\", "/"))
+        if self.prefix is not None:
+            rel = self.prefix / rel
+        self._buffer.append((
+            str(rel.parent) if str(rel.parent) != "." else "",
+            rel.name,
+            int(size),
+            int(mtime),
+            bytes.fromhex(hash_hex) if hash_hex else None,
+            _project_of(str(rel), self.base_folder),
+        ))
+        if len(self._buffer) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        with self.conn:
+            rows = [
+                (self.volume_id, self._dir_id(rel_dir), name, size, mtime, h, project)
+                for rel_dir, name, size, mtime, h, project in self._buffer
+            ]
+            # A rescan without hashes keeps the hash we already had for an unchanged file
+            self.conn.executemany(
+                "INSERT INTO clips (volume_id, dir_id, name, size, mtime, hash, project) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(volume_id, dir_id, name) DO UPDATE SET "
+                "hash = CASE WHEN excluded.hash IS NOT NULL THEN excluded.hash "
+                "            WHEN clips.size = excluded.size AND clips.mtime = excluded.mtime THEN clips.hash "
+                "            ELSE NULL END, "
+                "size = excluded.size, mtime = excluded.mtime, project = excluded.project",
+                rows,
+            )
+        self.count += len(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self) -> "CatalogWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _walk(top: Path) -> Iterator[Tuple[str, os.stat_result]]:
+    # scandir: on Windows the stat comes with the directory listing, no extra call per file
+    stack = [top]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            stack.append(Path(e.path))
+                        elif e.is_file(follow_symlinks=False):
+                            yield e.path, e.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def index_volume(
+    catalog_path: Path,
+    root: str,
+    *,
+    serial: str,
+    label: str = "",
+    base_folder: str = DEFAULT_BASE_FOLDER,
+    hasher: Optional[Callable[[Path], str]] = None,
+) -> dict:
+    """
+    Brings a connected archive drive's entry up to date: walks <root>/<base_folder>,
+    upserts every file and drops rows for files that are gone. Only metadata is
+    read unless a hasher is given (hashes recorded at ingest time are kept while
+    size and mtime match). Returns {"clips", "removed", "seconds"}.
+    """
+    started = time.monotonic()
+    top = Path(root) / base_folder
+    seen: set[tuple[str, str]] = set()
+
+    with CatalogWriter(catalog_path, serial=serial, label=label, root=str(root), base_folder=base_folder) as w:
+        for full, st in _walk(top):
+            rel = PurePosixPath(Path(full).relative_to(root).as_posix())
+            h = ""
+            if hasher is not None:
+                try:
+                    h = hasher(Path(full))
+                except OSError:
+                    pass
+            w.add(str(rel), st.st_size, st.st_mtime, h)
+            seen.add((str(rel.parent), rel.name))
+        w.flush()
+
+        conn = w.conn
+        removed = 0
+        with conn:
+            rows = conn.execute(
+                "SELECT c.id, d.path, c.name FROM clips c JOIN dirs d ON d.id = c.dir_id "
+                "WHERE c.volume_id = ? AND (d.path = ? OR d.path LIKE ?)",
+                (w.volume_id, base_folder, f"{base_folder}/%"),
+            ).fetchall()
+            gone = [(cid,) for cid, d, name in rows if (d, name) not in seen]
+            conn.executemany("DELETE FROM clips WHERE id = ?", gone)
+            removed = len(gone)
+            conn.execute("UPDATE volumes SET indexed_at = ? WHERE id = ?", (int(time.time()), w.volume_id))
+        count = w.count
+
+    return {"clips": count, "removed": removed, "seconds": round(time.monotonic() - started, 1)}
+
+
+_LOOKUP_SQL = """
+SELECT c.name, d.path, c.size, c.hash, c.project, v.serial, v.label, v.last_root, v.last_seen
+FROM clips c
+JOIN dirs d    ON d.id = c.dir_id
+JOIN volumes v ON v.id = c.volume_id
+"""
+
+
+def _hits(rows) -> List[CatalogHit]:
+    return [
+        CatalogHit(
+            name=name,
+            rel_path=f"{rel_dir}/{name}" if rel_dir else name,
+            size=size,
+            hash=h.hex() if h else "",
+            project=project,
+            serial=serial,
+            label=label,
+            last_root=last_root,
+            last_seen=time.strftime("%Y-%m-%d %H:%M", time.localtime(last_seen)),
+        )
+        for name, rel_dir, size, h, project, serial, label, last_root, last_seen in rows
+    ]
+
+
+def find_clip(catalog_path: Path, name: str, size: Optional[int] = None) -> List[CatalogHit]:
+    """
+    "Where is A001C012.MXF?" - every copy on every volume (case-insensitive, indexed).
+    """
+    conn = connect(catalog_path)
+    try:
+        if size is None:
+            rows = conn.execute(_LOOKUP_SQL + " WHERE c.name = ? COLLATE NOCASE", (name,)).fetchall()
+        else:
+            rows = conn.execute(
+                _LOOKUP_SQL + " WHERE c.name = ? COLLATE NOCASE AND c.size = ?", (name, size)
+            ).fetchall()
+        return _hits(rows)
+    finally:
+        conn.close()
+
+
+def find_hash(catalog_path: Path, hash_hex: str) -> List[CatalogHit]:
+    conn = connect(catalog_path)
+    try:
+        rows = conn.execute(_LOOKUP_SQL + " WHERE c.hash = ?", (bytes.fromhex(hash_hex),)).fetchall()
+        return _hits(rows)
+    finally:
+        conn.close()
+
+
+def find_card(catalog_path: Path, files: Iterable[Tuple[str, int]], *, min_share: float = 0.9) -> List[dict]:
+    """
+    "Is this card already archived somewhere?" files = (name, size) pairs from the
+    card (no reading needed). Returns the volume/project folders holding at least
+    min_share of them, best first:
+        [{"serial", "label", "last_root", "project", "folder", "matched", "total"}]
+    """
+    files = sorted(set(files))
+    if not files:
+        return []
+
+    conn = connect(catalog_path)
+    try:
+        conn.execute("CREATE TEMP TABLE card_files (name TEXT NOT NULL, size INTEGER NOT NULL)")
+        conn.executemany("INSERT INTO temp.card_files VALUES (?, ?)", files)
+        # One row per (volume, card folder): the SDn folder the clips landed in
+        rows = conn.execute(
+            """
+            SELECT v.serial, v.label, v.last_root, c.project, d.path, COUNT(DISTINCT f.name || ':' || f.size)
+            FROM temp.card_files f
+            JOIN clips c   ON c.name = f.name COLLATE NOCASE AND c.size = f.size
+            JOIN dirs d    ON d.id = c.dir_id
+            JOIN volumes v ON v.id = c.volume_id
+            GROUP BY v.id, c.project, d.path
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+
+    # Clips sit in sub-folders of the card folder; roll them up to ".../Footage/<date>/<SDn>"
+    by_folder: Dict[tuple, dict] = {}
+    for serial, label, last_root, project, rel_dir, matched in rows:
+        parts = PurePosixPath(rel_dir).parts
+        folder = str(PurePosixPath(*parts[:5])) if len(parts) >= 5 and parts[2] == "Footage" else rel_dir
+        key = (serial, folder)
+        entry = by_folder.setdefault(key, {
+            "serial": serial, "label": label, "last_root": last_root,
+            "project": project, "folder": folder, "matched": 0, "total": len(files),
+        })
+        entry["matched"] += matched
+
+    hits = [e for e in by_folder.values() if e["matched"] >= min_share * len(files)]
+    return sorted(hits, key=lambda e: e["matched"], reverse=True)
+
+
+def volumes(catalog_path: Path) -> List[dict]:
+    conn = connect(catalog_path)
+    try:
+        rows = conn.execute(
+            "SELECT v.serial, v.label, v.last_root, v.last_seen, v.indexed_at, COUNT(c.id), COALESCE(SUM(c.size), 0) "
+            "FROM volumes v LEFT JOIN clips c ON c.volume_id = v.id GROUP BY v.id ORDER BY v.last_seen DESC"
+        ).fetchall()
+    finally:
+        conn.close()
+    keys = ["serial", "label", "last_root", "last_seen", "indexed_at", "clips", "bytes"]
+    return [dict(zip(keys, r)) for r in rows]
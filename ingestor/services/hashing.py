@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# (path, size, mtime_ns) -> hex digest. Several stages (proxy cache, manifest,
+# probe cache) want the same hash during one ingest; only read the file once.
+_memo: dict[tuple[str, int, int], str] = {}
+_memo_lock = threading.Lock()
+_MEMO_MAX = 200_000
+# Hashes being computed right now: a second caller (the manifest thread and the
+# proxy stage hash the same files side by side) waits for the first read
+_inflight: dict[tuple[str, int, int], Future] = {}
+
+
+def file_hash(path: Path) -> str:
+    """
+    BLAKE2b-128 of the whole file (hex). Fast enough to keep up with SSD reads.
+    """
+    st = os.stat(path)
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _memo_lock:
+        cached = _memo.get(key)
+        if cached:
+            return cached
+        pending = _inflight.get(key)
+        if pending is None:
+            pending = _inflight[key] = Future()
+            mine = True
+        else:
+            mine = False
+    if not mine:
+        return pending.result()  # re-raises the reader's OSError
+
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                h.update(chunk)
+        digest = h.hexdigest()
+    except BaseException as e:
+        with _memo_lock:
+            _inflight.pop(key, None)
+        pending.set_exception(e)
+        raise
+
+    with _memo_lock:
+        if len(_memo) >= _MEMO_MAX:
+            _memo.clear()
+        _memo[key] = digest
+        _inflight.pop(key, None)
+    pending.set_result(digest)
+    return digest
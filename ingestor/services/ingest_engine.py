@@ -1,8 +1,21 @@
+import json
 import os
+import re
 import subprocess
+import threading
+import time
 from datetime import date
 from pathlib import Path
-from ..services.drives_windows import get_drive_space
+from typing import Optional
+from .drives import get_drive_space, get_volume_info
+from .footage_catalog import CatalogWriter
+from .volume_profile import VolumeProfiles, estimate_copy_seconds, mb_per_s, robocopy_threads
+from .card_fingerprint import fingerprint_card
+from .proxy_cache import DEFAULT_CACHE_GB, ProxyCache
+from .manifest_store import record_card
+from .media_probe import MediaProbeCache, probe_clips, summarize_media, write_card_media
+from .proxy_engine import default_proxy_workers, generate_proxies, iter_video_files
+from .proxy_policy import full_size_bytes
 
 # --- helpers (self-contained) ---
 
@@ -20,6 +33,29 @@ def _required_with_margin(used_bytes: int) -> int:
     return used_bytes + max(int(used_bytes * 0.05), 2 * 1024**3)
 
 
+# Rough upper bound for 720p proxies vs. camera originals (proxy-only mode)
+PROXY_SIZE_RATIO = 0.25
+
+
+def required_space(
+    used_bytes: int,
+    *,
+    keep_originals_on_proxy: bool,
+    full_size_bytes: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    (archive_required, ssd_required) for a card with used_bytes on it.
+    Without originals on the SSD it only needs room for the proxies: the clips
+    passed through / remuxed at full size (full_size_bytes, from the probe) plus
+    PROXY_SIZE_RATIO of the rest. Until the card is probed, count it in full.
+    """
+    archive_req = _required_with_margin(used_bytes)
+    if keep_originals_on_proxy or full_size_bytes is None:
+        return archive_req, archive_req
+    full = min(full_size_bytes, used_bytes)
+    return archive_req, _required_with_margin(full + int((used_bytes - full) * PROXY_SIZE_RATIO))
+
+
 # def _drive_space_bytes(root: str) -> tuple[int, int]:
 #     """
 #     Returns (total_bytes, free_bytes) for a drive root like 'E:\\'
@@ -31,7 +67,12 @@ def _required_with_margin(used_bytes: int) -> int:
 #     return usage.total, usage.free
 
 
-def _robocopy_cmd(src_root: str, dst_root: str, log_path: str, mt: int = 4) -> list[str]:
+ROBOCOPY_MT = 4
+ROBOCOPY_RETRIES = 2
+ROBOCOPY_WAIT_S = 2
+
+
+def _robocopy_cmd(src_root: str, dst_root: str, log_path: str, mt: int = ROBOCOPY_MT) -> list[str]:
     # NOTE: robocopy wants paths without trailing quotes; we pass them as separate args.
     # /MT:4 is a safer default when running TWO robocopies in parallel.
     return [
@@ -41,14 +82,104 @@ def _robocopy_cmd(src_root: str, dst_root: str, log_path: str, mt: int = 4) -> l
         "/E",
         "/COPY:DAT",
         "/DCOPY:T",
-        "/R:2", "/W:2",
+        f"/R:{ROBOCOPY_RETRIES}", f"/W:{ROBOCOPY_WAIT_S}",
         f"/MT:{mt}",
         "/XJ",
         "/NP",
+        "/BYTES",  # plain byte counts in the summary (see _robocopy_summary)
         f"/LOG+:{log_path}",
     ]
 
 
+def _tree_size(root: Path) -> tuple[int, int]:
+    # (bytes, files) actually on the destination (stat only, no reads)
+    total = files = 0
+    for dirpath, _dirs, names in os.walk(root):
+        for name in names:
+            try:
+                total += os.stat(os.path.join(dirpath, name)).st_size
+                files += 1
+            except OSError:
+                pass
+    return total, files
+
+
+def _log_size(log_path: str) -> int:
+    try:
+        return os.path.getsize(log_path)
+    except OSError:
+        return 0
+
+
+def _robocopy_retries(log_path: str, offset: int) -> int:
+    # Logs are /LOG+ (appended per card slot); only look at what this run wrote
+    if not log_path:
+        return 0
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            text = f.read().decode("utf-8", errors="ignore")
+    except OSError:
+        return 0
+    return text.count("Retrying...")
+
+
+# Summary rows: "<label> : Total Copied Skipped Mismatch FAILED Extras" - labels are
+# localized, so rows are matched by shape: Dirs, Files, Bytes (with /BYTES) in that order
+_SUMMARY_ROW = re.compile(r"^\s*[^\s:][^:]*:\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*$", re.M)
+
+
+def _robocopy_summary(log_path: str, offset: int) -> Optional[dict]:
+    """
+    What this run actually did, from the summary robocopy appends to its log:
+    {"files", "bytes", "skipped_files", "skipped_bytes", "failed_files"}, or None
+    if there's no (readable) summary.
+    """
+    if not log_path:
+        return None
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            text = f.read().decode("utf-8", errors="ignore")
+    except OSError:
+        return None
+    rows = _SUMMARY_ROW.findall(text)
+    if len(rows) < 3:
+        return None
+    _dirs, files, size = ([int(v) for v in row] for row in rows[-3:])
+    return {
+        "files": files[1],
+        "bytes": size[1],
+        "skipped_files": files[2],
+        "skipped_bytes": size[2],
+        "failed_files": files[4],
+    }
+
+
+def _copied(log_path: str, offset: int, dest: Path, before: tuple[int, int]) -> tuple[int, int, Optional[int]]:
+    """
+    (bytes, files, skipped files) copied by this run. From robocopy's summary;
+    without one, the growth of the destination (skipped unknown: None).
+    """
+    summary = _robocopy_summary(log_path, offset)
+    if summary is not None:
+        return summary["bytes"], summary["files"], summary["skipped_files"]
+    after = _tree_size(dest)
+    return max(0, after[0] - before[0]), max(0, after[1] - before[1]), (0 if before == (0, 0) else None)
+
+
+def _wait_all(procs: dict[str, subprocess.Popen], started: float) -> dict[str, tuple[int, float]]:
+    # {name: (exit code, seconds from start)}; both copies run in parallel so poll rather than wait in order
+    done: dict[str, tuple[int, float]] = {}
+    while len(done) < len(procs):
+        for name, proc in procs.items():
+            if name not in done and proc.poll() is not None:
+                done[name] = (proc.returncode, round(time.monotonic() - started, 1))
+        if len(done) < len(procs):
+            time.sleep(0.2)
+    return done
+
+
 def _robocopy_ok(exit_code: int) -> bool:
     # Robocopy convention: <8 = success (0..7), >=8 = failure
     return exit_code < 8
@@ -89,11 +220,45 @@ def ingest_one_card_parallel(
     client_project: str,   # e.g. "Iriya_-_Yom_HaAtsmaut"
     ingest_date: str,      # e.g. "2026-01-15" (or date.today().isoformat())
     sd_index: int,         # 1 for SD1, 2 for SD2...
+    keep_originals_on_proxy: bool = True,
+    proxy_cache_max_bytes: int = int(DEFAULT_CACHE_GB * 1024**3),
+    probe_cache_path: str = "",
+    manifest_path: str = "",
+    catalog_path: str = "",
+    profiles_path: str = "",
+    card_fingerprint: str = "",
 ) -> dict:
     """
     Copies SD card -> Archive and SD card -> SSD in parallel using robocopy.
     Performs a per-card free-space check for BOTH destinations before copying.
     Halts/returns failure if either robocopy fails. (We still let both finish.)
+
+    Once both copies are OK, proxies are encoded from the SSD copy into the
+    SSD Proxy folder. A proxy failure doesn't fail the card (originals are safe);
+    it's reported under result["proxy"].
+
+    keep_originals_on_proxy=False (proxy-only): the card is read once, to the
+    archive only, and proxies are made from the archive copy. The SSD gets
+    proxies and logs, nothing else.
+
+    Every clip is probed once (cached in probe_cache_path across ingests); the
+    results drive the proxy policy and are written next to the archive logs as
+    <SDn>_media.json for the ledger and reports.
+
+    Every copied file (path, size, hash, card, destination, times) goes into the
+    station's manifest store (manifest_path), recorded in a background thread
+    while proxies are made. The same rows go into the footage catalog
+    (catalog_path) under the archive drive's volume serial.
+
+    With profiles_path (volume_profiles.json), the card reader's measured speed
+    picks robocopy's /MT and gives an up-front estimate (result["estimate"]);
+    the speeds actually seen are folded back into the card / drive profiles.
+
+    card_fingerprint (computed here if not given) is stored with the card's
+    metrics so a later insert of the same card can be recognised.
+
+    result["metrics"] is the card's performance record (bytes, files, per-destination
+    copy time and MB/s, hash and proxy time, robocopy retries, tuning params) for the ledger.
     """
 
     # Normalize roots
@@ -102,18 +267,20 @@ def ingest_one_card_parallel(
     ssd_root = str(Path(ssd_root))
 
     # Destination folder structure:
-    # Raw:   X:\Cactus\<Client_Project>\Footage\<Date>\SD1
-    # Proxy: X:\Cactus\<Client_Project>\Proxy\<Date>\SD1   (for now: duplicate raw)
+    # Raw:   X:\Cactus\<Client_Project>\Footage\<Date>\SD1   (archive + SSD copy of originals)
+    # Proxy: X:\Cactus\<Client_Project>\Proxy\<Date>\SD1     (SSD only, encoded proxies)
     sd_name = f"SD{sd_index}"
 
     archive_dest = Path(archive_root) / base_folder_name / client_project / "Footage" / ingest_date / sd_name
-    ssd_dest     = Path(ssd_root)     / base_folder_name / client_project / "Proxy"   / ingest_date / sd_name
+    ssd_dest     = Path(ssd_root)     / base_folder_name / client_project / "Footage" / ingest_date / sd_name
+    proxy_dest   = Path(ssd_root)     / base_folder_name / client_project / "Proxy"   / ingest_date / sd_name
 
     logs_dir_archive = Path(archive_root) / base_folder_name / client_project / "Footage" / ingest_date / "_logs"
     logs_dir_ssd     = Path(ssd_root)     / base_folder_name / client_project / "Proxy"   / ingest_date / "_logs"
 
     _ensure_dir(archive_dest)
-    _ensure_dir(ssd_dest)
+    if keep_originals_on_proxy:
+        _ensure_dir(ssd_dest)
     _ensure_dir(logs_dir_archive)
     _ensure_dir(logs_dir_ssd)
 
@@ -123,43 +290,144 @@ def ingest_one_card_parallel(
     # --- Space check (per-card, fast) ---
     sd_total, sd_free = get_drive_space(sd_root)
     sd_used = max(0, sd_total - sd_free)
-    required = _required_with_margin(sd_used)
+    probe_cache = MediaProbeCache(Path(probe_cache_path)) if probe_cache_path else None
+    full_size = None
+    if not keep_originals_on_proxy:
+        # Light clips go to the SSD as full-size copies - probe the card (headers only,
+        # cached for the proxy step) to know how much of it that is
+        card_infos = probe_clips(iter_video_files(Path(sd_root)), probe_cache)
+        full_size = full_size_bytes(card_infos.values(), originals_on_proxy=False)
+    required, ssd_required = required_space(
+        sd_used, keep_originals_on_proxy=keep_originals_on_proxy, full_size_bytes=full_size
+    )
 
     _, a_free = get_drive_space(archive_root)
     _, s_free = get_drive_space(ssd_root)
 
-    if a_free < required or s_free < required:
+    if a_free < required or s_free < ssd_required:
         return {
             "ok": False,
             "reason": "NOT_ENOUGH_SPACE",
             "sd_used": sd_used,
             "required": required,
+            "ssd_required": ssd_required,
             "archive_free": a_free,
             "ssd_free": s_free,
             "message": (
-                f"Need ~{_fmt_gb(required)} for this card. "
+                f"Need ~{_fmt_gb(required)} on Archive and ~{_fmt_gb(ssd_required)} on SSD for this card. "
                 f"Archive free: {_fmt_gb(a_free)}; SSD free: {_fmt_gb(s_free)}."
             ),
         }
 
-    # --- Start both robocopy processes in parallel ---
-    cmd_a = _robocopy_cmd(sd_root, str(archive_dest), log_archive, mt=4)
-    cmd_s = _robocopy_cmd(sd_root, str(ssd_dest),     log_ssd,     mt=4)
+    # --- Volume profiles (per serial): thread count + ETA ---
+    profiles = VolumeProfiles(Path(profiles_path)) if profiles_path else None
+    volumes = {"card": ("", ""), "archive": ("", ""), "ssd": ("", "")}
+    if profiles is not None:
+        for name, root in (("card", sd_root), ("archive", archive_root), ("ssd", ssd_root)):
+            try:
+                volumes[name] = get_volume_info(root)
+            except OSError:
+                pass
+    card_profile = profiles.get(volumes["card"][1]) if profiles and volumes["card"][1] else None
+    dest_profiles = [
+        profiles.get(volumes[name][1]) if profiles and volumes[name][1] else None
+        for name in (("archive", "ssd") if keep_originals_on_proxy else ("archive",))
+    ]
+    mt = robocopy_threads(card_profile, ROBOCOPY_MT)
+    eta_seconds, eta_bottleneck = estimate_copy_seconds(sd_used, card_profile, dest_profiles)
+
+    # --- Card fingerprint (before copying: first read of the card, well under a second) ---
+    if not card_fingerprint:
+        try:
+            card_serial = volumes["card"][1] or get_volume_info(sd_root)[1]
+            card_fingerprint = fingerprint_card(sd_root, card_serial).digest
+        except Exception:
+            card_fingerprint = ""
 
+    # --- Start both robocopy processes in parallel ---
     # Use CREATE_NO_WINDOW to avoid flashing consoles (optional)
     creationflags = 0
     if os.name == "nt":
         creationflags = subprocess.CREATE_NO_WINDOW  # type: ignore[attr-defined]
 
-    proc_a = subprocess.Popen(cmd_a, creationflags=creationflags)
-    proc_s = subprocess.Popen(cmd_s, creationflags=creationflags)
+    log_offsets = {"archive": _log_size(log_archive), "ssd": _log_size(log_ssd)}
+    # A re-run of the same SDn only copies what's missing: measure this run, not the folder
+    size_before = {
+        "archive": _tree_size(archive_dest),
+        "ssd": _tree_size(ssd_dest) if keep_originals_on_proxy else (0, 0),
+    }
+    copy_started = time.monotonic()
+    cmd_a = _robocopy_cmd(sd_root, str(archive_dest), log_archive, mt=mt)
+    procs = {"archive": subprocess.Popen(cmd_a, creationflags=creationflags)}
+
+    if keep_originals_on_proxy:
+        cmd_s = _robocopy_cmd(sd_root, str(ssd_dest), log_ssd, mt=mt)
+        procs["ssd"] = subprocess.Popen(cmd_s, creationflags=creationflags)
+    else:
+        log_ssd = ""
 
     # Wait for both to finish (simple gist; GUI version will be non-blocking)
-    code_a = proc_a.wait()
-    code_s = proc_s.wait()
+    finished = _wait_all(procs, copy_started)
+    code_a, archive_seconds = finished["archive"]
+    code_s, ssd_seconds = finished.get("ssd", (None, 0.0))
+    copy_seconds = max(archive_seconds, ssd_seconds)
+    bytes_copied, files_copied, skipped_a = _copied(log_archive, log_offsets["archive"], archive_dest, size_before["archive"])
+    if keep_originals_on_proxy:
+        ssd_bytes, _ssd_files, skipped_s = _copied(log_ssd, log_offsets["ssd"], ssd_dest, size_before["ssd"])
+    else:
+        ssd_bytes, skipped_s = 0, 0
+    # None: unknown how much was skipped
+    skipped = None if skipped_a is None or skipped_s is None else skipped_a + skipped_s
+
+    # Per-card performance record for the ledger (card_runs)
+    metrics = {
+        "sd_name": sd_name,
+        "fingerprint": card_fingerprint,
+        "bytes": bytes_copied,        # copied by this run (a resumed card: only what was missing)
+        "files": files_copied,
+        "skipped_files": skipped,
+        "archive_seconds": archive_seconds,
+        "ssd_seconds": ssd_seconds,
+        "archive_mb_s": mb_per_s(bytes_copied, archive_seconds),
+        "ssd_mb_s": mb_per_s(ssd_bytes, ssd_seconds),
+        "retries": (
+            _robocopy_retries(log_archive, log_offsets["archive"])
+            + _robocopy_retries(log_ssd, log_offsets["ssd"])
+        ),
+        "params": json.dumps({
+            "backend": "robocopy",
+            "mt": mt,
+            "retries": ROBOCOPY_RETRIES,
+            "wait_s": ROBOCOPY_WAIT_S,
+            "keep_originals_on_proxy": keep_originals_on_proxy,
+            "proxy_workers": default_proxy_workers(),
+        }),
+    }
 
     ok_a = _robocopy_ok(code_a)
-    ok_s = _robocopy_ok(code_s)
+    ok_s = code_s is None or _robocopy_ok(code_s)
+
+    # Real speeds feed the profiles - only full copies: skipped files (a re-run) make
+    # the time mean nothing, and tiny cards are too noisy
+    if profiles is not None and ok_a and ok_s and skipped == 0 and bytes_copied >= 256 * 1024 ** 2:
+        try:
+            # Each copy reads the card once, so the reader moved copies * bytes
+            n_copies = len(procs)
+            profiles.record_observed(
+                volumes["card"][1], volumes["card"][0],
+                read_bytes=bytes_copied * n_copies, read_seconds=copy_seconds,
+            )
+            profiles.record_observed(
+                volumes["archive"][1], volumes["archive"][0],
+                write_bytes=bytes_copied, write_seconds=archive_seconds,
+            )
+            if keep_originals_on_proxy:
+                profiles.record_observed(
+                    volumes["ssd"][1], volumes["ssd"][0],
+                    write_bytes=ssd_bytes, write_seconds=ssd_seconds,
+                )
+        except Exception:
+            pass
 
     if not (ok_a and ok_s):
         return {
@@ -169,9 +437,87 @@ def ingest_one_card_parallel(
             "ssd_exit": code_s,
             "archive_log": log_archive,
             "ssd_log": log_ssd,
+            "bytes_copied": bytes_copied,
+            "copy_seconds": copy_seconds,
+            "metrics": {**metrics, "status": "FAILED"},
             "message": f"Copy failed. Archive exit={code_a}, SSD exit={code_s}. See logs.",
         }
 
+    # --- Proxies (from the SSD copy if we have one, else the archive copy - never the card again) ---
+    # Proxies already made for the same source content (any project) are reused.
+    cache = ProxyCache(Path(ssd_root), max_bytes=proxy_cache_max_bytes)
+    proxy_src = ssd_dest if keep_originals_on_proxy else archive_dest
+
+    # --- Per-file manifest (background; hashes come from proxy_src, and file_hash shares
+    #     each read with the proxy stage hashing the same files, so files are read once) ---
+    manifest: dict = {}
+    manifest_thread = None
+    if manifest_path:
+        def _record():
+            hash_started = time.monotonic()
+            catalog = None
+            try:
+                if catalog_path:
+                    label, serial = get_volume_info(archive_root)
+                    if serial:
+                        catalog = CatalogWriter(
+                            Path(catalog_path),
+                            serial=serial,
+                            label=label,
+                            root=archive_root,
+                            prefix=archive_dest.relative_to(archive_root).as_posix(),
+                            base_folder=base_folder_name,
+                        )
+            except Exception as e:
+                manifest["catalog_error"] = str(e)
+            try:
+                manifest["files"] = record_card(
+                    Path(manifest_path),
+                    copied_root=archive_dest,
+                    hash_root=proxy_src,
+                    client_project=client_project,
+                    ingest_date=ingest_date,
+                    sd_name=sd_name,
+                    source_root=sd_root,
+                    archive_dest=str(archive_dest),
+                    ssd_dest=str(ssd_dest) if keep_originals_on_proxy else "",
+                    on_file=catalog.add if catalog is not None else None,
+                )
+            except Exception as e:
+                manifest["error"] = str(e)
+            finally:
+                if catalog is not None:
+                    try:
+                        catalog.close()
+                    except Exception as e:
+                        manifest["catalog_error"] = str(e)
+            metrics["hash_seconds"] = round(time.monotonic() - hash_started, 1)
+
+        manifest_thread = threading.Thread(target=_record, name=f"manifest-{sd_name}", daemon=True)
+        manifest_thread.start()
+
+    # --- Media metadata (probed once, shared by proxy policy / ledger / reports) ---
+    infos = probe_clips(iter_video_files(proxy_src), probe_cache)
+    media_sheet = logs_dir_archive / f"{sd_name}_media.json"
+    try:
+        write_card_media(media_sheet, proxy_src, infos)
+    except OSError:
+        media_sheet = None
+
+    proxy_started = time.monotonic()
+    proxy = generate_proxies(
+        proxy_src, proxy_dest,
+        originals_on_proxy=keep_originals_on_proxy,
+        cache=cache,
+        infos=infos,
+    )
+
+    metrics["proxy_seconds"] = round(time.monotonic() - proxy_started, 1)
+
+    if manifest_thread is not None:
+        manifest_thread.join()
+    metrics["status"] = "OK" if proxy.get("ok", True) else "PROXY_FAILED"
+
     return {
         "ok": True,
         "reason": "OK",
@@ -181,7 +527,19 @@ def ingest_one_card_parallel(
         "ssd_log": log_ssd,
         "sd_used": sd_used,
         "required": required,
-        "message": "Copy OK to both destinations.",
+        "ssd_required": ssd_required,
+        "bytes_copied": bytes_copied,
+        "copy_seconds": copy_seconds,
+        "metrics": metrics,
+        "estimate": {"seconds": round(eta_seconds, 1), "bottleneck": eta_bottleneck},
+        "proxy": proxy,
+        "media": summarize_media(infos.values()),
+        "media_sheet": str(media_sheet) if media_sheet else "",
+        "manifest": manifest,
+        "message": (
+            "Copy OK to both destinations." if keep_originals_on_proxy
+            else "Copy OK to Archive (proxy-only SSD)."
+        ),
     }
 
 
@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import re
+import threading
+import uuid
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .proxy_cache import DEFAULT_CACHE_GB
+from .state_store import FileLock, json_state
+
+
+QUEUE_NAME = "ingest_queue.json"
+
+QUEUED = "QUEUED"
+HELD = "HELD"           # left unfinished by an earlier run; waits for resume()
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+CANCELED = "CANCELED"
+ACTIVE_STATES = (QUEUED, HELD, RUNNING)
+
+MAX_PARALLEL = 2        # only cards going to different drives ever run side by side
+KEEP_FINISHED = 200     # finished jobs kept in the queue file
+LOCK_RETRY_S = 2.0      # how often a job waiting on another process's drive looks again
+DRIVE_LOCKS_DIR = "drive_locks"
+
+
+@dataclass(frozen=True)
+class IngestArgs:
+    sd_root: str
+    archive_root: str
+    ssd_root: str
+    base_folder_name: str
+    client_project: str
+    ingest_date: str
+    sd_index: int
+    keep_originals_on_proxy: bool = True
+    proxy_cache_max_bytes: int = int(DEFAULT_CACHE_GB * 1024**3)
+    probe_cache_path: str = ""
+    manifest_path: str = ""
+    catalog_path: str = ""
+    profiles_path: str = ""
+    card_fingerprint: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestArgs":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def roots(self) -> set:
+        # Drives this job reads or writes
+        return {r for r in (self.sd_root, self.archive_root, self.ssd_root) if r}
+
+
+@dataclass(frozen=True)
+class IngestJob:
+    id: str
+    args: IngestArgs
+    priority: int = 0          # lower runs first; same priority runs in submit order
+    seq: int = 0
+    state: str = QUEUED
+    tag: str = ""              # who submitted it, e.g. a GUI session - for filtering
+    source_serial: str = ""    # card volume serial at submit; checked again before copying
+    submitted_at: str = ""
+    started_at: str = ""
+    finished_at: str = ""
+    error: str = ""
+    result: Optional[dict] = None
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "args": asdict(self.args)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestJob":
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in known}
+        values["args"] = IngestArgs.from_dict(data.get("args") or {})
+        return cls(**values)
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def run_ingest(args: IngestArgs) -> dict:
+    # Imported here so reading / editing the queue doesn't pull in the engine
+    from .ingest_engine import ingest_one_card_parallel
+
+    return ingest_one_card_parallel(**asdict(args))
+
+
+def drive_lock(lock_dir: Path, root: str) -> FileLock:
+    """
+    The station-wide lock for one drive root: held for the whole job by whichever
+    process (GUI, headless runner) copies from / to that drive.
+    """
+    key = os.path.normcase(os.path.abspath(root)).strip("\\/") or "root"
+    return FileLock(Path(lock_dir) / (re.sub(r"[^A-Za-z0-9_.-]+", "_", key) + ".lock"))
+
+
+def _current_serial(root: str) -> str:
+    from .drives import get_volume_info
+
+    try:
+        return get_volume_info(root)[1]
+    except Exception:
+        return ""
+
+
+class IngestQueue:
+    """
+    Long-lived ingest service: cards are submitted as jobs and copied by worker
+    threads in priority order, while more cards are queued behind them.
+
+    Two jobs never share a drive (card, archive or SSD) - cards going to the
+    same archive copy one after the other, cards going to different drives run
+    side by side, up to max_parallel at once. The same holds across processes:
+    a job holds a lock file per drive (lock_dir, next to the queue file), so the
+    GUI and a headless runner on one station never copy to one drive at once; a
+    job whose drive is busy elsewhere stays queued and is retried.
+
+    Every job and its state is saved to the queue file (station-local, next to
+    settings.json). Jobs an earlier run left queued or running come back HELD:
+    the card in that slot may have changed, so they only run after resume().
+    Before a job starts, the card at sd_root is checked against the volume
+    serial it was queued with.
+
+    Subscribers are called from the worker threads with the IngestJob on every
+    state change (Qt code should go through ui.queue_watcher.QueueWatcher).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_parallel: int = MAX_PARALLEL,
+        runner: Callable[[IngestArgs], dict] = run_ingest,
+        lock_dir: Optional[Path] = None,
+    ):
+        self.state = json_state(Path(path))
+        self.lock_dir = Path(lock_dir) if lock_dir else Path(path).resolve().parent / DRIVE_LOCKS_DIR
+        self.max_parallel = max(1, max_parallel)
+        self.runner = runner
+
+        self._cond = threading.Condition()
+        self._jobs: Dict[str, IngestJob] = {}
+        self._seq = 0
+        self._subscribers: List[Callable[[IngestJob], None]] = []
+        self._threads: List[threading.Thread] = []
+        self._stop = False
+        self._load()
+
+    # ---------- persistence ----------
+    def _load(self) -> None:
+        raw = self.state.read(default={})
+        for data in (raw.get("jobs") if isinstance(raw, dict) else None) or []:
+            try:
+                job = IngestJob.from_dict(data)
+            except (TypeError, ValueError):
+                continue
+            if job.state in (QUEUED, RUNNING):
+                job = replace(job, state=HELD, error="interrupted - the app closed before this card finished")
+            self._jobs[job.id] = job
+            self._seq = max(self._seq, job.seq)
+
+    def _save(self) -> None:
+        # Caller holds the lock
+        jobs = sorted(self._jobs.values(), key=lambda j: j.seq)
+        finished = [j for j in jobs if not j.active]
+        for j in finished[:-KEEP_FINISHED]:
+            del self._jobs[j.id]
+        self.state.write({"jobs": [j.to_dict() for j in jobs if j.id in self._jobs]})
+
+    # ---------- lifecycle ----------
+    def start(self) -> "IngestQueue":
+        with self._cond:
+            if not self._threads:
+                self._stop = False
+                for i in range(self.max_parallel):
+                    t = threading.Thread(target=self._run, name=f"ingest-queue-{i}", daemon=True)
+                    self._threads.append(t)
+                    t.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops taking new jobs. A copy in progress can't be interrupted; it keeps
+        its thread until done (or the process exits, leaving it HELD next run).
+        """
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for t in threads:
+            t.join(timeout)
+        self.state.flush()
+
+    # ---------- jobs ----------
+    def submit(self, args: IngestArgs, *, priority: int = 0, tag: str = "", source_serial: str = "") -> IngestJob:
+        with self._cond:
+            self._seq += 1
+            job = IngestJob(
+                id=uuid.uuid4().hex[:12],
+                args=args,
+                priority=priority,
+                seq=self._seq,
+                tag=tag,
+                source_serial=source_serial,
+                submitted_at=_now(),
+            )
+            self._jobs[job.id] = job
+            self._save()
+            self._cond.notify_all()
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued or held job. Running copies can't be canceled (False).
+        """
+        return self._set_state(job_id, (QUEUED, HELD), CANCELED, finished_at=_now()) is not None
+
+    def resume(self, job_id: str) -> bool:
+        return self._set_state(job_id, (HELD,), QUEUED, error="") is not None
+
+    def resume_held(self) -> int:
+        return sum(self.resume(j.id) for j in self.jobs(states=(HELD,)))
+
+    def set_priority(self, job_id: str, priority: int) -> bool:
+        return self._set_state(job_id, (QUEUED, HELD), None, priority=priority) is not None
+
+    def job(self, job_id: str) -> Optional[IngestJob]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, *, tag: Optional[str] = None, states: Optional[tuple] = None) -> List[IngestJob]:
+        """
+        Jobs in run order (active ones by priority first, then finished ones).
+        """
+        with self._cond:
+            found = list(self._jobs.values())
+        if tag is not None:
+            found = [j for j in found if j.tag == tag]
+        if states is not None:
+            found = [j for j in found if j.state in states]
+        return sorted(found, key=lambda j: (not j.active, j.priority if j.active else 0, j.seq))
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[IngestJob]:
+        """
+        Blocks until the job is finished (or timeout); returns it as it is then.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: not (job_id in self._jobs and self._jobs[job_id].active), timeout)
+            return self._jobs.get(job_id)
+
+    def wait_idle(self, *, tag: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until no queued or running jobs are left (held ones don't count).
+        """
+        def idle():
+            return not any(
+                j.state in (QUEUED, RUNNING) and (tag is None or j.tag == tag) for j in self._jobs.values()
+            )
+        with self._cond:
+            return self._cond.wait_for(idle, timeout)
+
+    # ---------- change notifications ----------
+    def subscribe(self, callback: Callable[[IngestJob], None]) -> Callable[[], None]:
+        with self._cond:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._cond:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify(self, job: IngestJob) -> None:
+        with self._cond:
+            subscribers = list(self._subscribers)
+        for cb in subscribers:
+            try:
+                cb(job)
+            except Exception:
+                pass
+
+    def _set_state(self, job_id: str, allowed: tuple, state: Optional[str], **changes) -> Optional[IngestJob]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in allowed:
+                return None
+            job = self._jobs[job_id] = replace(job, state=state or job.state, **changes)
+            self._save()
+            self._cond.notify_all()
+        self._notify(job)
+        return job
+
+    # ---------- workers ----------
+    def _take_next(self) -> tuple[Optional[IngestJob], list, list]:
+        """
+        Caller holds the lock. Highest priority queued job whose drives are free
+        here and not locked by another process: (job, its drive locks, jobs whose
+        "waiting for" note changed).
+        """
+        busy = set()
+        for j in self._jobs.values():
+            if j.state == RUNNING:
+                busy |= j.args.roots()
+        queued = sorted((j for j in self._jobs.values() if j.state == QUEUED), key=lambda j: (j.priority, j.seq))
+        noted = []
+        for j in queued:
+            if j.args.roots() & busy:
+                continue
+            locks, blocked = [], ""
+            for root in sorted(j.args.roots()):
+                lock = drive_lock(self.lock_dir, root)
+                if not lock.acquire(blocking=False):
+                    blocked = root
+                    break
+                locks.append(lock)
+            if not blocked:
+                return j, locks, noted
+            for lock in locks:
+                lock.release()
+            note = f"waiting for {blocked} (in use by another ingest on this station)"
+            if j.error != note:
+                self._jobs[j.id] = replace(j, error=note)
+                noted.append(self._jobs[j.id])
+        return None, [], noted
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stop:
+                        return
+                    job, locks, noted = self._take_next()
+                    if job is not None or noted:
+                        break
+                    # Nothing runnable: woken by submit / finish, or retried for other processes' locks
+                    self._cond.wait(LOCK_RETRY_S)
+                if job is not None:
+                    job = self._jobs[job.id] = replace(job, state=RUNNING, started_at=_now(), error="")
+                self._save()
+            for j in noted:
+                if job is None or j.id != job.id:
+                    self._notify(j)
+            if job is None:
+                continue
+            self._notify(job)
+
+            try:
+                serial = _current_serial(job.args.sd_root) if job.source_serial else ""
+                if job.source_serial and serial != job.source_serial:
+                    raise RuntimeError(
+                        f"the card in {job.args.sd_root} is not the one queued "
+                        f"(volume {serial or 'missing'}, expected {job.source_serial})"
+                    )
+                result = self.runner(job.args)
+                # Plain JSON only (log paths etc. become strings) - it goes in the queue file
+                result = json.loads(json.dumps(result, default=str))
+                state, error = (DONE, "") if result.get("ok") else (FAILED, result.get("message") or "Unknown error")
+            except Exception as e:
+                result, state, error = None, FAILED, str(e)
+            finally:
+                for lock in locks:
+                    lock.release()
+
+            with self._cond:
+                job = self._jobs[job.id] = replace(
+                    self._jobs.get(job.id, job), state=state, error=error, result=result, finished_at=_now()
+                )
+                self._save()
+                self._cond.notify_all()
+            self._notify(job)
+
+
+_queues: Dict[Path, IngestQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_ingest_queue(path: Path) -> IngestQueue:
+    """
+    The process-wide queue for a queue file (started on first use).
+    """
+    key = Path(path).resolve()
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = IngestQueue(key).start()
+        return queue
+
+
+@atexit.register
+def stop_ingest_queues() -> None:
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for q in queues:
+        q.stop(timeout=0)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import asdict
+import json
+import re
+import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from ..models import JobConfig
 
@@ -20,41 +23,532 @@ LEDGER_HEADERS = [
     "archive_drive",
     "proxy_drive",
     "keep_originals_on_proxy",
+    "total_bytes",
+    "copy_seconds",
 ]
+NUMERIC_HEADERS = {"num_cards": int, "total_bytes": int, "copy_seconds": float}
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id                      INTEGER PRIMARY KEY,
+    session_started_at      TEXT NOT NULL,
+    session_finished_at     TEXT NOT NULL DEFAULT '',
+    status                  TEXT NOT NULL DEFAULT '',
+    mode                    TEXT NOT NULL DEFAULT '',
+    client                  TEXT NOT NULL DEFAULT '',
+    project                 TEXT NOT NULL DEFAULT '',
+    num_cards               INTEGER NOT NULL DEFAULT 0,
+    archive_drive           TEXT NOT NULL DEFAULT '',
+    proxy_drive             TEXT NOT NULL DEFAULT '',
+    keep_originals_on_proxy TEXT NOT NULL DEFAULT '',
+    total_bytes             INTEGER NOT NULL DEFAULT 0,
+    copy_seconds            REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_sessions_client  ON sessions(client);
+CREATE INDEX IF NOT EXISTS ix_sessions_project ON sessions(project);
+CREATE INDEX IF NOT EXISTS ix_sessions_started ON sessions(session_started_at);
+CREATE INDEX IF NOT EXISTS ix_sessions_status  ON sessions(status);
+CREATE INDEX IF NOT EXISTS ix_sessions_cards   ON sessions(num_cards);
+CREATE INDEX IF NOT EXISTS ix_sessions_archive ON sessions(archive_drive);
+CREATE INDEX IF NOT EXISTS ix_sessions_proxy   ON sessions(proxy_drive);
 
-def append_session_row(
-    ledger_path: Path,
+-- One row per card of a session: the historical performance record
+CREATE TABLE IF NOT EXISTS card_runs (
+    id              INTEGER PRIMARY KEY,
+    session_id      INTEGER NOT NULL REFERENCES sessions(id),
+    sd_name         TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT '',
+    bytes           INTEGER NOT NULL DEFAULT 0,
+    files           INTEGER NOT NULL DEFAULT 0,
+    archive_seconds REAL NOT NULL DEFAULT 0,
+    ssd_seconds     REAL NOT NULL DEFAULT 0,
+    archive_mb_s    REAL NOT NULL DEFAULT 0,
+    ssd_mb_s        REAL NOT NULL DEFAULT 0,
+    hash_seconds    REAL NOT NULL DEFAULT 0,
+    proxy_seconds   REAL NOT NULL DEFAULT 0,
+    retries         INTEGER NOT NULL DEFAULT 0,
+    params          TEXT NOT NULL DEFAULT '{}',  -- JSON: backend + tuning (robocopy /MT, /R, /W ...)
+    fingerprint     TEXT NOT NULL DEFAULT ''     -- card_fingerprint: spots a card ingested twice
+);
+CREATE INDEX IF NOT EXISTS ix_card_runs_session ON card_runs(session_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# Full-text index over the columns people search by. External-content table:
+# the text lives once in `sessions`, triggers keep the index in step.
+SEARCH_COLUMNS = [
+    "session_started_at", "status", "mode", "client", "project", "archive_drive", "proxy_drive",
+]
+SEARCH_ALIASES = {
+    "date": "session_started_at",
+    "started": "session_started_at",
+    "mybook": "archive_drive",
+    "archive": "archive_drive",
+    "ssd": "proxy_drive",
+    "proxy": "proxy_drive",
+}
+
+_FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+    {", ".join(SEARCH_COLUMNS)},
+    content='sessions', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 2"
+);
+CREATE TRIGGER IF NOT EXISTS sessions_fts_ai AFTER INSERT ON sessions BEGIN
+    INSERT INTO sessions_fts(rowid, {", ".join(SEARCH_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in SEARCH_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_fts_ad AFTER DELETE ON sessions BEGIN
+    INSERT INTO sessions_fts(sessions_fts, rowid, {", ".join(SEARCH_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in SEARCH_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_fts_au AFTER UPDATE ON sessions BEGIN
+    INSERT INTO sessions_fts(sessions_fts, rowid, {", ".join(SEARCH_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in SEARCH_COLUMNS)});
+    INSERT INTO sessions_fts(rowid, {", ".join(SEARCH_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in SEARCH_COLUMNS)});
+END;
+"""
+
+
+def legacy_csv_path(ledger_path: Path) -> Path:
+    """
+    The old ingest_ledger.csv that sits next to ingest_ledger.db.
+    """
+    return Path(ledger_path).with_suffix(".csv")
+
+
+def connect(ledger_path: Path) -> sqlite3.Connection:
+    """
+    Opens (and if needed creates) the SQLite ledger in WAL mode.
+    On first open, rows from the legacy CSV next to it are imported once.
+    """
+    ledger_path = Path(ledger_path)
+    ledger_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(ledger_path), timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _add_missing_columns(conn)
+    _ensure_fts(conn)
+    _import_csv_once(conn, legacy_csv_path(ledger_path))
+    return conn
+
+
+# Columns added after the first SQLite ledger shipped (older dbs get them via ALTER TABLE)
+_ADDED_COLUMNS = {
+    "total_bytes": "INTEGER NOT NULL DEFAULT 0",
+    "copy_seconds": "REAL NOT NULL DEFAULT 0",
+}
+
+
+_ADDED_CARD_COLUMNS = {
+    "fingerprint": "TEXT NOT NULL DEFAULT ''",
+}
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    have = {r[1] for r in conn.execute("PRAGMA table_info(sessions)")}
+    have_cards = {r[1] for r in conn.execute("PRAGMA table_info(card_runs)")}
+    with conn:
+        for col, decl in _ADDED_COLUMNS.items():
+            if col not in have:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {col} {decl}")
+        for col, decl in _ADDED_CARD_COLUMNS.items():
+            if col not in have_cards:
+                conn.execute(f"ALTER TABLE card_runs ADD COLUMN {col} {decl}")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_card_runs_fingerprint ON card_runs(fingerprint)")
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> None:
+    """
+    Creates the FTS5 index (and backfills it for ledgers that predate it).
+    Python builds without FTS5 just fall back to LIKE searches.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions_fts'"
+    ).fetchone()
+    if exists:
+        return
+    try:
+        with conn:
+            conn.executescript(_FTS_SCHEMA)
+            conn.execute("INSERT INTO sessions_fts(sessions_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        pass
+
+
+def fts_schemas(conn: sqlite3.Connection) -> List[str]:
+    """
+    Schemas (main, attached partitions, and temp for the years loaded past the
+    ATTACH limit) that have a sessions_fts index.
+    """
+    schemas = []
+    for _seq, name, _file in conn.execute("PRAGMA database_list").fetchall():
+        if conn.execute(
+            f"SELECT 1 FROM {name}.sqlite_master WHERE type = 'table' AND name = 'sessions_fts'"
+        ).fetchone():
+            schemas.append(name)
+    return schemas
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    return "main" in fts_schemas(conn)
+
+
+def _import_csv_once(conn: sqlite3.Connection, csv_path: Path) -> None:
+    done = conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+    if done:
+        return
+
+    rows = []
+    if csv_path.exists():
+        with csv_path.open("r", newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                row = {h: (r.get(h) or "").strip() for h in LEDGER_HEADERS}
+                for h, kind in NUMERIC_HEADERS.items():
+                    try:
+                        row[h] = kind(row[h] or 0)
+                    except ValueError:
+                        row[h] = kind(0)
+                if row["session_started_at"]:
+                    rows.append(row)
+
+    # Another process may be opening the ledger at the same moment: re-check under the write lock
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'csv_imported'").fetchone() is None:
+            if rows:
+                conn.executemany(_insert_sql(), [tuple(r[h] for h in LEDGER_HEADERS) for r in rows])
+            conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('csv_imported', ?)",
+                (f"{len(rows)} rows from {csv_path.name} at {datetime.now():%Y-%m-%d %H:%M:%S}",),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# Ids stay unique across yearly partitions (ledger_partitions): after old rows are
+# moved out, new ids continue above meta.id_floor instead of restarting at 1.
+_NEXT_ID = (
+    "(SELECT MAX(COALESCE(MAX(id), 0), "
+    "COALESCE((SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'id_floor'), 0)) + 1 FROM sessions)"
+)
+
+
+def _insert_sql() -> str:
+    cols = ", ".join(LEDGER_HEADERS)
+    marks = ", ".join("?" for _ in LEDGER_HEADERS)
+    return f"INSERT INTO sessions (id, {cols}) VALUES ({_NEXT_ID}, {marks})"
+
+
+CARD_RUN_FIELDS = [
+    "sd_name", "status", "bytes", "files",
+    "archive_seconds", "ssd_seconds", "archive_mb_s", "ssd_mb_s",
+    "hash_seconds", "proxy_seconds", "retries", "params", "fingerprint",
+]
+
+
+def session_row(
     *,
     started_at: datetime,
     finished_at: Optional[datetime],
     status: str,
     job: JobConfig,
-) -> None:
-    """
-    Append one row per ingest session.
-
-    This is the human-friendly studio ledger (ingest PC only).
-    """
-    ledger_path.parent.mkdir(parents=True, exist_ok=True)
-    is_new = not ledger_path.exists()
-    print(f'append_session_row {job}')
+    total_bytes: int = 0,
+    copy_seconds: float = 0.0,
+) -> dict:
+    try:
+        num_cards = int(job.num_cards)
+    except (TypeError, ValueError):
+        num_cards = 0
 
-    row = {
+    return {
         "session_started_at": started_at.strftime("%Y-%m-%d %H:%M:%S"),
         "session_finished_at": finished_at.strftime("%Y-%m-%d %H:%M:%S") if finished_at else "",
         "status": status,
         "mode": job.mode,
         "client": job.client_name,
         "project": job.project_name,
-        "num_cards": job.num_cards,
+        "num_cards": num_cards,
         "archive_drive": job.archive_drive_display or job.archive_path,
         "proxy_drive": job.proxy_drive_display or job.proxy_path,
         "keep_originals_on_proxy": "Yes" if job.keep_originals_on_proxy else "No",
+        "total_bytes": int(total_bytes),
+        "copy_seconds": round(float(copy_seconds), 1),
     }
 
-    with ledger_path.open("a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=LEDGER_HEADERS)
-        if is_new:
-            w.writeheader()
-        w.writerow(row)
+
+def append_session_row(
+    ledger_path: Path,
+    *,
+    started_at: datetime,
+    finished_at: Optional[datetime],
+    status: str,
+    job: JobConfig,
+    total_bytes: int = 0,
+    copy_seconds: float = 0.0,
+    cards: Optional[List[dict]] = None,
+    wait: bool = True,
+) -> None:
+    """
+    Append one row per ingest session.
+
+    This is the human-friendly studio ledger (ingest PC only).
+    total_bytes / copy_seconds (summed over the session's cards) feed the analytics;
+    cards are the engine's per-card metrics dicts, stored in card_runs.
+
+    Goes through the process's single ledger writer (see ledger_writer). With
+    wait=False it returns once queued; the row is committed with the next batch.
+    """
+    from .ledger_writer import get_writer
+
+    row = session_row(
+        started_at=started_at, finished_at=finished_at, status=status, job=job,
+        total_bytes=total_bytes, copy_seconds=copy_seconds,
+    )
+    done = get_writer(ledger_path).append(row, cards)
+    if wait:
+        done.result()
+
+
+def write_session(conn: sqlite3.Connection, row: dict, cards: Optional[List[dict]] = None) -> int:
+    """
+    Inserts a session (+ its card_runs) on conn, inside the caller's transaction. Returns the id.
+    """
+    cur = conn.execute(_insert_sql(), tuple(row.get(h, "") for h in LEDGER_HEADERS))
+    if cards:
+        conn.executemany(
+            f"INSERT INTO card_runs (session_id, {', '.join(CARD_RUN_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' for _ in CARD_RUN_FIELDS)})",
+            [(cur.lastrowid, *(_card_value(c, f) for f in CARD_RUN_FIELDS)) for c in cards],
+        )
+    return cur.lastrowid
+
+
+def _card_value(card: dict, field: str):
+    value = card.get(field)
+    if field == "params":
+        return value if isinstance(value, str) else json.dumps(value or {})
+    if field in ("sd_name", "status", "fingerprint"):
+        return str(value or "")
+    return value or 0
+
+
+def card_runs(conn: sqlite3.Connection, session_id: int) -> List[dict]:
+    rows = conn.execute(
+        f"SELECT {', '.join(CARD_RUN_FIELDS)} FROM card_runs WHERE session_id = ? ORDER BY id",
+        (session_id,),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def load_rows(ledger_path: Path) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    (headers, rows) for the ledger viewer, oldest first (all partitions).
+    """
+    from .ledger_partitions import connect_all
+
+    conn = connect_all(ledger_path)
+    try:
+        cols = ", ".join(LEDGER_HEADERS)
+        cur = conn.execute(f"SELECT {cols} FROM sessions ORDER BY id")
+        rows = [{h: str(r[h]) for h in LEDGER_HEADERS} for r in cur]
+        return list(LEDGER_HEADERS), rows
+    finally:
+        conn.close()
+
+
+def export_csv(ledger_path: Path, csv_path: Path) -> int:
+    """
+    Writes the whole ledger as a CSV for humans (Excel etc.). Returns row count.
+    """
+    headers, rows = load_rows(ledger_path)
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", newline="", encoding="utf-8-sig") as f:
+        w = csv.DictWriter(f, fieldnames=headers)
+        w.writeheader()
+        w.writerows(rows)
+    return len(rows)
+
+
+def count_sessions(conn: sqlite3.Connection, where: str = "", params: tuple = ()) -> int:
+    sql = "SELECT COUNT(*) FROM sessions" + (f" WHERE {where}" if where else "")
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def page_sessions(
+    conn: sqlite3.Connection,
+    *,
+    order_by: str = "session_started_at",
+    descending: bool = True,
+    after: Optional[tuple] = None,
+    limit: int = 500,
+    where: str = "",
+    params: tuple = (),
+) -> List[sqlite3.Row]:
+    """
+    One page of sessions, keyset-paginated: pass the (order_by value, id) of the
+    last row you have as `after` to get the next page. Stays fast deep into a
+    large ledger, unlike OFFSET.
+
+    Sorting happens on the stored types (ISO dates, integer num_cards).
+
+    With yearly partitions attached (ledger_partitions), date-ordered pages read
+    one partition at a time in date order and skip years the page can't reach.
+    """
+    if order_by not in LEDGER_HEADERS:
+        raise ValueError(f"unknown ledger column: {order_by}")
+
+    direction = "DESC" if descending else "ASC"
+    clauses = [f"({where})"] if where else []
+    args = list(params)
+    if after is not None:
+        clauses.append(f"({order_by}, id) {'<' if descending else '>'} (?, ?)")
+        args += [after[0], after[1]]
+
+    def _page(table: str, n: int) -> List[sqlite3.Row]:
+        sql = f"SELECT id, {', '.join(LEDGER_HEADERS)} FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {direction}, id {direction} LIMIT ?"
+        return conn.execute(sql, [*args, n]).fetchall()
+
+    years = _partition_years(conn)
+    if order_by != "session_started_at" or not (years or _has_old_sessions(conn)):
+        return _page("sessions", limit)
+
+    # main holds the newest years, each pYYYY exactly one older year
+    after_year = int(str(after[0])[:4]) if after is not None and str(after[0])[:4].isdigit() else None
+    tables = [("main.sessions", None)] + [(f"p{y}.sessions", y) for y in sorted(years, reverse=True)]
+    if _has_old_sessions(conn):
+        tables.append(("temp.old_sessions", None))  # years past the ATTACH limit, oldest of all
+    if not descending:
+        tables.reverse()
+
+    rows: List[sqlite3.Row] = []
+    for table, year in tables:
+        if year is not None and after_year is not None:
+            if (descending and year > after_year) or (not descending and year < after_year):
+                continue  # pruned: everything in it is before the cursor
+        rows += _page(table, limit - len(rows))
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _has_old_sessions(conn: sqlite3.Connection) -> bool:
+    # Partitions loaded into TEMP past the ATTACH limit (see ledger_partitions._load_overflow)
+    return conn.execute(
+        "SELECT 1 FROM temp.sqlite_master WHERE type = 'table' AND name = 'old_sessions'"
+    ).fetchone() is not None
+
+
+def _partition_years(conn: sqlite3.Connection) -> List[int]:
+    # Attached yearly partitions are named pYYYY (see ledger_partitions.attach_partitions)
+    return [
+        int(name[1:]) for _seq, name, _file in conn.execute("PRAGMA database_list").fetchall()
+        if len(name) == 5 and name[0] == "p" and name[1:].isdigit()
+    ]
+
+
+def sessions_after(
+    conn: sqlite3.Connection,
+    last_id: int,
+    *,
+    where: str = "",
+    params: tuple = (),
+) -> List[sqlite3.Row]:
+    """
+    Sessions added since row id last_id (ids only grow), for tailing the ledger.
+    """
+    sql = f"SELECT id, {', '.join(LEDGER_HEADERS)} FROM sessions WHERE id > ?"
+    if where:
+        sql += f" AND ({where})"
+    sql += " ORDER BY id"
+    return conn.execute(sql, (last_id, *params)).fetchall()
+
+
+def max_session_id(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+
+
+_TERM_RE = re.compile(r'(?:(\w+):)?("[^"]*"?|\S+)')
+
+
+def parse_search(text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    'client:Iriya status:FAILED "big day"' -> [("client", "Iriya"), ("status", "FAILED"), (None, "big day")]
+    Unknown field names are kept as plain words (so "C:" style text still searches).
+    """
+    terms = []
+    for m in _TERM_RE.finditer(text or ""):
+        field, value = m.group(1), m.group(2).strip('"').strip()
+        if field:
+            col = SEARCH_ALIASES.get(field.lower(), field.lower())
+            if col not in SEARCH_COLUMNS:
+                value, col = f"{field}:{value}", None
+            field = col
+        if value:
+            terms.append((field, value))
+    return terms
+
+
+@dataclass(frozen=True)
+class SessionFilter:
+    where: str = ""
+    params: tuple = ()
+    count: Optional[int] = None   # known match count, saves a COUNT(*) over the join
+
+
+# Below this share of the ledger, drive the query from the match set and sort it;
+# above it, walk the sort column's index and stop after one page.
+_SELECTIVE_SHARE = 0.02
+
+
+def search_filter(conn: sqlite3.Connection, text: str) -> SessionFilter:
+    """
+    Filter for page_sessions/count_sessions. Every term must match;
+    words match as prefixes, field:value limits a term to one column.
+    """
+    terms = parse_search(text)
+    if not terms:
+        return SessionFilter()
+
+    schemas = fts_schemas(conn)
+    if "main" in schemas:
+        parts = []
+        for field, value in terms:
+            phrase = '"' + value.replace('"', '""') + '"*'
+            parts.append(f"{field} : {phrase}" if field else phrase)
+        match = " AND ".join(parts)
+        # One arm per partition index (ids are unique across partitions)
+        arms = " UNION ALL ".join(
+            f"SELECT rowid FROM {s}.sessions_fts WHERE sessions_fts MATCH ?" for s in schemas
+        )
+        n = conn.execute(f"SELECT COUNT(*) FROM ({arms})", (match,) * len(schemas)).fetchone()[0]
+        # "+id" stops SQLite from using the match list as the driving loop
+        selective = n < _SELECTIVE_SHARE * max_session_id(conn)
+        return SessionFilter(
+            f"{'' if selective else '+'}id IN ({arms})",
+            (match,) * len(schemas),
+            n,
+        )
+
+    clauses = []
+    params: list = []
+    for field, value in terms:
+        cols = [field] if field else SEARCH_COLUMNS
+        clauses.append("(" + " OR ".join(f"{c} LIKE ?" for c in cols) + ")")
+        params += [f"%{value}%"] * len(cols)
+    return SessionFilter(" AND ".join(clauses), tuple(params))
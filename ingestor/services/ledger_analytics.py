@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+from .ledger_partitions import connect_all
+
+
+# All aggregation runs inside SQLite (GROUP BY over the indexed sessions table,
+# across the yearly partitions), so the panel costs a handful of queries however long the ledger gets.
+_FAILED = "status <> 'OK' AND status <> ''"
+MAX_PROJECT_ROWS = 500
+
+
+def _rows(conn, sql: str, params: tuple = ()) -> List[dict]:
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def _since_clause(since: str) -> tuple[str, tuple]:
+    # since: "YYYY-MM-DD" ("" = whole ledger)
+    return ("WHERE session_started_at >= ?", (since,)) if since else ("", ())
+
+
+def ledger_stats(ledger_path: Path, *, since: str = "") -> dict:
+    """
+    Totals for the analytics panel:
+      totals      - sessions, cards, bytes, failures, failure_rate
+      clients     - per client
+      projects    - per client + project (most recent MAX_PROJECT_ROWS)
+      per_day     - bytes / sessions per ingest day
+      drive_pairs - per (archive, SSD) pair, with average MB/s over the copy time
+      archives    - bytes written per archive drive (capacity planning)
+      card_speeds - per archive drive and month, average card MB/s and retries
+                    (a drive or reader getting slower shows up here)
+    """
+    where, params = _since_clause(since)
+    # Only the yearly partitions the range touches are opened
+    conn = connect_all(ledger_path, since=since)
+    try:
+        totals = dict(conn.execute(
+            f"""
+            SELECT COUNT(*) AS sessions,
+                   COALESCE(SUM(num_cards), 0) AS cards,
+                   COALESCE(SUM(total_bytes), 0) AS bytes,
+                   COALESCE(SUM({_FAILED}), 0) AS failed,
+                   MIN(substr(session_started_at, 1, 10)) AS first_day,
+                   MAX(substr(session_started_at, 1, 10)) AS last_day
+            FROM sessions {where}
+            """,
+            params,
+        ).fetchone())
+        totals["failure_rate"] = totals["failed"] / totals["sessions"] if totals["sessions"] else 0.0
+
+        group_cols = f"""
+            COUNT(*) AS sessions,
+            SUM(num_cards) AS cards,
+            SUM(total_bytes) AS bytes,
+            SUM({_FAILED}) AS failed,
+            ROUND(1.0 * SUM({_FAILED}) / COUNT(*), 3) AS failure_rate,
+            MAX(session_started_at) AS last_session
+        """
+        clients = _rows(
+            conn,
+            f"SELECT client, {group_cols} FROM sessions {where} GROUP BY client ORDER BY bytes DESC, sessions DESC",
+            params,
+        )
+        projects = _rows(
+            conn,
+            f"SELECT client, project, {group_cols} FROM sessions {where} "
+            "GROUP BY client, project ORDER BY last_session DESC LIMIT ?",
+            (*params, MAX_PROJECT_ROWS),
+        )
+        per_day = _rows(
+            conn,
+            f"""
+            SELECT substr(session_started_at, 1, 10) AS day,
+                   COUNT(*) AS sessions,
+                   SUM(num_cards) AS cards,
+                   SUM(total_bytes) AS bytes
+            FROM sessions {where}
+            GROUP BY day ORDER BY day DESC
+            """,
+            params,
+        )
+        # MB/s only over sessions that recorded a copy time (older rows have none)
+        drive_pairs = _rows(
+            conn,
+            f"""
+            SELECT archive_drive, proxy_drive,
+                   COUNT(*) AS sessions,
+                   SUM(total_bytes) AS bytes,
+                   SUM(copy_seconds) AS seconds,
+                   ROUND(SUM(CASE WHEN copy_seconds > 0 THEN total_bytes END) / 1048576.0  -- MiB/s, as volume_profile.mb_per_s
+                         / NULLIF(SUM(CASE WHEN copy_seconds > 0 THEN copy_seconds END), 0), 1) AS mb_s,
+                   ROUND(1.0 * SUM({_FAILED}) / COUNT(*), 3) AS failure_rate
+            FROM sessions {where}
+            GROUP BY archive_drive, proxy_drive ORDER BY bytes DESC
+            """,
+            params,
+        )
+        archives = _rows(
+            conn,
+            f"""
+            SELECT archive_drive,
+                   SUM(total_bytes) AS bytes,
+                   COUNT(DISTINCT substr(session_started_at, 1, 10)) AS days,
+                   MAX(session_started_at) AS last_session
+            FROM sessions {where}
+            GROUP BY archive_drive ORDER BY bytes DESC
+            """,
+            params,
+        )
+        card_speeds = _rows(
+            conn,
+            f"""
+            SELECT s.archive_drive,
+                   substr(s.session_started_at, 1, 7) AS month,
+                   COUNT(*) AS cards,
+                   ROUND(AVG(NULLIF(c.archive_mb_s, 0)), 1) AS archive_mb_s,
+                   ROUND(AVG(NULLIF(c.ssd_mb_s, 0)), 1) AS ssd_mb_s,
+                   SUM(c.retries) AS retries
+            FROM card_runs c JOIN sessions s ON s.id = c.session_id
+            {where.replace("session_started_at", "s.session_started_at")}
+            GROUP BY s.archive_drive, month ORDER BY month DESC, s.archive_drive
+            """,
+            params,
+        )
+    finally:
+        conn.close()
+
+    return {
+        "totals": totals,
+        "clients": clients,
+        "projects": projects,
+        "per_day": per_day,
+        "drive_pairs": drive_pairs,
+        "archives": archives,
+        "card_speeds": card_speeds,
+    }
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+from .ledger import LEDGER_HEADERS, CARD_RUN_FIELDS, SEARCH_COLUMNS, connect
+
+
+# The live ledger (ingest_ledger.db) keeps the current and previous year.
+# Older sessions move to ingest_ledger_<year>.db next to it: written once, vacuumed,
+# then only read. Readers attach them and see one `sessions` table.
+HOT_YEARS = 2
+
+# SQLite's ATTACH limit is 10 by default (and can't be raised at runtime). The newest
+# years are attached; older ones are copied into TEMP tables, one ATTACH at a time
+MAX_ATTACHED = 9
+
+
+def partition_path(ledger_path: Path, year: int) -> Path:
+    ledger_path = Path(ledger_path)
+    return ledger_path.with_name(f"{ledger_path.stem}_{year}{ledger_path.suffix}")
+
+
+def list_partitions(ledger_path: Path) -> Dict[int, Path]:
+    """
+    {year: path} of the cold partitions next to the ledger.
+    """
+    ledger_path = Path(ledger_path)
+    pattern = re.compile(rf"^{re.escape(ledger_path.stem)}_(\d{{4}}){re.escape(ledger_path.suffix)}$")
+    found = {}
+    if ledger_path.parent.exists():
+        for p in ledger_path.parent.iterdir():
+            m = pattern.match(p.name)
+            if m:
+                found[int(m.group(1))] = p
+    return dict(sorted(found.items()))
+
+
+def _cols() -> str:
+    return ", ".join(["id", *LEDGER_HEADERS])
+
+
+def _select_list(conn: sqlite3.Connection, schema: str, table: str, cols: list[str]) -> str:
+    # Partitions written before a column was added don't have it: read those as NULL
+    have = {r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+    return ", ".join(c if c in have else f"NULL AS {c}" for c in cols)
+
+
+def attach_partitions(
+    conn: sqlite3.Connection,
+    ledger_path: Path,
+    *,
+    since: str = "",
+    until: str = "",
+) -> list[int]:
+    """
+    Attaches the partitions overlapping [since, until) ("YYYY-MM-DD", "" = open)
+    and shadows `sessions` / `card_runs` with TEMP views over all of them, so the
+    usual queries (page_sessions, search_filter, analytics...) span the whole history.
+    Partitions outside the range are never opened. Returns the attached years.
+
+    Only for reading: writes must go through a plain connect() (the writer does).
+    """
+    first = int(since[:4]) if since else None
+    last = int(until[:4]) if until else None
+    years = [
+        y for y in list_partitions(ledger_path)
+        if (first is None or y >= first) and (last is None or y <= last)
+    ]
+    card_cols = ["id", "session_id", *CARD_RUN_FIELDS]
+    # One slot stays free for loading the overflow years
+    direct = years if len(years) <= MAX_ATTACHED else years[-(MAX_ATTACHED - 1):]
+    overflow = [y for y in years if y not in direct]
+
+    attached = []
+    for y in direct:
+        try:
+            conn.execute("ATTACH DATABASE ? AS ?", (str(partition_path(ledger_path, y)), f"p{y}"))
+            attached.append(y)
+        except sqlite3.Error:
+            continue
+    loaded = _load_overflow(conn, ledger_path, overflow, card_cols)
+    if not attached and not loaded:
+        return []
+
+    # Temp objects win name resolution over main, so "sessions" now means the union
+    sources = ["main", *(f"p{y}" for y in attached)]
+    conn.execute("DROP VIEW IF EXISTS temp.sessions")
+    conn.execute("DROP VIEW IF EXISTS temp.card_runs")
+    conn.execute(
+        "CREATE TEMP VIEW sessions AS "
+        + " UNION ALL ".join(
+            [f"SELECT {_cols()} FROM {s}.sessions" for s in sources]
+            + ([f"SELECT {_cols()} FROM temp.old_sessions"] if loaded else [])
+        )
+    )
+    conn.execute(
+        "CREATE TEMP VIEW card_runs AS "
+        + " UNION ALL ".join(
+            [f"SELECT {_select_list(conn, s, 'card_runs', card_cols)} FROM {s}.card_runs" for s in sources]
+            + ([f"SELECT {', '.join(card_cols)} FROM temp.old_card_runs"] if loaded else [])
+        )
+    )
+    return sorted(attached + loaded)
+
+
+def _load_overflow(conn: sqlite3.Connection, ledger_path: Path, years: list[int], card_cols: list[str]) -> list[int]:
+    """
+    Copies the partitions that don't fit in the ATTACH limit into TEMP tables
+    (old_sessions / old_card_runs, plus a temp sessions_fts for search). Cold
+    years are a few thousand rows each, so this is quick. Returns the years loaded.
+    """
+    if not years:
+        return []
+    conn.execute("DROP TABLE IF EXISTS temp.sessions_fts")
+    conn.execute("DROP TABLE IF EXISTS temp.old_sessions")
+    conn.execute("DROP TABLE IF EXISTS temp.old_card_runs")
+    conn.execute(f"CREATE TEMP TABLE old_sessions AS SELECT {_cols()} FROM main.sessions WHERE 0")
+    conn.execute(f"CREATE TEMP TABLE old_card_runs AS SELECT {', '.join(card_cols)} FROM main.card_runs WHERE 0")
+
+    loaded = []
+    for y in years:
+        try:
+            conn.execute("ATTACH DATABASE ? AS staging", (str(partition_path(ledger_path, y)),))
+        except sqlite3.Error:
+            continue
+        try:
+            conn.execute(f"INSERT INTO temp.old_sessions SELECT {_cols()} FROM staging.sessions")
+            conn.execute(
+                f"INSERT INTO temp.old_card_runs "
+                f"SELECT {_select_list(conn, 'staging', 'card_runs', card_cols)} FROM staging.card_runs"
+            )
+            loaded.append(y)
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.commit()  # only temp tables changed; DETACH needs no open transaction
+            conn.execute("DETACH DATABASE staging")
+
+    # Same index as the partitions have, so search keeps using FTS (see search_filter)
+    try:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE temp.sessions_fts USING fts5({', '.join(SEARCH_COLUMNS)}, "
+            "content='old_sessions', content_rowid='id', tokenize=\"unicode61 remove_diacritics 2\")"
+        )
+        conn.execute("INSERT INTO temp.sessions_fts(sessions_fts) VALUES ('rebuild')")
+    except sqlite3.Error:
+        pass
+    return loaded
+
+
+def connect_all(ledger_path: Path, *, since: str = "", until: str = "") -> sqlite3.Connection:
+    """
+    Read connection over the live ledger plus its partitions (see attach_partitions).
+    """
+    conn = connect(ledger_path)
+    attach_partitions(conn, ledger_path, since=since, until=until)
+    return conn
+
+
+def compact_ledger(ledger_path: Path, *, hot_years: int = HOT_YEARS, today: Optional[date] = None) -> dict:
+    """
+    Moves whole years older than the hot window out of the live ledger into
+    ingest_ledger_<year>.db (sessions + their card_runs, ids preserved), then
+    vacuums both sides. Safe to run on every start: it only does work once a year.
+    """
+    today = today or date.today()
+    cutoff_year = today.year - hot_years + 1
+    cutoff = f"{cutoff_year:04d}-01-01"
+
+    conn = connect(ledger_path)
+    moved: dict[int, int] = {}
+    try:
+        years = [
+            int(r[0]) for r in conn.execute(
+                "SELECT DISTINCT substr(session_started_at, 1, 4) FROM sessions "
+                "WHERE session_started_at < ? AND session_started_at GLOB '[0-9][0-9][0-9][0-9]*'",
+                (cutoff,),
+            )
+        ]
+        if not years:
+            return {"moved": {}, "partitions": list(list_partitions(ledger_path))}
+
+        for y in years:
+            part = partition_path(ledger_path, y)
+            connect(part).close()  # create with the same schema (+ FTS) if new
+            lo, hi = f"{y:04d}-01-01", f"{y + 1:04d}-01-01"
+
+            # Copy first, delete second (INSERT OR IGNORE): if we die in between, the
+            # next run just finishes the move - nothing is lost.
+            conn.execute("ATTACH DATABASE ? AS part", (str(part),))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    n = conn.execute(
+                        f"INSERT OR IGNORE INTO part.sessions ({_cols()}) SELECT {_cols()} FROM main.sessions "
+                        "WHERE session_started_at >= ? AND session_started_at < ?",
+                        (lo, hi),
+                    ).rowcount
+                    card_cols = ", ".join(["id", "session_id", *CARD_RUN_FIELDS])
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO part.card_runs ({card_cols}) SELECT {card_cols} FROM main.card_runs "
+                        "WHERE session_id IN (SELECT id FROM main.sessions "
+                        "WHERE session_started_at >= ? AND session_started_at < ?)",
+                        (lo, hi),
+                    )
+                    # Keep ids growing past everything ever allocated
+                    conn.execute(
+                        "INSERT OR REPLACE INTO main.meta(key, value) VALUES ('id_floor', "
+                        "(SELECT MAX(COALESCE((SELECT CAST(value AS INTEGER) FROM main.meta WHERE key = 'id_floor'), 0), "
+                        "COALESCE(MAX(id), 0)) FROM main.sessions))"
+                    )
+                    conn.execute(
+                        "DELETE FROM main.card_runs WHERE session_id IN (SELECT id FROM main.sessions "
+                        "WHERE session_started_at >= ? AND session_started_at < ?)",
+                        (lo, hi),
+                    )
+                    conn.execute(
+                        "DELETE FROM main.sessions WHERE session_started_at >= ? AND session_started_at < ?",
+                        (lo, hi),
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.execute("DETACH DATABASE part")
+            moved[y] = n
+
+            # Cold partition: optimize the FTS index and squeeze out free pages once
+            pconn = sqlite3.connect(str(part))
+            try:
+                pconn.execute("INSERT INTO sessions_fts(sessions_fts) VALUES ('optimize')")
+                pconn.commit()
+            except sqlite3.Error:
+                pass
+            pconn.execute("PRAGMA journal_mode=DELETE")
+            pconn.execute("VACUUM")
+            pconn.close()
+
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    return {"moved": moved, "partitions": list(list_partitions(ledger_path))}
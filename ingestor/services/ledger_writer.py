@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .ledger import connect, write_session
+
+
+MAX_BATCH = 500
+
+
+class LedgerWriter:
+    """
+    The one thread in this process that writes a given ledger.
+
+    Callers queue rows and get a Future back; the thread drains whatever is
+    queued into a single BEGIN IMMEDIATE ... COMMIT, so bursts of per-card
+    records cost one fsync, not one each. Other processes / stations writing
+    the same file are serialized by SQLite's lock (busy timeout in connect()).
+    Commits use synchronous=FULL: once a Future resolves, the row survives a
+    crash or power cut.
+    """
+
+    def __init__(self, ledger_path: Path, *, max_batch: int = MAX_BATCH):
+        self.ledger_path = Path(ledger_path)
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, row: dict, cards: Optional[List[dict]] = None) -> Future:
+        if self._closed:
+            raise RuntimeError("ledger writer is closed")
+        done: Future = Future()
+        self._queue.put((row, cards or [], done))
+        return done
+
+    def flush(self) -> None:
+        """
+        Blocks until everything queued so far is committed (or failed).
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = connect(self.ledger_path)
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.isolation_level = None  # we issue BEGIN IMMEDIATE / COMMIT ourselves
+        return conn
+
+    def _run(self) -> None:
+        conn: Optional[sqlite3.Connection] = None
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            try:
+                if conn is None:
+                    conn = self._open()
+                # IMMEDIATE takes the write lock up front, so two writers never deadlock on upgrade
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    ids = [write_session(conn, row, cards) for row, cards, _ in batch]
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                for (_, _, done), row_id in zip(batch, ids):
+                    done.set_result(row_id)
+            except Exception as e:
+                for _, _, done in batch:
+                    done.set_exception(e)
+                # Reconnect next time (file may have been moved / drive dropped)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                    conn = None
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+        if conn is not None:
+            conn.close()
+
+
+_writers: Dict[Path, LedgerWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(ledger_path: Path) -> LedgerWriter:
+    key = Path(ledger_path).resolve()
+    with _writers_lock:
+        w = _writers.get(key)
+        if w is None:
+            w = _writers[key] = LedgerWriter(key)
+        return w
+
+
+@atexit.register
+def close_writers() -> None:
+    # Commit whatever is still queued before the interpreter goes away
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for w in writers:
+        w.close()
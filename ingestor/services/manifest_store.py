@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterator, List, Optional
+
+from .hashing import file_hash
+
+
+BATCH_ROWS = 5000
+
+# Compact on purpose: a year of cards is millions of rows.
+# - directories are interned (most files on a card share a handful of folders)
+# - hashes are 16-byte blobs, times are unix seconds
+# - destinations are stored once per card; file dest = card dest + dir + name
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id             INTEGER PRIMARY KEY,
+    client_project TEXT NOT NULL,
+    ingest_date    TEXT NOT NULL,
+    sd_name        TEXT NOT NULL,
+    source_root    TEXT NOT NULL DEFAULT '',
+    archive_dest   TEXT NOT NULL DEFAULT '',
+    ssd_dest       TEXT NOT NULL DEFAULT '',
+    started_at     INTEGER NOT NULL,
+    finished_at    INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (client_project, ingest_date, sd_name)
+);
+
+CREATE TABLE IF NOT EXISTS dirs (
+    id   INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    id        INTEGER PRIMARY KEY,
+    card_id   INTEGER NOT NULL REFERENCES cards(id),
+    dir_id    INTEGER NOT NULL REFERENCES dirs(id),
+    name      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime     INTEGER NOT NULL,
+    hash      BLOB,
+    copied_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_files_name ON files(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_files_hash ON files(hash);
+CREATE INDEX IF NOT EXISTS ix_files_card ON files(card_id);
+"""
+
+
+@dataclass(frozen=True)
+class ManifestHit:
+    name: str
+    rel_path: str          # path on the card, e.g. "PRIVATE/XDROOT/Clip/A001C012.MXF"
+    size: int
+    hash: str              # hex, "" if not hashed
+    client_project: str
+    ingest_date: str
+    sd_name: str
+    archive_path: str      # full path of the archive copy
+    ssd_path: str          # full path of the SSD copy ("" in proxy-only mode)
+    copied_at: str
+
+
+def connect(manifest_path: Path) -> sqlite3.Connection:
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(manifest_path), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class ManifestWriter:
+    """
+    Buffers file rows and writes them BATCH_ROWS at a time in one transaction.
+
+        with ManifestWriter(path, client_project=..., ...) as w:
+            w.add(rel_path, size, mtime, hash_hex)
+    """
+
+    def __init__(
+        self,
+        manifest_path: Path,
+        *,
+        client_project: str,
+        ingest_date: str,
+        sd_name: str,
+        source_root: str = "",
+        archive_dest: str = "",
+        ssd_dest: str = "",
+    ):
+        self.conn = connect(manifest_path)
+        self._buffer: list[tuple] = []
+        self._dir_ids: dict[str, int] = {}
+        self.count = 0
+
+        now = int(time.time())
+        with self.conn:
+            # Re-ingesting the same card slot replaces its previous rows
+            old = self.conn.execute(
+                "SELECT id FROM cards WHERE client_project = ? AND ingest_date = ? AND sd_name = ?",
+                (client_project, ingest_date, sd_name),
+            ).fetchone()
+            if old:
+                self.conn.execute("DELETE FROM files WHERE card_id = ?", (old[0],))
+                self.conn.execute("DELETE FROM cards WHERE id = ?", (old[0],))
+            cur = self.conn.execute(
+                "INSERT INTO cards (client_project, ingest_date, sd_name, source_root, "
+                "archive_dest, ssd_dest, started_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (client_project, ingest_date, sd_name, source_root, archive_dest, ssd_dest, now),
+            )
+            self.card_id = cur.lastrowid
+
+    def _dir_id(self, rel_dir: str) -> int:
+        cached = self._dir_ids.get(rel_dir)
+        if cached is not None:
+            return cached
+        self.conn.execute("INSERT OR IGNORE INTO dirs(path) VALUES (?)", (rel_dir,))
+        (dir_id,) = self.conn.execute("SELECT id FROM dirs WHERE path = ?", (rel_dir,)).fetchone()
+        self._dir_ids[rel_dir] = dir_id
+        return dir_id
+
+    def add(self, rel_path: str, size: int, mtime: float, hash_hex: str = "") -> None:
+        rel = PurePosixPath(rel_path.replace("\\", "/"))
+        self._buffer.append((
+            self.card_id,
+            str(rel.parent) if str(rel.parent) != "." else "",
+            rel.name,
+            int(size),
+            int(mtime),
+            bytes.fromhex(hash_hex) if hash_hex else None,
+            int(time.time()),
+        ))
+        if len(self._buffer) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        with self.conn:
+            rows = [
+                (card_id, self._dir_id(rel_dir), name, size, mtime, h, copied_at)
+                for card_id, rel_dir, name, size, mtime, h, copied_at in self._buffer
+            ]
+            self.conn.executemany(
+                "INSERT INTO files (card_id, dir_id, name, size, mtime, hash, copied_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.count += len(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE cards SET finished_at = ? WHERE id = ?",
+                    (int(time.time()), self.card_id),
+                )
+        finally:
+            self.conn.close()
+
+    def __enter__(self) -> "ManifestWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _iter_files(root: Path) -> Iterator[tuple[str, os.stat_result]]:
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            full = Path(dirpath) / name
+            try:
+                st = full.stat()
+            except OSError:
+                continue
+            yield str(full.relative_to(root)), st
+
+
+def record_card(
+    manifest_path: Path,
+    *,
+    copied_root: Path,
+    hash_root: Optional[Path] = None,
+    client_project: str,
+    ingest_date: str,
+    sd_name: str,
+    source_root: str = "",
+    archive_dest: str = "",
+    ssd_dest: str = "",
+    hasher: Callable[[Path], str] = file_hash,
+    on_file: Optional[Callable[[str, int, float, str], None]] = None,
+) -> int:
+    """
+    Records every file under copied_root (the archive copy). Hashes are taken
+    from hash_root/<rel> when given - use the copy the proxy stage reads, so the
+    hash memo (and in-flight sharing) means each file is only read once. Returns rows written.
+
+    on_file(rel, size, mtime, hash) sees every row too (the footage catalog uses it).
+    """
+    hash_root = Path(hash_root) if hash_root else Path(copied_root)
+    with ManifestWriter(
+        manifest_path,
+        client_project=client_project,
+        ingest_date=ingest_date,
+        sd_name=sd_name,
+        source_root=source_root,
+        archive_dest=archive_dest,
+        ssd_dest=ssd_dest,
+    ) as w:
+        for rel, st in _iter_files(Path(copied_root)):
+            try:
+                h = hasher(hash_root / rel)
+            except OSError:
+                h = ""
+            w.add(rel, st.st_size, st.st_mtime, h)
+            if on_file is not None:
+                on_file(rel, st.st_size, st.st_mtime, h)
+    return w.count
+
+
+_LOOKUP_SQL = """
+SELECT f.name, d.path, f.size, f.hash, f.copied_at,
+       c.client_project, c.ingest_date, c.sd_name, c.archive_dest, c.ssd_dest
+FROM files f
+JOIN dirs d  ON d.id = f.dir_id
+JOIN cards c ON c.id = f.card_id
+"""
+
+
+def _hits(rows) -> List[ManifestHit]:
+    hits = []
+    for name, rel_dir, size, h, copied_at, cp, day, sd, a_dest, s_dest in rows:
+        rel = f"{rel_dir}/{name}" if rel_dir else name
+        hits.append(ManifestHit(
+            name=name,
+            rel_path=rel,
+            size=size,
+            hash=h.hex() if h else "",
+            client_project=cp,
+            ingest_date=day,
+            sd_name=sd,
+            archive_path=str(Path(a_dest) / rel) if a_dest else "",
+            ssd_path=str(Path(s_dest) / rel) if s_dest else "",
+            copied_at=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(copied_at)),
+        ))
+    return hits
+
+
+def find_by_name(manifest_path: Path, name: str) -> List[ManifestHit]:
+    """
+    "Which card and date did A001C012.MXF come from?" (case-insensitive, indexed)
+    """
+    conn = connect(manifest_path)
+    try:
+        rows = conn.execute(_LOOKUP_SQL + " WHERE f.name = ? COLLATE NOCASE", (name,)).fetchall()
+        return _hits(rows)
+    finally:
+        conn.close()
+
+
+def find_by_hash(manifest_path: Path, hash_hex: str) -> List[ManifestHit]:
+    conn = connect(manifest_path)
+    try:
+        rows = conn.execute(_LOOKUP_SQL + " WHERE f.hash = ?", (bytes.fromhex(hash_hex),)).fetchall()
+        return _hits(rows)
+    finally:
+        conn.close()
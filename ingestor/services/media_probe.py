@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .state_store import json_state
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    What we need to know about a clip: enough to decide how to proxy it and
+    to describe it in the ledger / reports. Zero / "" means ffprobe couldn't tell.
+    """
+    path: str
+    duration: float = 0.0
+    container: str = ""      # ffprobe format_name, e.g. "mov,mp4,m4a,3gp,3g2,mj2"
+    video_codec: str = ""    # e.g. "h264", "hevc", "prores"
+    width: int = 0
+    height: int = 0
+    pix_fmt: str = ""        # e.g. "yuv420p", "yuv422p10le"
+    bit_rate: int = 0        # overall bits/s
+    audio_codec: str = ""
+    frame_rate: float = 0.0
+    start_timecode: str = ""  # e.g. "10:23:41:12"
+    camera_serial: str = ""
+    size: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.video_codec)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaInfo":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def _no_window_flags() -> int:
+    if os.name == "nt":
+        return subprocess.CREATE_NO_WINDOW  # type: ignore[attr-defined]
+    return 0
+
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _rate(value) -> float:
+    # ffprobe gives "30000/1001"
+    try:
+        num, _, den = str(value).partition("/")
+        return round(float(num) / float(den or 1), 3)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _find_tag(tag_dicts: Iterable[dict], *needles: str) -> str:
+    for tags in tag_dicts:
+        for key, value in (tags or {}).items():
+            k = key.lower()
+            if any(n in k for n in needles) and str(value).strip():
+                return str(value).strip()
+    return ""
+
+
+def probe_media(path: Path) -> MediaInfo:
+    """
+    One ffprobe call per clip (container + streams + tags).
+    Never raises; returns an empty MediaInfo if the file can't be probed.
+    """
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        size = 0
+
+    try:
+        proc = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries",
+                "format=duration,format_name,bit_rate:format_tags:"
+                "stream=codec_type,codec_name,width,height,pix_fmt,avg_frame_rate,r_frame_rate:stream_tags",
+                "-of", "json",
+                str(path),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            creationflags=_no_window_flags(),
+        )
+        data = json.loads(proc.stdout or "{}")
+    except Exception:
+        return MediaInfo(path=str(path), size=size)
+
+    fmt = data.get("format") or {}
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    # Timecode can sit on the container, the video stream or a tmcd data stream
+    tag_dicts = [fmt.get("tags")] + [s.get("tags") for s in streams]
+
+    return MediaInfo(
+        path=str(path),
+        duration=_to_float(fmt.get("duration")),
+        container=str(fmt.get("format_name", "")),
+        video_codec=str(video.get("codec_name", "")),
+        width=_to_int(video.get("width")),
+        height=_to_int(video.get("height")),
+        pix_fmt=str(video.get("pix_fmt", "")),
+        bit_rate=_to_int(fmt.get("bit_rate")),
+        audio_codec=str(audio.get("codec_name", "")),
+        frame_rate=_rate(video.get("avg_frame_rate")) or _rate(video.get("r_frame_rate")),
+        start_timecode=_find_tag(tag_dicts, "timecode"),
+        camera_serial=_find_tag(tag_dicts, "serial"),
+        size=size,
+    )
+
+
+def probe_key(path: Path) -> str:
+    """
+    Cache key from cheap stat data. The file name (not the full path) is used so
+    the archive copy, the SSD copy and the card itself all share one entry -
+    robocopy keeps size and mtime.
+    """
+    st = os.stat(path)
+    return f"{Path(path).name}|{st.st_size}|{int(st.st_mtime)}"
+
+
+class MediaProbeCache:
+    """
+    Station-local, persistent probe results (JSON). Keys are probe_key() values,
+    plus "#<content hash>" entries when a hash is already known.
+
+    Two jobs (or the GUI and the headless runner) can each hold one: save() merges
+    this job's new entries into what's on disk, under the file's lock, and keeps
+    only the newest MAX_ENTRIES.
+    """
+    MAX_ENTRIES = 20_000  # ~300 bytes each
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._state = json_state(self.path, indent=None) if self.path else None
+        self._entries: dict[str, dict] = self._load()
+        self._fresh: dict[str, None] = {}  # put order
+
+    def _load(self) -> dict[str, dict]:
+        if self._state is None:
+            return {}
+        raw = self._state.read(default={})
+        return dict(raw) if isinstance(raw, dict) else {}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, info: MediaInfo) -> None:
+        data = info.to_dict()
+        data.pop("path", None)
+        with self._lock:
+            self._entries[key] = data
+            self._fresh.pop(key, None)
+            self._fresh[key] = None
+
+    def save(self) -> None:
+        if self._state is None:
+            return
+        with self._lock:
+            if not self._fresh:
+                return
+            fresh = {k: self._entries[k] for k in self._fresh}
+            self._fresh = {}
+
+        def merge(on_disk):
+            merged = dict(on_disk) if isinstance(on_disk, dict) else {}
+            for k, v in fresh.items():
+                merged.pop(k, None)  # re-inserted last = newest
+                merged[k] = v
+            over = len(merged) - self.MAX_ENTRIES
+            if over > 0:
+                for k in list(merged)[:over]:
+                    del merged[k]
+            return merged
+
+        merged = self._state.update(merge)
+        with self._lock:
+            self._entries = dict(merged)
+
+
+def probe_clips(
+    files: list[Path],
+    cache: Optional[MediaProbeCache] = None,
+    *,
+    hashes: Optional[dict[Path, str]] = None,
+    max_workers: int = 8,
+) -> dict[Path, MediaInfo]:
+    """
+    Probes every clip in parallel, skipping anything the cache already knows.
+    ffprobe only reads headers, so this is latency-bound - more threads than cores is fine.
+    """
+    hashes = hashes or {}
+    results: dict[Path, MediaInfo] = {}
+    todo: list[tuple[Path, list[str]]] = []
+
+    for f in files:
+        keys = []
+        try:
+            keys.append(probe_key(f))
+        except OSError:
+            pass
+        if hashes.get(f):
+            keys.append(f"#{hashes[f]}")
+
+        hit = None
+        if cache is not None:
+            for k in keys:
+                hit = cache.get(k)
+                if hit:
+                    break
+        if hit:
+            results[f] = MediaInfo.from_dict({**hit, "path": str(f)})
+        else:
+            todo.append((f, keys))
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for (f, keys), info in zip(todo, pool.map(probe_media, [f for f, _ in todo])):
+                results[f] = info
+                if cache is not None and info.ok:
+                    for k in keys:
+                        cache.put(k, info)
+
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError:
+            pass
+    return results
+
+
+def summarize_media(infos: Iterable[MediaInfo]) -> dict:
+    """
+    Card-level totals for the ledger / reports.
+    """
+    infos = list(infos)
+    return {
+        "clips": len(infos),
+        "duration_s": round(sum(i.duration for i in infos), 1),
+        "bytes": sum(i.size for i in infos),
+        "codecs": sorted({i.video_codec for i in infos if i.video_codec}),
+        "cameras": sorted({i.camera_serial for i in infos if i.camera_serial}),
+    }
+
+
+def write_card_media(path: Path, src_dir: Path, infos: dict[Path, MediaInfo]) -> None:
+    """
+    Per-card media sheet next to the card's robocopy logs (paths relative to the card).
+    """
+    clips = []
+    for f, info in sorted(infos.items()):
+        data = info.to_dict()
+        try:
+            data["path"] = str(Path(f).relative_to(src_dir))
+        except ValueError:
+            pass
+        clips.append(data)
+
+    payload = {"summary": summarize_media(infos.values()), "clips": clips}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_card_media(path: Path) -> list[MediaInfo]:
+    if not path.exists():
+        return []
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        return [MediaInfo.from_dict(c) for c in raw.get("clips", []) if isinstance(c, dict)]
+    except Exception:
+        return []
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..models import JobConfig, ProjectSummary
+from .projects_list import load_recent_projects
+from .state_store import json_state
+
+
+DEFAULT_BASE_FOLDER = "Cactus"
+SCAN_CACHE_NAME = "projects_scan_cache.json"
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def split_project_folder(name: str) -> Optional[Tuple[str, str]]:
+    """
+    "Iriya_-_Yom_HaAtsmaut" -> ("Iriya", "Yom HaAtsmaut"), the reverse of
+    JobConfig.safe_project_folder() (which turns the spaces back into "_").
+    """
+    client, sep, project = name.partition("_-_")
+    if not sep or not client or not project:
+        return None
+    return client.replace("_", " ").strip(), project.replace("_", " ").strip()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _subdirs(path: Path) -> List[str]:
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+
+
+class ProjectRegistry:
+    """
+    Projects found on the archive drives:
+        <root>/<base>/<Client_-_Project>/Footage/<YYYY-MM-DD>
+
+    Directory mtimes are cached (projects_scan_cache.json). A rescan stats the
+    base folder and each project's Footage folder, and only lists the ones whose
+    mtime moved - it never goes below the date folders, so the footage itself is
+    never walked. Drives that aren't connected keep their last known projects.
+    """
+
+    def __init__(self, cache_path: Path, base_folder: str = DEFAULT_BASE_FOLDER):
+        self.cache_path = Path(cache_path)
+        self.base_folder = base_folder
+        self._lock = threading.Lock()
+        self._roots: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        raw = json_state(self.cache_path, indent=None).read()
+        if not isinstance(raw, dict) or raw.get("base_folder") != self.base_folder:
+            return {}
+        roots = raw.get("roots")
+        # Deep copy: the scan edits entries in place and the state cache must not change under it
+        return json.loads(json.dumps(roots)) if isinstance(roots, dict) else {}
+
+    def _save(self) -> None:
+        json_state(self.cache_path, indent=None).write(
+            {"base_folder": self.base_folder, "roots": json.loads(json.dumps(self._roots))}
+        )
+
+    def _scan_root(self, root: str) -> bool:
+        """
+        Brings one root's cache entry up to date. Returns True if anything changed.
+        """
+        base = Path(root) / self.base_folder
+        base_mtime = _mtime_ns(base)
+        if base_mtime is None:
+            return False  # not connected (or no archive on it): keep what we knew
+
+        cached = self._roots.get(root) or {"mtime_ns": None, "projects": {}}
+        projects: Dict[str, dict] = cached["projects"]
+        changed = False
+
+        # New / removed project folders only show up in the base folder's mtime
+        if cached["mtime_ns"] != base_mtime:
+            names = {n for n in _subdirs(base) if split_project_folder(n)}
+            for gone in set(projects) - names:
+                del projects[gone]
+            for new in names - set(projects):
+                projects[new] = {"mtime_ns": None, "dates": []}
+            cached["mtime_ns"] = base_mtime
+            changed = True
+
+        for name, entry in projects.items():
+            footage = base / name / "Footage"
+            m = _mtime_ns(footage)
+            if m == entry["mtime_ns"]:
+                continue
+            entry["mtime_ns"] = m
+            entry["dates"] = sorted(d for d in _subdirs(footage) if _DATE_RE.match(d)) if m is not None else []
+            changed = True
+
+        self._roots[root] = cached
+        return changed
+
+    def scan(self, roots: Iterable[str]) -> List[ProjectSummary]:
+        with self._lock:
+            changed = False
+            for root in dict.fromkeys(str(Path(r)) for r in roots if r):
+                changed |= self._scan_root(root)
+            if changed:
+                try:
+                    self._save()
+                except OSError:
+                    pass
+            return self.projects()
+
+    def projects(self) -> List[ProjectSummary]:
+        """
+        Everything known, one entry per project (latest ingest date across drives), newest first.
+        """
+        best: Dict[str, ProjectSummary] = {}
+        for root in self._roots.values():
+            for name, entry in root.get("projects", {}).items():
+                parts = split_project_folder(name)
+                if not parts:
+                    continue
+                last = entry["dates"][-1] if entry.get("dates") else ""
+                prev = best.get(name)
+                if prev is None or last > prev.last_updated:
+                    best[name] = ProjectSummary(client=parts[0], project=parts[1], last_updated=last)
+        return sorted(best.values(), key=lambda p: p.last_updated, reverse=True)
+
+
+def project_key(p: ProjectSummary) -> str:
+    # Same key the archive folder is named by
+    return JobConfig(client_name=p.client, project_name=p.project).safe_project_folder()
+
+
+def load_projects(
+    registry_path: Path,
+    roots: Iterable[str],
+    *,
+    cache_path: Optional[Path] = None,
+    base_folder: str = DEFAULT_BASE_FOLDER,
+) -> List[ProjectSummary]:
+    """
+    Scanned archive projects plus anything in the hand-kept projects_index.json
+    (which wins for names, since it may have the original spelling). Newest first.
+    """
+    cache_path = cache_path or Path(registry_path).with_name(SCAN_CACHE_NAME)
+    scanned = ProjectRegistry(cache_path, base_folder).scan(roots)
+
+    merged: Dict[str, ProjectSummary] = {project_key(p): p for p in scanned}
+    for p in load_recent_projects(Path(registry_path)):
+        key = project_key(p)
+        seen = merged.get(key)
+        last = max(p.last_updated, seen.last_updated) if seen else p.last_updated
+        merged[key] = ProjectSummary(client=p.client, project=p.project, last_updated=last)
+    return sorted(merged.values(), key=lambda p: p.last_updated, reverse=True)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import bisect
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ..models import ProjectSummary
+from .project_registry import project_key
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, accents stripped, "_"/"-" as spaces: "Iriya_-_Yom HaAtsmaut" -> "iriya yom haatsmaut".
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(text.replace("_", " ").replace("-", " ").split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def project_recency(ledger_path: Path) -> Dict[str, str]:
+    """
+    {project_key: last session start} from the ledger (all partitions).
+    """
+    from .ledger_partitions import connect_all
+
+    conn = connect_all(ledger_path)
+    try:
+        rows = conn.execute(
+            "SELECT client, project, MAX(session_started_at) FROM sessions GROUP BY client, project"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    recency: Dict[str, str] = {}
+    for client, project, last in rows:
+        key = project_key(ProjectSummary(client=client, project=project))
+        if last and last > recency.get(key, ""):
+            recency[key] = last
+    return recency
+
+
+class ProjectIndex:
+    """
+    In-memory search over client + project names, built once per refresh.
+
+    - word-prefix index (sorted word list + bisect) for the first couple of letters
+    - trigram inverted index for fuzzy matches ("yom hatzmaut" still finds "Yom HaAtsmaut")
+    Ties are broken by recency: last ledger session, else the newest footage date.
+    """
+
+    def __init__(self, projects: List[ProjectSummary], recency: Optional[Dict[str, str]] = None):
+        recency = recency or {}
+        self.projects = list(projects)
+        self._texts = [normalize(f"{p.client} {p.project}") for p in self.projects]
+
+        # Rank 1.0 = most recent ... 0.0 = oldest
+        last_used = [
+            max(recency.get(project_key(p), ""), p.last_updated) if recency else p.last_updated
+            for p in self.projects
+        ]
+        order = sorted(range(len(self.projects)), key=lambda i: last_used[i], reverse=True)
+        n = max(len(order) - 1, 1)
+        self._recency = [0.0] * len(self.projects)
+        for rank, i in enumerate(order):
+            self._recency[i] = 1.0 - rank / n
+        self.by_recency = [self.projects[i] for i in order]
+
+        self._grams: Dict[str, List[int]] = {}
+        words: Dict[str, Set[int]] = {}
+        for i, text in enumerate(self._texts):
+            for g in _trigrams(text):
+                self._grams.setdefault(g, []).append(i)
+            for w in text.split():
+                words.setdefault(w, set()).add(i)
+        self._words = sorted(words)
+        self._word_docs = [words[w] for w in self._words]
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        docs: Set[int] = set()
+        i = bisect.bisect_left(self._words, prefix)
+        while i < len(self._words) and self._words[i].startswith(prefix):
+            docs |= self._word_docs[i]
+            i += 1
+        return docs
+
+    def search(self, query: str, limit: int = 20) -> List[ProjectSummary]:
+        q = normalize(query)
+        if not q:
+            return self.by_recency[:limit]
+
+        # Every query word as a word prefix: the strong, exact-ish matches
+        exact: Optional[Set[int]] = None
+        for w in q.split():
+            docs = self._prefix_docs(w)
+            exact = docs if exact is None else exact & docs
+
+        scores: Dict[int, float] = {i: 1.0 for i in exact or ()}
+
+        # Fuzzy: share of the query's trigrams found in the name
+        if len(q) >= 3:
+            q_grams = _trigrams(q)
+            hits: Dict[int, int] = {}
+            for g in q_grams:
+                for i in self._grams.get(g, ()):
+                    hits[i] = hits.get(i, 0) + 1
+            for i, h in hits.items():
+                share = h / len(q_grams)
+                if share >= 0.45:
+                    scores[i] = max(scores.get(i, 0.0), 0.9 * share)
+
+        ranked = sorted(scores, key=lambda i: (scores[i] + 0.15 * self._recency[i]), reverse=True)
+        return [self.projects[i] for i in ranked[:limit]]
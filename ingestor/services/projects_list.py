@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import List
 
 from ..models import ProjectSummary
+from .state_store import json_state
 
 
 def load_recent_projects(registry_path: Path) -> List[ProjectSummary]:
@@ -12,7 +12,8 @@ def load_recent_projects(registry_path: Path) -> List[ProjectSummary]:
     UI-only for now.
 
     Reads a local JSON file containing recent/active projects.
-    If missing or invalid, returns an empty list.
+    If missing or invalid, returns an empty list. The parsed file is cached
+    until its mtime changes.
 
     Expected shape:
     [
@@ -20,11 +21,8 @@ def load_recent_projects(registry_path: Path) -> List[ProjectSummary]:
       ...
     ]
     """
-    if not registry_path.exists():
-        return []
-
     try:
-        raw = json.loads(registry_path.read_text(encoding="utf-8"))
+        raw = json_state(registry_path).read(default=[])
         results: List[ProjectSummary] = []
         if isinstance(raw, list):
             for item in raw:
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from .project_registry import load_projects
+from .project_search import project_recency
+
+
+class ProjectsWorker(QObject):
+    finished = Signal(list, dict)   # [ProjectSummary], {project_key: last session start}
+
+    def __init__(self, registry_path: Path, roots: list[str], ledger_path: Optional[Path]):
+        super().__init__()
+        self.registry_path = Path(registry_path)
+        self.roots = roots
+        self.ledger_path = ledger_path
+
+    @Slot()
+    def run(self):
+        # Archive scan (a stat + listing per root / project) and a ledger query -
+        # both can stall on a sleeping or dropped drive, so never on the GUI thread
+        try:
+            projects = load_projects(self.registry_path, self.roots)
+        except Exception:
+            projects = []
+        try:
+            recency = project_recency(self.ledger_path) if self.ledger_path else {}
+        except Exception:
+            recency = {}
+        self.finished.emit(projects, recency)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+
+CACHE_DIR_NAME = "_proxy_cache"
+DEFAULT_CACHE_GB = 200.0
+
+
+def preset_key(preset) -> str:
+    """
+    Short, stable id for a ProxyPreset (any change to the preset = new key).
+    Plain strings (e.g. "remux") are used as-is.
+    """
+    if isinstance(preset, str):
+        return preset
+    raw = json.dumps(asdict(preset), sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=6).hexdigest()
+
+
+class ProxyCache:
+    """
+    Content-addressed proxy store on the proxy SSD:
+
+        <ssd>\\_proxy_cache\\objects\\ab\\<source_hash>_<preset_key>.mov
+        <ssd>\\_proxy_cache\\index.json
+
+    Entries are hard-links to proxies we already made, so serving one into a new
+    project folder is another hard-link (or a copy if that fails). When the
+    cache grows past max_bytes, least-recently-used entries are dropped.
+    """
+
+    def __init__(self, ssd_root: Path, max_bytes: int = int(DEFAULT_CACHE_GB * 1024**3)):
+        self.root = Path(ssd_root) / CACHE_DIR_NAME
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = self._load_index()
+
+    @staticmethod
+    def key(source_hash: str, preset) -> str:
+        return f"{source_hash}_{preset_key(preset)}"
+
+    def _object_path(self, key: str, ext: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}{ext}"
+
+    def _load_index(self) -> dict[str, dict]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+            entries = raw.get("entries", {})
+            return entries if isinstance(entries, dict) else {}
+        except Exception:
+            return {}
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"entries": dict(self._entries)}
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(int(e.get("size", 0)) for e in self._entries.values())
+
+    def fetch(self, key: str, dst: Path) -> bool:
+        """
+        Puts the cached proxy for key at dst. Returns False on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry:
+            return False
+
+        obj = self._object_path(key, entry.get("ext", ""))
+        if not obj.exists():
+            with self._lock:
+                self._entries.pop(key, None)
+            return False
+
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            dst.unlink(missing_ok=True)
+            try:
+                os.link(obj, dst)
+            except OSError:
+                shutil.copy2(obj, dst)
+        except OSError:
+            return False
+
+        with self._lock:
+            entry["last_used"] = time.time()
+        return True
+
+    def store(self, key: str, produced: Path) -> None:
+        """
+        Adds a freshly made proxy to the cache (hard-link, copy as fallback),
+        then evicts down to the size budget.
+        """
+        if self.max_bytes <= 0 or not produced.exists():
+            return
+
+        ext = produced.suffix
+        obj = self._object_path(key, ext)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if not obj.exists():
+                try:
+                    os.link(produced, obj)
+                except OSError:
+                    shutil.copy2(produced, obj)
+            size = obj.stat().st_size
+        except OSError:
+            return
+
+        with self._lock:
+            self._entries[key] = {"ext": ext, "size": size, "last_used": time.time()}
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drops least-recently-used entries until we're under max_bytes.
+        Returns bytes freed (from the cache's point of view).
+        """
+        with self._lock:
+            total = sum(int(e.get("size", 0)) for e in self._entries.values())
+            if total <= self.max_bytes:
+                return 0
+            by_age = sorted(self._entries.items(), key=lambda kv: kv[1].get("last_used", 0))
+            victims = []
+            for key, entry in by_age:
+                if total <= self.max_bytes:
+                    break
+                total -= int(entry.get("size", 0))
+                victims.append((key, entry))
+            for key, _ in victims:
+                self._entries.pop(key, None)
+
+        freed = 0
+        for key, entry in victims:
+            try:
+                self._object_path(key, entry.get("ext", "")).unlink(missing_ok=True)
+            except OSError:
+                pass
+            freed += int(entry.get("size", 0))
+        return freed
@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .hashing import file_hash
+from .media_probe import MediaInfo, probe_clips
+from .proxy_cache import ProxyCache
+from .raw_previews import extract_raw_previews
+from .proxy_policy import (
+    DEFAULT_POLICY, PASSTHROUGH, REMUX, ProxyPolicy, decide_proxy_action,
+)
+
+
+VIDEO_EXTS = {".mov", ".mp4", ".mxf", ".mts", ".m2ts", ".avi", ".mkv", ".m4v"}
+
+# Clips longer than this get split at keyframes and encoded as parallel segments.
+# Short clips are cheaper to encode in one go (no concat / segment overhead).
+SEGMENT_MIN_CLIP_SECONDS = 20 * 60
+SEGMENT_TARGET_SECONDS = 5 * 60
+
+
+@dataclass(frozen=True)
+class ProxyPreset:
+    """
+    Edit-friendly proxy settings. Every segment of a clip is encoded with the
+    same preset, which is what lets us join them back with a stream copy.
+    Segments carry video only: AAC pads every encode with priming samples, so
+    per-segment audio would click and drift at each join. The clip's audio is
+    encoded once, over its full length, when the segments are joined.
+    """
+    name: str = "h264_720p"
+    height: int = 720
+    video_codec: str = "libx264"
+    x264_preset: str = "veryfast"
+    crf: int = 23
+    audio_codec: str = "aac"
+    audio_bitrate: str = "128k"
+    container: str = ".mov"
+
+    def output_args(self, threads: int = 0, *, audio: bool = True) -> list[str]:
+        args = ["-map", "0:v:0"] + (["-map", "0:a?"] if audio else [])
+        args += [
+            "-vf", f"scale=-2:{self.height}",
+            "-c:v", self.video_codec,
+            "-preset", self.x264_preset,
+            "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p",
+        ]
+        args += self.audio_args() if audio else ["-an"]
+        if threads > 0:
+            args += ["-threads", str(threads)]
+        return args
+
+    def audio_args(self) -> list[str]:
+        return ["-c:a", self.audio_codec, "-b:a", self.audio_bitrate]
+
+
+DEFAULT_PRESET = ProxyPreset()
+
+
+def _no_window_flags() -> int:
+    # Use CREATE_NO_WINDOW to avoid flashing consoles (same as robocopy)
+    if os.name == "nt":
+        return subprocess.CREATE_NO_WINDOW  # type: ignore[attr-defined]
+    return 0
+
+
+def ffmpeg_available() -> bool:
+    return bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+
+def default_proxy_workers() -> int:
+    # Each ffmpeg is multi-threaded itself; ~4 cores per encode keeps the box busy
+    # without thrashing.
+    return max(1, (os.cpu_count() or 4) // 4)
+
+
+def _threads_per_encode(workers: int) -> int:
+    return max(1, (os.cpu_count() or 4) // max(1, workers))
+
+
+def _run(cmd: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        creationflags=_no_window_flags(),
+    )
+
+
+def _ffmpeg_into(cmd: list[str], dst: Path) -> int:
+    """
+    Runs ffmpeg with a temp file next to dst as its output, then os.replace()s it
+    over dst. dst may be a hard link into the proxy cache (or the original, for a
+    passthrough) - writing through it would change that file too, and a failed
+    encode would leave half a file behind.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.stem}.{os.getpid()}.partial{dst.suffix}")  # suffix picks the muxer
+    try:
+        code = _run(cmd + [str(tmp)]).returncode
+        if code == 0:
+            os.replace(tmp, dst)
+        return code
+    except OSError:
+        return 1
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def probe_keyframes(path: Path) -> list[float]:
+    """
+    Keyframe timestamps (seconds) of the first video stream.
+    Reads packet flags only - nothing gets decoded, so this is IO-bound.
+    """
+    proc = _run([
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        str(path),
+    ])
+    times: list[float] = []
+    for line in proc.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or "K" not in parts[1]:
+            continue
+        try:
+            times.append(float(parts[0]))
+        except ValueError:
+            continue
+    return sorted(set(times))
+
+
+def plan_segments(
+    duration: float,
+    keyframes: list[float],
+    target_seconds: float = SEGMENT_TARGET_SECONDS,
+) -> list[tuple[float, Optional[float]]]:
+    """
+    Returns [(start, length), ...] with every cut on a keyframe.
+    The last segment has length None (= run to end of file).
+    """
+    if duration <= 0 or not keyframes:
+        return [(0.0, None)]
+
+    cuts = [0.0]
+    next_target = target_seconds
+    for t in keyframes:
+        # Don't leave a tiny tail segment at the end of the clip
+        if t >= next_target and duration - t > target_seconds / 4:
+            cuts.append(t)
+            next_target = t + target_seconds
+
+    segments: list[tuple[float, Optional[float]]] = []
+    for i, start in enumerate(cuts):
+        if i + 1 < len(cuts):
+            segments.append((start, cuts[i + 1] - start))
+        else:
+            segments.append((start, None))
+    return segments
+
+
+def encode_proxy(
+    src: Path,
+    dst: Path,
+    preset: ProxyPreset = DEFAULT_PRESET,
+    *,
+    start: float = 0.0,
+    length: Optional[float] = None,
+    threads: int = 0,
+    audio: bool = True,
+) -> int:
+    """
+    Encodes src (or a [start, start+length) slice of it) into dst.
+    audio=False for segments (see ProxyPreset). Returns ffmpeg's exit code.
+    """
+    cmd = ["ffmpeg", "-y", "-v", "error", "-nostdin"]
+    if start > 0:
+        # Input seeking: jumps straight to the keyframe instead of decoding up to it
+        cmd += ["-ss", f"{start:.6f}"]
+    cmd += ["-i", str(src)]
+    if length is not None:
+        cmd += ["-t", f"{length:.6f}"]
+    cmd += preset.output_args(threads, audio=audio)
+    return _ffmpeg_into(cmd, dst)
+
+
+def remux_proxy(src: Path, dst: Path) -> int:
+    """
+    Stream-copies src into dst's container (no re-encode).
+    """
+    return _ffmpeg_into([
+        "ffmpeg", "-y", "-v", "error", "-nostdin",
+        "-i", str(src),
+        "-map", "0:v:0", "-map", "0:a?", "-c", "copy",
+        "-movflags", "+faststart",
+    ], dst)
+
+
+def link_or_copy(src: Path, dst: Path) -> int:
+    """
+    Hard-links src to dst when both are on the same volume, copies otherwise.
+    Returns 0 on success (ffmpeg-style exit code).
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        dst.unlink(missing_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+        return 0
+    except OSError:
+        return 1
+
+
+def concat_segments(
+    parts: list[Path],
+    dst: Path,
+    *,
+    audio_src: Optional[Path] = None,
+    preset: ProxyPreset = DEFAULT_PRESET,
+) -> int:
+    """
+    Joins identically-encoded segments with a stream copy (no re-encode).
+    With audio_src, its audio is encoded once over the whole clip and muxed in.
+    """
+    list_file = dst.with_suffix(".concat.txt")
+    lines = []
+    for p in parts:
+        # concat demuxer quoting: single quotes, escape embedded ones
+        safe = str(p.resolve()).replace("'", r"'\''")
+        lines.append(f"file '{safe}'")
+    list_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    cmd = [
+        "ffmpeg", "-y", "-v", "error", "-nostdin",
+        "-f", "concat", "-safe", "0",
+        "-i", str(list_file),
+    ]
+    if audio_src is not None:
+        cmd += ["-i", str(audio_src), "-map", "0:v", "-map", "1:a?", "-c:v", "copy"] + preset.audio_args()
+    else:
+        cmd += ["-map", "0", "-c", "copy"]
+    cmd += ["-movflags", "+faststart"]
+    try:
+        return _ffmpeg_into(cmd, dst)
+    finally:
+        list_file.unlink(missing_ok=True)
+
+
+def _safe_hash(path: Path) -> str:
+    try:
+        return file_hash(path)
+    except OSError:
+        return ""
+
+
+def iter_video_files(src_dir: Path) -> list[Path]:
+    files: list[Path] = []
+    for dirpath, _dirnames, filenames in os.walk(src_dir):
+        for name in filenames:
+            if Path(name).suffix.lower() in VIDEO_EXTS and not name.startswith("._"):
+                files.append(Path(dirpath) / name)
+    return sorted(files)
+
+
+def proxy_path_for(src: Path, src_dir: Path, out_dir: Path, preset: ProxyPreset = DEFAULT_PRESET) -> Path:
+    rel = src.relative_to(src_dir)
+    return (out_dir / rel).with_suffix(preset.container)
+
+
+def generate_proxies(
+    src_dir: Path,
+    out_dir: Path,
+    *,
+    preset: ProxyPreset = DEFAULT_PRESET,
+    policy: ProxyPolicy = DEFAULT_POLICY,
+    originals_on_proxy: bool = True,
+    cache: Optional[ProxyCache] = None,
+    infos: Optional[dict[Path, MediaInfo]] = None,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """
+    Makes a proxy for every video file under src_dir into out_dir
+    (same relative layout).
+
+    Each clip's metadata (infos, from the probe stage - probed here if missing)
+    drives the proxy policy, which picks passthrough
+    (hard-link/copy), remux or transcode. originals_on_proxy tells the policy
+    whether src_dir is the SSD copy of the originals.
+
+    With a cache, remux/transcode results are looked up by source content hash
+    + preset first, and new results are added to it, so a re-inserted card or
+    a rebuilt drive never encodes the same clip twice.
+
+    All work shares one pool of ffmpeg processes. Clips longer than
+    SEGMENT_MIN_CLIP_SECONDS are split at keyframes and their segments go into
+    the same pool, so a 2h interview doesn't leave the other slots idle at the
+    end of the card. Segments are joined back with a stream copy; the audio is
+    encoded once for the whole clip at that point.
+
+    RAW stills get their embedded full-size JPEG pulled out instead (no
+    decode, no ffmpeg needed).
+    """
+    src_dir = Path(src_dir)
+    out_dir = Path(out_dir)
+
+    failed: list[str] = []
+    done = 0
+    actions: dict[str, int] = {}
+
+    stills = extract_raw_previews(src_dir, out_dir)
+    if stills["total"]:
+        actions["raw_preview"] = stills["extracted"]
+        done += stills["extracted"]
+        failed.extend(stills["failed"])
+
+    files = iter_video_files(src_dir)
+    if files and not ffmpeg_available():
+        return {
+            "ok": False,
+            "reason": "FFMPEG_NOT_FOUND",
+            "encoded": done,
+            "actions": actions,
+            "failed": failed,
+            "out_dir": str(out_dir),
+            "message": "ffmpeg/ffprobe not found on PATH. Video proxies skipped.",
+        }
+
+    workers = max_workers or default_proxy_workers()
+    threads = _threads_per_encode(workers)
+    segments_dir = out_dir / "_segments"
+
+    missing = [f for f in files if not infos or f not in infos]
+    infos = {**(infos or {}), **probe_clips(missing)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes: dict[Path, str] = {}
+        if cache is not None:
+            hashes = dict(zip(files, pool.map(_safe_hash, files)))
+
+        # Longest first: big jobs start early, small ones fill the gaps at the end
+        files.sort(key=lambda f: infos[f].duration, reverse=True)
+
+        futures = {}
+        pending_parts: dict[Path, list[Path]] = {}
+        remaining: dict[Path, int] = {}
+
+        for src in files:
+            info = infos[src]
+            decision = decide_proxy_action(info, originals_on_proxy=originals_on_proxy, policy=policy)
+
+            if decision.action == PASSTHROUGH:
+                actions[PASSTHROUGH] = actions.get(PASSTHROUGH, 0) + 1
+                # Keep the original extension - it's the same file
+                dst = out_dir / src.relative_to(src_dir)
+                futures[pool.submit(link_or_copy, src, dst)] = (src, None, None)
+                continue
+
+            dst = proxy_path_for(src, src_dir, out_dir, preset)
+            cache_key = None
+            if cache is not None and hashes.get(src):
+                # Remux output is just as cacheable; it goes under a "remux" preset key
+                cache_key = cache.key(hashes[src], preset if decision.action != REMUX else REMUX)
+                if cache.fetch(cache_key, dst):
+                    actions["cached"] = actions.get("cached", 0) + 1
+                    done += 1
+                    continue
+
+            actions[decision.action] = actions.get(decision.action, 0) + 1
+            if decision.action == REMUX:
+                futures[pool.submit(remux_proxy, src, dst)] = (src, None, cache_key)
+                continue
+
+            plan = [(0.0, None)]
+            if info.duration >= SEGMENT_MIN_CLIP_SECONDS:
+                plan = plan_segments(info.duration, probe_keyframes(src))
+
+            if len(plan) == 1:
+                fut = pool.submit(encode_proxy, src, dst, preset, threads=threads)
+                futures[fut] = (src, None, cache_key)
+                continue
+
+            parts: list[Path] = []
+            clip_seg_dir = segments_dir / src.relative_to(src_dir).with_suffix("")
+            for i, (start, length) in enumerate(plan):
+                part = clip_seg_dir / f"part{i:04d}{preset.container}"
+                parts.append(part)
+                fut = pool.submit(
+                    encode_proxy, src, part, preset,
+                    start=start, length=length, threads=threads, audio=False,
+                )
+                futures[fut] = (src, part, cache_key)
+            pending_parts[src] = parts
+            remaining[src] = len(parts)
+
+        for fut in as_completed(futures):
+            src, part, cache_key = futures[fut]
+            try:
+                code = fut.result()
+            except Exception:
+                code = -1
+
+            if part is None:
+                if code == 0:
+                    done += 1
+                    if cache_key:
+                        cache.store(cache_key, proxy_path_for(src, src_dir, out_dir, preset))
+                else:
+                    failed.append(str(src))
+                continue
+
+            if code != 0 and str(src) not in failed:
+                failed.append(str(src))
+
+            remaining[src] -= 1
+            if remaining[src] == 0:
+                parts = pending_parts.pop(src)
+                if str(src) not in failed:
+                    dst = proxy_path_for(src, src_dir, out_dir, preset)
+                    if concat_segments(parts, dst, audio_src=src, preset=preset) == 0:
+                        done += 1
+                        if cache_key:
+                            cache.store(cache_key, dst)
+                    else:
+                        failed.append(str(src))
+                for p in parts:
+                    p.unlink(missing_ok=True)
+
+    shutil.rmtree(segments_dir, ignore_errors=True)
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError:
+            pass
+
+    ok = not failed
+    summary = ", ".join(f"{n} {a}" for a, n in sorted(actions.items()))
+    return {
+        "ok": ok,
+        "reason": "OK" if ok else "PROXY_FAILED",
+        "encoded": done,
+        "actions": actions,
+        "failed": failed,
+        "out_dir": str(out_dir),
+        "message": (
+            f"Proxies OK ({done} files: {summary or 'none'})." if ok
+            else f"{len(failed)} proxy job(s) failed, {done} OK."
+        ),
+    }
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .media_probe import MediaInfo
+
+
+# Per-clip proxy actions
+PASSTHROUGH = "passthrough"  # hard-link (same volume) or copy the original as its own proxy
+REMUX = "remux"              # stream-copy into an edit-friendly container
+TRANSCODE = "transcode"      # full encode with the proxy preset
+
+EDIT_FRIENDLY_CONTAINERS = {".mov", ".mp4", ".m4v"}
+EDIT_FRIENDLY_CODECS = {"h264"}
+EDIT_FRIENDLY_PIX_FMTS = {"yuv420p", "yuvj420p"}
+
+
+@dataclass(frozen=True)
+class ProxyPolicy:
+    """
+    Thresholds for skipping the encode.
+
+    A passthrough costs nothing on the SSD when the original is already there
+    (hard-link), so we allow heavier sources in that case. When originals are not
+    kept on the SSD, passthrough means a full-size copy, so only genuinely light
+    files qualify.
+    """
+    max_height: int = 1080
+    max_bitrate_linked: int = 50_000_000   # bits/s, original lives on the SSD
+    max_bitrate_copied: int = 12_000_000   # bits/s, passthrough needs a full copy
+
+
+DEFAULT_POLICY = ProxyPolicy()
+
+
+@dataclass(frozen=True)
+class ProxyDecision:
+    action: str
+    reason: str
+
+
+def decide_proxy_action(
+    info: MediaInfo,
+    *,
+    originals_on_proxy: bool,
+    policy: ProxyPolicy = DEFAULT_POLICY,
+) -> ProxyDecision:
+    """
+    originals_on_proxy: the source file is the SSD copy of the original
+    (JobConfig.keep_originals_on_proxy), so a passthrough is a free hard-link.
+    """
+    if not info.ok:
+        # Unknown media - let ffmpeg have a go, it'll report a proper error
+        return ProxyDecision(TRANSCODE, "probe failed")
+
+    if info.video_codec not in EDIT_FRIENDLY_CODECS:
+        return ProxyDecision(TRANSCODE, f"codec {info.video_codec}")
+    if info.pix_fmt and info.pix_fmt not in EDIT_FRIENDLY_PIX_FMTS:
+        return ProxyDecision(TRANSCODE, f"pixel format {info.pix_fmt}")
+    if info.height > policy.max_height:
+        return ProxyDecision(TRANSCODE, f"{info.height}p above {policy.max_height}p")
+
+    max_bitrate = policy.max_bitrate_linked if originals_on_proxy else policy.max_bitrate_copied
+    if not info.bit_rate or info.bit_rate > max_bitrate:
+        return ProxyDecision(TRANSCODE, f"bitrate {info.bit_rate / 1e6:.1f} Mb/s")
+
+    if Path(info.path).suffix.lower() not in EDIT_FRIENDLY_CONTAINERS:
+        return ProxyDecision(REMUX, f"{Path(info.path).suffix.lower()} container")
+
+    return ProxyDecision(PASSTHROUGH, "already edit-friendly")
+
+
+def full_size_bytes(
+    infos: Iterable[MediaInfo],
+    *,
+    originals_on_proxy: bool,
+    policy: ProxyPolicy = DEFAULT_POLICY,
+) -> int:
+    """
+    Bytes of the clips whose proxy is the original itself (passthrough) or a
+    stream copy of it (remux) - these land on the SSD at full size.
+    """
+    return sum(
+        i.size for i in infos
+        if decide_proxy_action(i, originals_on_proxy=originals_on_proxy, policy=policy).action != TRANSCODE
+    )
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+
+# TIFF-based RAWs (ARW/NEF/DNG/...) and Canon's ISOBMFF-based CR3
+TIFF_RAW_EXTS = {".arw", ".nef", ".nrw", ".dng", ".cr2", ".orf", ".pef", ".rw2", ".srw"}
+BMFF_RAW_EXTS = {".cr3"}
+RAW_EXTS = TIFF_RAW_EXTS | BMFF_RAW_EXTS
+
+BATCH_SIZE = 64
+
+# TIFF tags
+_TAG_SUBFILE_TYPE = 0x00FE
+_TAG_STRIP_OFFSETS = 0x0111
+_TAG_STRIP_BYTE_COUNTS = 0x0117
+_TAG_COMPRESSION = 0x0103
+_TAG_SUB_IFDS = 0x014A
+_TAG_JPEG_OFFSET = 0x0201
+_TAG_JPEG_LENGTH = 0x0202
+_TAG_EXIF_IFD = 0x8769
+
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 13: 4}
+_JPEG_COMPRESSIONS = {6, 7}
+# Baseline / extended / progressive. The raw data itself (CR2 IFD3, DNG raw IFDs)
+# is lossless JPEG (SOF3): also starts with FFD8 but viewers can't open it.
+_PREVIEW_SOF_MARKERS = {0xC0, 0xC1, 0xC2}
+_MAX_JPEG_SEGMENTS = 32
+
+# Canon CR3 preview container: uuid box holding a "PRVW" box (1620px JPEG)
+_CR3_PREVIEW_UUID = bytes.fromhex("eaf42b5e1c984b88b9fbb7dc406e4d16")
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+# ---------------- TIFF ----------------
+
+def _tiff_ifd_entries(f: BinaryIO, endian: str, offset: int) -> tuple[dict[int, list[int]], int]:
+    """
+    Returns ({tag: [values...]}, next_ifd_offset). Only integer-typed values are
+    decoded - that's all we need to find the embedded JPEGs.
+    """
+    count_raw = _read_at(f, offset, 2)
+    if len(count_raw) < 2:
+        return {}, 0
+    (count,) = struct.unpack(endian + "H", count_raw)
+    raw = f.read(count * 12 + 4)
+    if len(raw) < count * 12 + 4:
+        return {}, 0
+
+    tags: dict[int, list[int]] = {}
+    for i in range(count):
+        tag, typ, n = struct.unpack(endian + "HHI", raw[i * 12:i * 12 + 8])
+        size = _TIFF_TYPE_SIZES.get(typ, 0)
+        fmt = {3: "H", 4: "I", 13: "I"}.get(typ)
+        if not fmt or not size:
+            continue
+        value_raw = raw[i * 12 + 8:i * 12 + 12]
+        if size * n > 4:
+            (ptr,) = struct.unpack(endian + "I", value_raw)
+            pos = f.tell()
+            value_raw = _read_at(f, ptr, size * n)
+            f.seek(pos)
+        try:
+            tags[tag] = list(struct.unpack(endian + fmt * n, value_raw[:size * n]))
+        except struct.error:
+            continue
+
+    (next_ifd,) = struct.unpack(endian + "I", raw[count * 12:count * 12 + 4])
+    return tags, next_ifd
+
+
+def _tiff_jpeg_candidates(f: BinaryIO) -> list[tuple[int, int]]:
+    """
+    Walks IFD0.., SubIFDs and the EXIF IFD; returns every (offset, length)
+    that points at a JPEG stream.
+    """
+    header = _read_at(f, 0, 8)
+    if header[:2] == b"II":
+        endian = "<"
+    elif header[:2] == b"MM":
+        endian = ">"
+    else:
+        return []
+
+    (first_ifd,) = struct.unpack(endian + "I", header[4:8])
+    todo = [first_ifd]
+    seen: set[int] = set()
+    found: list[tuple[int, int]] = []
+
+    while todo and len(seen) < 64:
+        offset = todo.pop()
+        if not offset or offset in seen:
+            continue
+        seen.add(offset)
+        tags, next_ifd = _tiff_ifd_entries(f, endian, offset)
+        todo.append(next_ifd)
+        todo.extend(tags.get(_TAG_SUB_IFDS, []))
+        todo.extend(tags.get(_TAG_EXIF_IFD, []))
+
+        # NewSubfileType 0 is the full-resolution image - the raw data, not a preview
+        if tags.get(_TAG_SUBFILE_TYPE, [None])[0] == 0:
+            continue
+
+        if _TAG_JPEG_OFFSET in tags and _TAG_JPEG_LENGTH in tags:
+            found.append((tags[_TAG_JPEG_OFFSET][0], tags[_TAG_JPEG_LENGTH][0]))
+
+        compression = tags.get(_TAG_COMPRESSION, [0])[0]
+        offsets = tags.get(_TAG_STRIP_OFFSETS, [])
+        counts = tags.get(_TAG_STRIP_BYTE_COUNTS, [])
+        # A single-strip old-style JPEG (compression 6) is a complete JFIF stream.
+        # Compression 7 with one strip is the same thing in DNG/NEF previews.
+        if compression in _JPEG_COMPRESSIONS and len(offsets) == 1 and len(counts) == 1:
+            found.append((offsets[0], counts[0]))
+
+    return found
+
+
+def _jpeg_sof(f: BinaryIO, offset: int, length: int) -> Optional[int]:
+    """
+    The SOF marker (0xC0..0xCF) of the JPEG stream at offset, or None. Walks the
+    segment headers after SOI - a few small reads, no image data.
+    """
+    if _read_at(f, offset, 2) != b"\xff\xd8":
+        return None
+    pos = offset + 2
+    end = offset + length
+    for _ in range(_MAX_JPEG_SEGMENTS):
+        head = _read_at(f, pos, 4)
+        if len(head) < 4 or pos + 4 > end or head[0] != 0xFF:
+            return None
+        marker = head[1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):  # not DHT / JPG / DAC
+            return marker
+        if marker == 0xDA:  # start of scan before any SOF
+            return None
+        (seg_len,) = struct.unpack(">H", head[2:4])
+        pos += 2 + seg_len
+    return None
+
+
+# ---------------- ISOBMFF (CR3) ----------------
+
+def _iter_boxes(f: BinaryIO, start: int, end: int):
+    pos = start
+    while pos + 8 <= end:
+        head = _read_at(f, pos, 16)
+        if len(head) < 8:
+            return
+        size, kind = struct.unpack(">I4s", head[:8])
+        header_len = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", head[8:16])
+            header_len = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_len:
+            return
+        yield kind, pos, header_len, size
+        pos += size
+
+
+def _find_box(f: BinaryIO, start: int, end: int, kind: bytes) -> Optional[tuple[int, int, int]]:
+    for k, pos, header_len, size in _iter_boxes(f, start, end):
+        if k == kind:
+            return pos, header_len, size
+    return None
+
+
+def _cr3_jpeg_candidates(f: BinaryIO) -> list[tuple[int, int]]:
+    """
+    CR3 track 1 is a full-size JPEG; its offset/size live in moov/trak/mdia/minf/stbl.
+    Falls back to the smaller PRVW preview.
+    """
+    f.seek(0, os.SEEK_END)
+    file_end = f.tell()
+    found: list[tuple[int, int]] = []
+
+    moov = _find_box(f, 0, file_end, b"moov")
+    if moov:
+        pos, hl, size = moov
+        trak = _find_box(f, pos + hl, pos + size, b"trak")
+        node = trak
+        for kind in (b"mdia", b"minf", b"stbl"):
+            if not node:
+                break
+            p, h, s = node
+            node = _find_box(f, p + h, p + s, kind)
+        if node:
+            p, h, s = node
+            stsz = _find_box(f, p + h, p + s, b"stsz")
+            co64 = _find_box(f, p + h, p + s, b"co64")
+            stco = _find_box(f, p + h, p + s, b"stco")
+            if stsz and (co64 or stco):
+                sp, sh, _ = stsz
+                # full box: version/flags(4), sample_size(4), count(4), [sizes...]
+                sample_size, count = struct.unpack(">II", _read_at(f, sp + sh + 4, 8))
+                if sample_size == 0 and count:
+                    (sample_size,) = struct.unpack(">I", _read_at(f, sp + sh + 12, 4))
+                if co64:
+                    cp, ch, _ = co64
+                    (offset,) = struct.unpack(">Q", _read_at(f, cp + ch + 8, 8))
+                else:
+                    cp, ch, _ = stco
+                    (offset,) = struct.unpack(">I", _read_at(f, cp + ch + 8, 4))
+                found.append((offset, sample_size))
+
+    for kind, pos, hl, size in _iter_boxes(f, 0, file_end):
+        if kind != b"uuid" or _read_at(f, pos + hl, 16) != _CR3_PREVIEW_UUID:
+            continue
+        # uuid(16) + 8 bytes of Canon fields, then the PRVW box
+        inner_start = pos + hl + 16 + 8
+        prvw = _find_box(f, inner_start, pos + size, b"PRVW")
+        if prvw:
+            p, h, s = prvw
+            # PRVW: unknown(4) + unknown(2) + width(2) + height(2) + unknown(2) + jpeg_size(4)
+            (jpeg_size,) = struct.unpack(">I", _read_at(f, p + h + 12, 4))
+            found.append((p + h + 16, jpeg_size))
+        break
+
+    return found
+
+
+# ---------------- Public API ----------------
+
+def find_embedded_jpeg(path: Path) -> Optional[tuple[int, int]]:
+    """
+    (offset, length) of the largest embedded preview JPEG in a RAW file, or None.
+    Only container metadata and JPEG segment headers are parsed; nothing is decoded.
+    """
+    ext = path.suffix.lower()
+    try:
+        with open(path, "rb") as f:
+            if ext in BMFF_RAW_EXTS:
+                candidates = _cr3_jpeg_candidates(f)
+            else:
+                candidates = _tiff_jpeg_candidates(f)
+
+            f.seek(0, os.SEEK_END)
+            file_size = f.tell()
+            valid = [
+                (off, length) for off, length in candidates
+                if length > 2 and off + length <= file_size and _jpeg_sof(f, off, length) in _PREVIEW_SOF_MARKERS
+            ]
+    except (OSError, struct.error):
+        return None
+
+    if not valid:
+        return None
+    return max(valid, key=lambda c: c[1])
+
+
+def extract_preview(src: Path, dst: Path) -> bool:
+    found = find_embedded_jpeg(src)
+    if not found:
+        return False
+    offset, length = found
+    try:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with open(src, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        tmp = dst.with_suffix(".jpg.part")
+        tmp.write_bytes(data)
+        os.replace(tmp, dst)
+        return True
+    except OSError:
+        return False
+
+
+def iter_raw_files(src_dir: Path) -> list[Path]:
+    files: list[Path] = []
+    for dirpath, _dirnames, filenames in os.walk(src_dir):
+        for name in filenames:
+            if Path(name).suffix.lower() in RAW_EXTS and not name.startswith("._"):
+                files.append(Path(dirpath) / name)
+    return sorted(files)
+
+
+def _extract_batch(batch: list[tuple[Path, Path]]) -> list[str]:
+    failed = []
+    for src, dst in batch:
+        if not extract_preview(src, dst):
+            failed.append(str(src))
+    return failed
+
+
+def extract_raw_previews(src_dir: Path, out_dir: Path, *, max_workers: int = 8) -> dict:
+    """
+    Writes <out_dir>/<same relative path>.jpg for every RAW still under src_dir.
+
+    Files are handed to the thread pool in batches of BATCH_SIZE - a stills card
+    has thousands of them and each extraction is just a couple of seeks + one read.
+    """
+    src_dir = Path(src_dir)
+    out_dir = Path(out_dir)
+    files = iter_raw_files(src_dir)
+    jobs = [(f, (out_dir / f.relative_to(src_dir)).with_suffix(".jpg")) for f in files]
+    batches = [jobs[i:i + BATCH_SIZE] for i in range(0, len(jobs), BATCH_SIZE)]
+
+    failed: list[str] = []
+    if batches:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for batch_failed in pool.map(_extract_batch, batches):
+                failed.extend(batch_failed)
+
+    return {
+        "total": len(files),
+        "extracted": len(files) - len(failed),
+        "failed": failed,
+    }
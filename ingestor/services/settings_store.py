@@ -1,34 +1,48 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from .proxy_cache import DEFAULT_CACHE_GB
+from .state_store import json_state
+
 
 @dataclass
 class AppSettings:
     last_archive_root: str = ""
     last_proxy_root: str = ""
+    proxy_cache_gb: float = DEFAULT_CACHE_GB  # size budget for the proxy cache on the SSD
+    archive_roots: list[str] = field(default_factory=list)  # every archive drive used (project scan)
+    auto_start_cards: bool = False  # start the next SDn as soon as a card is inserted
 
 
 def load_settings(path: Path) -> AppSettings:
-    if not path.exists():
+    # Cached; only re-parsed when settings.json changes on disk
+    data = json_state(path).read()
+    if not isinstance(data, dict):
         return AppSettings()
 
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
         return AppSettings(
             last_archive_root=str(data.get("last_archive_root", "")).strip(),
             last_proxy_root=str(data.get("last_proxy_root", "")).strip(),
+            proxy_cache_gb=float(data.get("proxy_cache_gb", DEFAULT_CACHE_GB)),
+            archive_roots=[str(r) for r in data.get("archive_roots", []) if str(r).strip()],
+            auto_start_cards=bool(data.get("auto_start_cards", False)),
         )
     except Exception:
         return AppSettings()
 
 
 def save_settings(path: Path, s: AppSettings) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+    """
+    Rapid saves (e.g. flipping through drive combos) are merged into one atomic write.
+    """
     data = {
         "last_archive_root": s.last_archive_root,
         "last_proxy_root": s.last_proxy_root,
+        "proxy_cache_gb": s.proxy_cache_gb,
+        "archive_roots": s.archive_roots,
+        "auto_start_cards": s.auto_start_cards,
     }
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    json_state(path).write(data)
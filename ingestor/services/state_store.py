@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEBOUNCE_S = 0.5
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write to a temp file next to path, fsync, then os.replace() over it:
+    readers see the old file or the new one, never half of one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FileLock:
+    """
+    Exclusive lock on a lock file, across processes (and across FileLock objects
+    in one process). The OS drops it when the process dies, so a crash never
+    leaves a stale lock behind.
+
+        with FileLock(path.with_name(path.name + ".lock")):
+            ...read, change, flush...
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, *, blocking: bool = True, poll_s: float = 0.05) -> bool:
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        while not self._try_lock(fd):
+            if not blocking:
+                os.close(fd)
+                return False
+            time.sleep(poll_s)
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        os.close(fd)  # also drops a flock
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class JsonState:
+    """
+    One JSON file, parsed once and kept in memory.
+
+    read() returns the cached value while the file's (mtime, size) hasn't moved,
+    so repeated loads cost a stat. write() updates the cache at once and saves
+    after DEBOUNCE_S of quiet, so a burst of changes is one atomic replace.
+    Treat what read() returns as read-only - it is the cached object.
+
+    update(fn) is the read-change-save for files more than one process writes
+    (GUI + headless runner): under the file's lock it re-reads what's on disk,
+    applies fn and saves right away.
+    """
+
+    def __init__(self, path: Path, *, debounce_s: float = DEBOUNCE_S, indent: Optional[int] = 2):
+        self.path = Path(path)
+        self.debounce_s = debounce_s
+        self.indent = indent
+        self._lock = threading.RLock()
+        self._value: Any = None
+        self._stamp: Optional[tuple] = None
+        self._pending = False
+        self._timer: Optional[threading.Timer] = None
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def read(self, default: Any = None) -> Any:
+        with self._lock:
+            if self._pending:
+                return self._value  # ours is newer than what's on disk
+            stamp = self._stat()
+            if stamp is None:
+                return default
+            if stamp != self._stamp:
+                try:
+                    self._value = json.loads(self.path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    return default
+                self._stamp = stamp
+            return self._value
+
+    def write(self, value: Any) -> None:
+        with self._lock:
+            self._value = value
+            self._pending = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_s, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def update(self, fn) -> Any:
+        """
+        value = fn(current value or None), saved at once under a cross-process lock.
+        """
+        with self._lock, FileLock(self.path.with_name(f".{self.path.name}.lock")):
+            self.flush()          # our own pending write goes first
+            self._stamp = None    # and the file is re-read, whoever wrote it
+            value = fn(self.read(default=None))
+            self.write(value)
+            self.flush()
+            return value
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            text = json.dumps(self._value, indent=self.indent, ensure_ascii=False)
+            try:
+                atomic_write_text(self.path, text)
+            except OSError:
+                return  # keep it pending; the next write / flush tries again
+            self._pending = False
+            self._stamp = self._stat()
+
+
+_states: Dict[Path, JsonState] = {}
+_states_lock = threading.Lock()
+
+
+def json_state(path: Path, **kwargs) -> JsonState:
+    """
+    The shared JsonState for a file (one per path per process).
+    """
+    key = Path(path).resolve()
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = JsonState(key, **kwargs)
+        return state
+
+
+@atexit.register
+def flush_all() -> None:
+    with _states_lock:
+        states = list(_states.values())
+    for s in states:
+        s.flush()
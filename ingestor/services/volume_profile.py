@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from .state_store import json_state
+
+
+PROFILES_NAME = "volume_profiles.json"
+
+BENCH_MB = 256             # sequential test size
+SMALL_FILES = 200          # small-file test count
+SMALL_SIZE = 4096
+CHUNK = 4 * 1024 * 1024
+OBSERVED_WEIGHT = 0.3      # how much one real ingest moves the observed average
+
+# Fallbacks when a volume has never been measured (a UHS-I reader / USB HDD)
+DEFAULT_READ_MB_S = 80.0
+DEFAULT_WRITE_MB_S = 120.0
+
+
+@dataclass(frozen=True)
+class VolumeProfile:
+    serial: str
+    label: str = ""
+    read_mb_s: float = 0.0         # benchmark: sequential read
+    write_mb_s: float = 0.0        # benchmark: sequential write (0 for cards - never written)
+    small_iops: float = 0.0        # benchmark: small files per second (open + 4 KB)
+    measured_at: str = ""
+    observed_read_mb_s: float = 0.0    # from real ingests (card side)
+    observed_write_mb_s: float = 0.0   # from real ingests (destination side)
+    ingests: int = 0
+
+    @property
+    def best_read_mb_s(self) -> float:
+        return self.observed_read_mb_s or self.read_mb_s
+
+    @property
+    def best_write_mb_s(self) -> float:
+        return self.observed_write_mb_s or self.write_mb_s
+
+
+def mb_per_s(n_bytes: int, seconds: float) -> float:
+    # MiB/s - the unit of every *_mb_s here, in the ledger metrics and in estimates
+    return round(n_bytes / 1024 ** 2 / seconds, 1) if seconds > 0 else 0.0
+
+
+def _big_files(root: Path, min_size: int) -> Iterator[Path]:
+    for dirpath, _dirs, names in os.walk(root):
+        for name in names:
+            p = Path(dirpath) / name
+            try:
+                if p.stat().st_size >= min_size:
+                    yield p
+            except OSError:
+                continue
+
+
+def _read_test(root: Path, limit: int) -> tuple[float, float]:
+    """
+    (sequential MB/s, small reads per second) from files already on the volume.
+    Freshly inserted cards aren't in the OS cache, so this is the real reader speed.
+    """
+    done = 0
+    started = time.monotonic()
+    for p in _big_files(root, CHUNK):
+        try:
+            with open(p, "rb", buffering=0) as f:
+                while done < limit:
+                    chunk = f.read(CHUNK)
+                    if not chunk:
+                        break
+                    done += len(chunk)
+        except OSError:
+            continue
+        if done >= limit:
+            break
+    seq = mb_per_s(done, time.monotonic() - started)
+
+    n = 0
+    started = time.monotonic()
+    for dirpath, _dirs, names in os.walk(root):
+        for name in names:
+            try:
+                with open(Path(dirpath) / name, "rb", buffering=0) as f:
+                    f.read(SMALL_SIZE)
+                n += 1
+            except OSError:
+                continue
+            if n >= SMALL_FILES:
+                break
+        if n >= SMALL_FILES:
+            break
+    elapsed = time.monotonic() - started
+    return seq, round(n / elapsed, 1) if n and elapsed > 0 else 0.0
+
+
+def _write_test(root: Path, limit: int) -> tuple[float, float]:
+    """
+    (sequential MB/s, small files per second) writing scratch files that are
+    fsync'ed (so we time the drive, not the cache) and deleted afterwards.
+    """
+    scratch = root / ".ingest_bench"
+    scratch.mkdir(exist_ok=True)
+    try:
+        block = os.urandom(CHUNK)
+        big = scratch / "seq.bin"
+        started = time.monotonic()
+        with open(big, "wb", buffering=0) as f:
+            done = 0
+            while done < limit:
+                done += f.write(block)
+            os.fsync(f.fileno())
+        seq = mb_per_s(done, time.monotonic() - started)
+        big.unlink()
+
+        small = os.urandom(SMALL_SIZE)
+        started = time.monotonic()
+        for i in range(SMALL_FILES):
+            with open(scratch / f"s{i:04d}.bin", "wb", buffering=0) as f:
+                f.write(small)
+                os.fsync(f.fileno())
+        elapsed = time.monotonic() - started
+        iops = round(SMALL_FILES / elapsed, 1) if elapsed > 0 else 0.0
+    finally:
+        for p in scratch.glob("*"):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+        try:
+            scratch.rmdir()
+        except OSError:
+            pass
+    return seq, iops
+
+
+def benchmark_volume(root: str, *, write: bool, size_mb: int = BENCH_MB) -> dict:
+    """
+    Quick speed test of a mounted volume (a few seconds).
+
+    write=False (cards): read-only - sequential read of the clips already on it
+    and small-file reads. Nothing is written to a camera card.
+    write=True (archive / SSD): sequential + small-file writes of scratch data,
+    plus a read of existing footage if there is any.
+    """
+    base = Path(root)
+    limit = size_mb * 1024 ** 2
+    result = {"read_mb_s": 0.0, "write_mb_s": 0.0, "small_iops": 0.0}
+    if write:
+        result["write_mb_s"], result["small_iops"] = _write_test(base, limit)
+        result["read_mb_s"], _ = _read_test(base, limit)
+    else:
+        result["read_mb_s"], result["small_iops"] = _read_test(base, limit)
+    return result
+
+
+class VolumeProfiles:
+    """
+    {serial: VolumeProfile} in volume_profiles.json (station-local). Keyed by
+    volume serial so a reader / drive keeps its profile across letters.
+    Changes are read-change-save under the file's lock: the GUI and a headless
+    runner may both record into it.
+    """
+
+    def __init__(self, path: Path):
+        self.state = json_state(Path(path))
+
+    def _all(self) -> Dict[str, dict]:
+        raw = self.state.read(default={})
+        return raw if isinstance(raw, dict) else {}
+
+    @staticmethod
+    def _profile(serial: str, data) -> Optional[VolumeProfile]:
+        if not isinstance(data, dict):
+            return None
+        try:
+            return VolumeProfile(**{**data, "serial": serial})
+        except TypeError:
+            return None
+
+    def get(self, serial: str) -> Optional[VolumeProfile]:
+        return self._profile(serial, self._all().get(serial))
+
+    def _change(self, serial: str, fn: Callable[[VolumeProfile], VolumeProfile]) -> VolumeProfile:
+        # fn(current profile) -> new one, against what's on disk right now
+        changed = []
+
+        def apply(raw):
+            data = dict(raw) if isinstance(raw, dict) else {}
+            p = fn(self._profile(serial, data.get(serial)) or VolumeProfile(serial=serial))
+            data[serial] = {k: v for k, v in asdict(p).items() if k != "serial"}
+            changed.append(p)
+            return data
+
+        self.state.update(apply)
+        return changed[0]
+
+    def put(self, profile: VolumeProfile) -> None:
+        self._change(profile.serial, lambda _old: profile)
+
+    def record_benchmark(self, serial: str, label: str, result: dict) -> VolumeProfile:
+        return self._change(serial, lambda p: replace(
+            p,
+            label=label or p.label,
+            read_mb_s=result.get("read_mb_s") or p.read_mb_s,
+            write_mb_s=result.get("write_mb_s") or p.write_mb_s,
+            small_iops=result.get("small_iops") or p.small_iops,
+            measured_at=time.strftime("%Y-%m-%d %H:%M"),
+        ))
+
+    def record_observed(
+        self,
+        serial: str,
+        label: str,
+        *,
+        read_bytes: int = 0,
+        read_seconds: float = 0.0,
+        write_bytes: int = 0,
+        write_seconds: float = 0.0,
+    ) -> None:
+        """
+        Folds a real ingest's bytes / seconds into the profile (moving average of MiB/s).
+        """
+        read_mb_s = mb_per_s(read_bytes, read_seconds)
+        write_mb_s = mb_per_s(write_bytes, write_seconds)
+        if not serial or not (read_mb_s or write_mb_s):
+            return
+
+        def _avg(old: float, new: float) -> float:
+            if not new:
+                return old
+            return round(new if not old else old + OBSERVED_WEIGHT * (new - old), 1)
+
+        self._change(serial, lambda p: replace(
+            p,
+            label=label or p.label,
+            observed_read_mb_s=_avg(p.observed_read_mb_s, read_mb_s),
+            observed_write_mb_s=_avg(p.observed_write_mb_s, write_mb_s),
+            ingests=p.ingests + 1,
+        ))
+
+
+def estimate_copy_seconds(
+    n_bytes: int,
+    card: Optional[VolumeProfile],
+    destinations: list[Optional[VolumeProfile]],
+) -> tuple[float, str]:
+    """
+    (seconds, bottleneck) for copying n_bytes from the card to every destination
+    in parallel: the slowest of the card read and each destination write.
+    """
+    legs = [("card reader", card.best_read_mb_s if card and card.best_read_mb_s else DEFAULT_READ_MB_S)]
+    for name, p in zip(("archive", "ssd"), destinations):
+        legs.append((name, p.best_write_mb_s if p and p.best_write_mb_s else DEFAULT_WRITE_MB_S))
+    bottleneck, mb_s = min(legs, key=lambda leg: leg[1])
+    return n_bytes / 1024 ** 2 / mb_s, bottleneck
+
+
+def robocopy_threads(card: Optional[VolumeProfile], default: int) -> int:
+    """
+    robocopy /MT per copy. Slow readers (SD UHS-I, most USB readers) thrash with
+    many parallel reads; fast media with good small-file rates (CFexpress, SSDs)
+    benefit from more.
+    """
+    if card is None or not card.best_read_mb_s:
+        return default
+    if card.best_read_mb_s < 100:
+        return 2
+    if card.best_read_mb_s >= 400 and card.small_iops >= 500:
+        return 8
+    return default
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QDialogButtonBox
+)
+
+from ..services.footage_catalog import find_clip, find_hash, index_volume, volumes
+from ..services.drives import list_drives, get_volume_info
+from ..services.project_registry import DEFAULT_BASE_FOLDER
+
+
+_HASH_RE = re.compile(r"^[0-9a-fA-F]{32}$")
+
+
+class _IndexWorker(QObject):
+    progress = Signal(str)
+    finished = Signal()
+
+    def __init__(self, catalog_path: Path):
+        super().__init__()
+        self.catalog_path = catalog_path
+
+    @Slot()
+    def run(self):
+        for root, _label in list_drives():
+            if not (Path(root) / DEFAULT_BASE_FOLDER).is_dir():
+                continue
+            label, serial = get_volume_info(root)
+            if not serial:
+                continue
+            self.progress.emit(f"Indexing {root} ({label or serial})...")
+            try:
+                r = index_volume(self.catalog_path, root, serial=serial, label=label)
+                self.progress.emit(f"{root}: {r['clips']} clips, {r['removed']} removed ({r['seconds']}s)")
+            except Exception as e:
+                self.progress.emit(f"{root}: failed - {e}")
+        self.finished.emit()
+
+
+class CatalogDialog(QDialog):
+    """
+    "Where is this clip?" across every archive drive the station has seen,
+    connected or not. Type a file name (or a 32-char hash) and press Enter.
+    """
+    COLUMNS = ["Clip", "Drive", "Serial", "Project", "Path", "Size", "Last seen"]
+
+    def __init__(self, catalog_path: Path, parent=None):
+        super().__init__(parent)
+        self.catalog_path = Path(catalog_path)
+        self.setWindowTitle("Footage Catalog")
+        self.resize(1000, 500)
+
+        root = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Clip"))
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("A001C012.MXF  or a file hash")
+        self.query_edit.returnPressed.connect(self.search)
+        top.addWidget(self.query_edit, 1)
+        self.index_btn = QPushButton("Index connected drives")
+        self.index_btn.clicked.connect(self.index_drives)
+        top.addWidget(self.index_btn)
+        root.addLayout(top)
+
+        self.status_lbl = QLabel("")
+        self.status_lbl.setStyleSheet("color: #666;")
+        root.addWidget(self.status_lbl)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        root.addWidget(self.table, 1)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        root.addWidget(buttons)
+
+        self._thread = None
+        self._show_volumes()
+
+    def _show_volumes(self):
+        try:
+            vols = volumes(self.catalog_path)
+        except Exception as e:
+            self.status_lbl.setText(f"Failed to read catalog: {e}")
+            return
+        clips = sum(v["clips"] for v in vols)
+        self.status_lbl.setText(f"{clips} clips on {len(vols)} drives.")
+
+    def search(self):
+        q = self.query_edit.text().strip()
+        if not q:
+            return
+        try:
+            hits = find_hash(self.catalog_path, q) if _HASH_RE.match(q) else find_clip(self.catalog_path, q)
+        except Exception as e:
+            self.status_lbl.setText(f"Search failed: {e}")
+            return
+
+        self.table.setRowCount(len(hits))
+        for r, h in enumerate(hits):
+            values = [
+                h.name, h.label or "(No Label)", h.serial, h.project, h.last_path,
+                f"{h.size / 1024 ** 2:.1f} MB", h.last_seen,
+            ]
+            for c, v in enumerate(values):
+                self.table.setItem(r, c, QTableWidgetItem(v))
+        self.status_lbl.setText(f"{len(hits)} copies found." if hits else "Not in the catalog.")
+
+    def index_drives(self):
+        if self._thread is not None:
+            return
+        self.index_btn.setEnabled(False)
+        self._thread = QThread(self)
+        self._worker = _IndexWorker(self.catalog_path)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self.status_lbl.setText)
+        self._worker.finished.connect(self._thread.quit)
+        self._worker.finished.connect(self._on_indexed)
+        self._thread.start()
+
+    def _on_indexed(self):
+        self._thread.wait()
+        self._thread = None
+        self.index_btn.setEnabled(True)
+        self._show_volumes()
+
+    def reject(self):
+        if self._thread is not None:
+            return  # let the scan finish; a half-done index is fine but a dead thread isn't
+        super().reject()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+
+from PySide6.QtCore import QAbstractNativeEventFilter, QCoreApplication, QObject, Signal
+
+from ..services.drive_service import DriveService, get_drive_service
+
+
+WM_DEVICECHANGE = 0x0219
+
+
+class _DeviceChangeFilter(QAbstractNativeEventFilter):
+    """
+    Windows tells every top-level window about volume arrival / removal
+    (WM_DEVICECHANGE); we just make the drive service poll right away.
+    """
+
+    def __init__(self, service: DriveService):
+        super().__init__()
+        self.service = service
+
+    def nativeEventFilter(self, event_type, message):
+        if bytes(event_type) in (b"windows_generic_MSG", b"windows_dispatcher_MSG"):
+            from ctypes import wintypes
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == WM_DEVICECHANGE:
+                self.service.refresh()
+        return False, 0
+
+
+_device_filter: _DeviceChangeFilter | None = None
+
+
+class DriveWatcher(QObject):
+    """
+    Qt side of the drive service: `changed` carries the new list[DriveInfo] and
+    `card_inserted` (DriveInfo, card kind) fires once per inserted card; both are
+    delivered on the GUI thread (queued across threads by Qt).
+    """
+    changed = Signal(list)
+    card_inserted = Signal(object, str)
+
+    def __init__(self, service: DriveService | None = None, parent=None):
+        super().__init__(parent)
+        self.service = service or get_drive_service()
+        unsubscribe = self.service.subscribe(self.changed.emit)
+        unsubscribe_cards = self.service.on_card_inserted(self.card_inserted.emit)
+        self.destroyed.connect(lambda *_: (unsubscribe(), unsubscribe_cards()))
+        _install_device_filter(self.service)
+
+    def drives(self, *, removable_only: bool = False):
+        return self.service.drives(removable_only=removable_only)
+
+    def refresh(self):
+        self.service.refresh(force=True)
+
+
+def _install_device_filter(service: DriveService) -> None:
+    global _device_filter
+    app = QCoreApplication.instance()
+    if os.name != "nt" or _device_filter is not None or app is None:
+        return
+    _device_filter = _DeviceChangeFilter(service)
+    app.installNativeEventFilter(_device_filter)
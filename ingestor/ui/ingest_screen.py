@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import replace
+import uuid
 from datetime import datetime, date
+from pathlib import Path
 # import winsound
 
 from PySide6.QtCore import Qt, QTimer
@@ -12,22 +15,35 @@ from PySide6.QtWidgets import (
 from ..models import JobConfig
 from ..ui.widgets import title_label, section_label, hline
 from ..services.ledger import append_session_row
+from ..services.settings_store import load_settings, save_settings
 from PySide6.QtWidgets import QComboBox, QMessageBox
-# from ..services.drives_windows import list_removable_drives, drive_display
-from ..services.drives_windows import list_windows_drives, drive_display
-from ..services.drives_windows import get_drive_space
+from ..ui.drive_watcher import DriveWatcher
 
 from PySide6.QtCore import QThread
-from ..services.ingest_worker import IngestWorker, IngestArgs
+from ..services.ingest_queue import (
+    IngestArgs, QUEUE_NAME, QUEUED, HELD, RUNNING, DONE, FAILED, CANCELED, get_ingest_queue,
+)
+from ..ui.queue_watcher import QueueWatcher
+from ..services.ingest_engine import required_space
+from ..services.project_registry import DEFAULT_BASE_FOLDER
+from ..services.footage_catalog import CATALOG_NAME
+from ..services.volume_profile import PROFILES_NAME, VolumeProfiles, estimate_copy_seconds
+from ..services.benchmark_worker import BenchmarkWorker
+from ..services.fingerprint_worker import FingerprintWorker
+from ..services.card_fingerprint import describe_previous
 
 
 class IngestScreen(QWidget):
-    def __init__(self, on_done, on_back_to_setup, ledger_path):
+    def __init__(self, on_done, on_back_to_setup, ledger_path, settings_path):
         super().__init__()
         self.on_done = on_done
         self.on_back_to_setup = on_back_to_setup
         self.ledger_path = ledger_path
+        self.settings_path = settings_path
         self._session_started_at = None
+        self._session_bytes = 0
+        self._session_copy_seconds = 0.0
+        self._session_cards: list[dict] = []
 
         self.job: JobConfig | None = None
         self.current_sd_index = 0
@@ -68,15 +84,49 @@ class IngestScreen(QWidget):
         src_row = QHBoxLayout()
         src_row.addWidget(QLabel("Source Card Drive"))
         self.source_combo = QComboBox()
-        self.source_combo.currentIndexChanged.connect(self._update_continue_enabled)
+        self.source_combo.currentIndexChanged.connect(self._on_source_changed)
 
         self.source_refresh_btn = QPushButton("Refresh")
-        self.source_refresh_btn.clicked.connect(self.refresh_source_drives)
+        self.source_refresh_btn.clicked.connect(self.refresh_source_drives_clicked)
+
+        # Drives are listed / measured by the drive service in the background
+        self._drive_watcher = DriveWatcher(parent=self)
+        self._drive_watcher.changed.connect(self._on_drives_changed)
+        self._drive_watcher.card_inserted.connect(self._on_card_inserted)
+        self._source_drives: list[tuple[str, str]] = []
+
+        # Card fingerprints by root: (serial, CardFingerprint, previous ingests); checked in the background
+        self._fingerprints: dict[str, tuple] = {}
+        self._fp_thread: QThread | None = None
+        self._fp_queue: list[str] = []
+        self._auto_start_root = ""
+
+        # Cards are copied by the station's ingest queue in the background; we only
+        # submit and watch. _card_jobs: {job id: sd index} for this session.
+        self._queue = get_ingest_queue(Path(settings_path).parent / QUEUE_NAME)
+        self._queue_watcher = QueueWatcher(self._queue, parent=self)
+        self._queue_watcher.job_changed.connect(self._on_job_changed)
+        self._session_tag = ""
+        self._card_jobs: dict[str, int] = {}
+        self._pending_space: dict[str, tuple[int, int]] = {}  # job id -> (archive, ssd) bytes still to land
+        self._cards_done = 0
+        self._session_failed = False
+        self._earlier_jobs: set[str] = set()  # held jobs from a previous run, resumed here
+
+        self.benchmark_btn = QPushButton("Benchmark")
+        self.benchmark_btn.setToolTip("Measure the card reader (read only) and the destination drives")
+        self.benchmark_btn.clicked.connect(self.benchmark_clicked)
 
         src_row.addWidget(self.source_combo, 1)
         src_row.addWidget(self.source_refresh_btn)
+        src_row.addWidget(self.benchmark_btn)
         root.addLayout(src_row)
 
+        self.auto_start_chk = QCheckBox("Start automatically when a card is inserted")
+        self.auto_start_chk.setChecked(load_settings(self.settings_path).auto_start_cards)
+        self.auto_start_chk.toggled.connect(self._on_auto_start_toggled)
+        root.addWidget(self.auto_start_chk)
+
         # --- Space check (v1) ---
         self.space_card_used = QLabel("Card used: —")
         self.space_archive_free = QLabel("Archive free: —")
@@ -89,6 +139,10 @@ class IngestScreen(QWidget):
         root.addWidget(self.space_proxy_free)
         root.addWidget(self.space_status)
 
+        self.queue_status = QLabel("")
+        self.queue_status.setStyleSheet("color: #666;")
+        root.addWidget(self.queue_status)
+
         # Dev-only toggle remains (UX skeleton mode)
         # self.sim_card_chk = QCheckBox("DEV: simulate card inserted (temporary)")
         # self.sim_card_chk.stateChanged.connect(self._update_continue_enabled)
@@ -138,26 +192,141 @@ class IngestScreen(QWidget):
 
         self.current_sd_index = 1
 
-        self._thread: QThread | None = None
-        self._worker: IngestWorker | None = None
+        self._thread: QThread | None = None  # benchmark
 
     def refresh_source_drives(self):
+        prev = self.source_combo.currentData()
 
         self.source_combo.blockSignals(True)
         self.source_combo.clear()
         self.source_combo.addItem("Select card drive...", "")
 
-        # drives = list_removable_drives() or []
-        drives = list_windows_drives() or []
-        for root, label in drives:
-            self.source_combo.addItem(drive_display(root, label), root)
+        # Cards already queued / copying aren't offered again
+        busy = self._busy_roots()
+        self._source_drives = [(d.root, d.display) for d in self._drive_watcher.drives() if d.root not in busy]
+        for root, display in self._source_drives:
+            self.source_combo.addItem(display, root)
+        if prev:
+            idx = self.source_combo.findData(prev)
+            if idx != -1:
+                self.source_combo.setCurrentIndex(idx)
 
         self.source_combo.blockSignals(False)
         self._update_continue_enabled()
 
+    def _busy_roots(self) -> set[str]:
+        return {j.args.sd_root for j in self._queue.jobs() if j.state in (QUEUED, RUNNING)}
+
+    def refresh_source_drives_clicked(self):
+        # Re-probe now; the list updates when the service reports back
+        self._drive_watcher.refresh()
+        self.refresh_source_drives()
+
+    def _on_drives_changed(self, drives: list):
+        if self._phase != "waiting_card":
+            return
+        if [(d.root, d.display) for d in drives] != self._source_drives:
+            self.refresh_source_drives()
+        else:
+            self._update_continue_enabled()  # free space moved
+
+    def _on_auto_start_toggled(self, checked: bool):
+        s = load_settings(self.settings_path)
+        save_settings(self.settings_path, replace(s, auto_start_cards=checked))
+
+    def _on_card_inserted(self, drive, kind: str):
+        """
+        A card went in: select it, and start the copy if auto-start is on and it fits.
+        """
+        if self._phase != "waiting_card" or not self.job:
+            return
+        if drive.root in (self.job.archive_path, self.job.proxy_path):
+            return
+
+        self.refresh_source_drives()
+        idx = self.source_combo.findData(drive.root)
+        if idx == -1:
+            return
+        self._log(f"Card inserted: {drive.display}" + (f" ({kind})" if kind else ""))
+        # New card in that slot: forget what we knew; auto-start waits for the duplicate check
+        self._fingerprints.pop(drive.root, None)
+        self._auto_start_root = drive.root if self.auto_start_chk.isChecked() else ""
+        self.source_combo.setCurrentIndex(idx)  # runs the space check
+        self._check_card(drive.root)
+
+    def _on_source_changed(self):
+        self._update_continue_enabled()
+        root = self.source_combo.currentData()
+        if isinstance(root, str) and root and self._phase == "waiting_card":
+            self._check_card(root)
+
+    # ---------- Double-ingest check ----------
+    def _check_card(self, root: str):
+        d = self._drive_watcher.service.drive(root)
+        serial = d.serial if d else ""
+        known = self._fingerprints.get(root)
+        if known and known[0] == serial:
+            self._on_card_checked(root, known[1], known[2], cached=True)
+            return
+        if self._fp_thread is not None:
+            if root not in self._fp_queue:
+                self._fp_queue.append(root)
+            return
+
+        self._fp_thread = QThread(self)
+        self._fp_worker = FingerprintWorker(
+            root, serial, self.ledger_path, Path(self.settings_path).parent / CATALOG_NAME
+        )
+        self._fp_worker.moveToThread(self._fp_thread)
+        self._fp_thread.started.connect(self._fp_worker.run)
+        self._fp_worker.finished.connect(self._on_card_checked)
+        self._fp_worker.finished.connect(self._fp_thread.quit)
+        self._fp_thread.finished.connect(self._fp_thread.deleteLater)
+        self._fp_thread.finished.connect(self._on_fp_thread_done)
+        self._fp_thread.start()
+
+    def _on_fp_thread_done(self):
+        self._fp_thread = None
+        if self._fp_queue:
+            self._check_card(self._fp_queue.pop(0))
+
+    def _on_card_checked(self, root: str, fp, found: list, cached: bool = False):
+        if fp is None:
+            return
+        if not cached:
+            self._fingerprints[root] = (fp.serial, fp, found)
+        if root != self.source_combo.currentData():
+            return
+
+        auto = self._auto_start_root == root
+        self._auto_start_root = ""
+        if found:
+            msg = f"This card was {describe_previous(found)}."
+            self._log(f"⚠️ {msg}")
+            if not cached:
+                QMessageBox.warning(self, "Card Already Ingested", msg + "\n\nCheck before copying it again.")
+            if auto:
+                self._log("Not starting automatically: card already ingested.")
+            return
+
+        if auto and self._phase == "waiting_card":
+            if self.continue_btn.isEnabled():
+                self._log(f"Starting SD{self.current_sd_index} automatically.")
+                self.continue_clicked()
+            else:
+                self._log(f"Not starting automatically: {self.space_status.text()}")
+
     def load_job(self, job: JobConfig):
         self.job = job
         self._session_started_at = datetime.now()
+        self._session_bytes = 0
+        self._session_copy_seconds = 0.0
+        self._session_cards = []
+        self._session_tag = f"gui-{uuid.uuid4().hex[:8]}"
+        self._card_jobs = {}
+        self._pending_space = {}
+        self._cards_done = 0
+        self._session_failed = False
         self.current_sd_index = 0
         self._fake_progress = 0
         self._phase = "waiting_card"
@@ -168,6 +337,9 @@ class IngestScreen(QWidget):
         self.close_btn.setVisible(False)
         self.cancel_btn.setVisible(True)
         self.continue_btn.setVisible(True)
+        # A failed / canceled session leaves these disabled (only a success resets the screen)
+        self.source_combo.setEnabled(True)
+        self.source_refresh_btn.setEnabled(True)
 
         self.refresh_source_drives()
         self._update_continue_enabled()
@@ -184,6 +356,7 @@ class IngestScreen(QWidget):
         self.log.clear()
         self._log(f"Ready. {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self._advance_to_next_card()
+        QTimer.singleShot(0, self._offer_held_jobs)
 
     def _log(self, msg: str):
         self.log.append(msg)
@@ -209,8 +382,8 @@ class IngestScreen(QWidget):
 
 
     def _update_continue_enabled(self):
-        # Must be waiting for a card
-        if self._phase != "waiting_card":
+        # Must be waiting for a card (and not benchmarking)
+        if self._phase != "waiting_card" or getattr(self, "_thread", None) is not None:
             self.continue_btn.setEnabled(False)
             return
 
@@ -236,61 +409,10 @@ class IngestScreen(QWidget):
     #     self.continue_btn.setEnabled(can_continue)
 
     def continue_clicked(self):
-        # if self._phase != "waiting_card":
-        #     return
-        # if not self.sim_card_chk.isChecked():
-        #     return
-
-        self.continue_btn.setEnabled(False)
-        self._phase = "copying"
-        self._fake_progress = 0
-        self._log(f"Detected card #{self.current_sd_index} (simulated).")
-        self._log("Copying originals to ARCHIVE...")
-        # self._timer.start(60)
-        sd_root = self.source_combo.currentData()
-        if not isinstance(sd_root, str) or not sd_root:
-            self._log("Select source card drive.")
-            return
-
-        if not self.job or not self.job.archive_path or not self.job.proxy_path:
-            self._log("Missing destination drives.")
-            return
-
-        base_folder = "Cactus"
-        client_project = self.job.safe_project_folder()  # or build from client/project fields
-        ingest_date = date.today().isoformat()  # later we can add a date picker
-
-        args = IngestArgs(
-            sd_root=sd_root,
-            archive_root=self.job.archive_path,
-            ssd_root=self.job.proxy_path,
-            base_folder_name=base_folder,
-            client_project=client_project,
-            ingest_date=ingest_date,
-            sd_index=self.current_sd_index,
-        )
-
-        # 2) Lock UI
-        self._set_copy_running_ui(True)
-
-        # 3) Start worker thread
-        self._thread = QThread(self)
-        self._worker = IngestWorker(args)
-        self._worker.moveToThread(self._thread)
-
-        self._thread.started.connect(self._worker.run)
-        self._worker.finished.connect(self._on_ingest_finished)
-        self._worker.failed.connect(self._on_ingest_crashed)
-
-        # cleanup
-        self._worker.finished.connect(self._thread.quit)
-        self._worker.failed.connect(self._thread.quit)
-        self._thread.finished.connect(self._thread.deleteLater)
-        self._thread.finished.connect(self._clear_worker_refs)
-
-        self._thread.start()
-
-        # 1) Gather inputs
+        """
+        Queues the selected card and moves straight on to the next one; the
+        ingest queue copies cards one after another in the background.
+        """
         sd_root = self.source_combo.currentData()
         if not isinstance(sd_root, str) or not sd_root:
             self._log("Select source card drive.")
@@ -299,10 +421,13 @@ class IngestScreen(QWidget):
         if not self.job or not self.job.archive_path or not self.job.proxy_path:
             self._log("Missing destination drives.")
             return
+        self.continue_btn.setEnabled(False)
 
-        base_folder = "Cactus"
+        base_folder = DEFAULT_BASE_FOLDER
         client_project = self.job.safe_project_folder()  # or build from client/project fields
         ingest_date = date.today().isoformat()  # later we can add a date picker
+        known = self._fingerprints.get(sd_root)
+        drive = self._drive_watcher.service.drive(sd_root)
 
         args = IngestArgs(
             sd_root=sd_root,
@@ -312,27 +437,34 @@ class IngestScreen(QWidget):
             client_project=client_project,
             ingest_date=ingest_date,
             sd_index=self.current_sd_index,
+            keep_originals_on_proxy=self.job.keep_originals_on_proxy,
+            proxy_cache_max_bytes=int(load_settings(self.settings_path).proxy_cache_gb * 1024**3),
+            # Station-local, next to settings.json / the ledger
+            probe_cache_path=str(Path(self.settings_path).parent / "media_probe_cache.json"),
+            manifest_path=str(Path(self.settings_path).parent / "ingest_manifest.db"),
+            catalog_path=str(Path(self.settings_path).parent / CATALOG_NAME),
+            profiles_path=str(self._profiles_path()),
+            card_fingerprint=known[1].digest if known else "",  # from the double-ingest check
         )
 
-        # 2) Lock UI
-        self._set_copy_running_ui(True)
-
-        # 3) Start worker thread
-        self._thread = QThread(self)
-        self._worker = IngestWorker(args)
-        self._worker.moveToThread(self._thread)
-
-        self._thread.started.connect(self._worker.run)
-        self._worker.finished.connect(self._on_ingest_finished)
-        self._worker.failed.connect(self._on_ingest_crashed)
-
-        # cleanup
-        self._worker.finished.connect(self._thread.quit)
-        self._worker.failed.connect(self._thread.quit)
-        self._thread.finished.connect(self._thread.deleteLater)
-        self._thread.finished.connect(self._clear_worker_refs)
+        queued = self._queue.submit(args, tag=self._session_tag, source_serial=drive.serial if drive else "")
+        self._card_jobs[queued.id] = self.current_sd_index
+        space = self._drive_watcher.service.space(sd_root)
+        if space:
+            self._pending_space[queued.id] = required_space(
+                max(0, space[0] - space[1]), keep_originals_on_proxy=self.job.keep_originals_on_proxy
+            )
+        self._log(f"SD{self.current_sd_index} queued ({drive.display if drive else sd_root}).")
 
-        self._thread.start()
+        if self.current_sd_index < self.job.num_cards:
+            self._advance_to_next_card()
+            self.refresh_source_drives()
+        else:
+            self._phase = "copying"
+            self.source_combo.setEnabled(False)
+            self.source_refresh_btn.setEnabled(False)
+            self.instruction.setText("All cards queued - copying…")
+        self._update_queue_status()
 
     def cancel_clicked(self):
         if not self.job:
@@ -347,6 +479,11 @@ class IngestScreen(QWidget):
         if reply == QMessageBox.Yes:
             # self._timer.stop()
             self._log("Ingest canceled by user.")
+            self._session_tag = ""  # stop following this session's jobs
+            for job_id, sd_index in list(self._card_jobs.items()):
+                if not self._queue.cancel(job_id) and self._queue.job(job_id).state == RUNNING:
+                    self._log(f"SD{sd_index} is already copying and will finish in the background.")
+            self._card_jobs = {}
             # try:
             #     if self._session_started_at and self.job:
             #         append_session_row(
@@ -403,6 +540,18 @@ class IngestScreen(QWidget):
         self.instruction.setText("✅ Ingest Complete")
         self._log("All cards ingested successfully. Ready for handoff.")
 
+        self._write_ledger("OK")
+
+        self.continue_btn.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        if hasattr(self, "sim_card_chk"):
+            self.sim_card_chk.setVisible(False)
+
+        self.eject_btn.setVisible(True)
+        self.close_btn.setVisible(True)
+        self._show_success_dialog()
+
+    def _write_ledger(self, status: str):
         # Write one row to the ingest ledger (ingest PC only)
         try:
             if self._session_started_at and self.job:
@@ -410,20 +559,15 @@ class IngestScreen(QWidget):
                     self.ledger_path,
                     started_at=self._session_started_at,
                     finished_at=datetime.now(),
-                    status="OK",
+                    status=status,
                     job=self.job,
+                    total_bytes=self._session_bytes,
+                    copy_seconds=self._session_copy_seconds,
+                    cards=self._session_cards,
                 )
         except Exception:
             print('ledger failed')
 
-        self.continue_btn.setVisible(False)
-        self.cancel_btn.setVisible(False)
-        self.sim_card_chk.setVisible(False)
-
-        self.eject_btn.setVisible(True)
-        self.close_btn.setVisible(True)
-        self._show_success_dialog()
-
     def eject_clicked(self):
         QMessageBox.information(
             self,
@@ -438,12 +582,6 @@ class IngestScreen(QWidget):
         gb = n / (1024 ** 3)
         return f"{gb:.1f} GB"
 
-    @staticmethod
-    def _required_with_margin(used_bytes: int) -> int:
-        # max(2GB, 5%) safety buffer
-        margin = max(int(used_bytes * 0.05), 2 * 1024**3)
-        return used_bytes + margin
-
     def _check_space_ok(self) -> tuple[bool, str]:
         """
         Returns (ok, message). Requires BOTH archive and proxy drives to fit the card.
@@ -461,19 +599,32 @@ class IngestScreen(QWidget):
         if not archive or not proxy:
             return False, "Missing destination drive selection."
 
+        # Cached by the drive service - never blocks on a slow drive
+        service = self._drive_watcher.service
+        spaces = {name: service.space(root) for name, root in (("card", src), ("archive", archive), ("ssd", proxy))}
+        missing = [name for name, sp in spaces.items() if sp is None]
+        if missing:
+            return False, f"Checking drive space ({', '.join(missing)})…"
+
         try:
-            src_total, src_free = get_drive_space(src)
+            src_total, src_free = spaces["card"]
             used = max(0, src_total - src_free)
-            req = self._required_with_margin(used)
+            # Counted in full here, proxy-only too: the clips aren't probed yet, and light
+            # ones land on the SSD at full size (the engine refines this once it has probed)
+            req, p_req = required_space(used, keep_originals_on_proxy=self.job.keep_originals_on_proxy)
 
-            a_total, a_free = get_drive_space(archive)
-            p_total, p_free = get_drive_space(proxy)
+            a_total, a_free = spaces["archive"]
+            p_total, p_free = spaces["ssd"]
+            # Cards queued ahead of this one will land first (a running copy is counted
+            # in full until it's done - errs on the safe side)
+            a_free -= sum(a for a, _p in self._pending_space.values())
+            p_free -= sum(p for _a, p in self._pending_space.values())
 
             # Update UI text
             self.space_card_used.setText(f"Card used: {self._fmt_bytes(used)} (needs ~{self._fmt_bytes(req)})")
 
             ok_a = a_free >= req
-            ok_p = p_free >= req
+            ok_p = p_free >= p_req
 
             self.space_archive_free.setText(
                 f"Archive free: {self._fmt_bytes(a_free)} " + ("✅" if ok_a else "❌")
@@ -483,70 +634,239 @@ class IngestScreen(QWidget):
             )
 
             if ok_a and ok_p:
-                return True, "Space check OK."
+                return True, "Space check OK. " + self._eta_text(used, src, archive, proxy)
             else:
                 parts = []
                 if not ok_a:
                     parts.append(f"Archive needs {self._fmt_bytes(req)} but has {self._fmt_bytes(a_free)}")
                 if not ok_p:
-                    parts.append(f"SSD needs {self._fmt_bytes(req)} but has {self._fmt_bytes(p_free)}")
+                    parts.append(f"SSD needs {self._fmt_bytes(p_req)} but has {self._fmt_bytes(p_free)}")
                 return False, " | ".join(parts)
 
         except Exception as e:
             # If anything fails (permissions/unready drive), block
             return False, f"Space check error: {e}"
 
-    def _clear_worker_refs(self):
-        self._worker = None
-        self._thread = None
+    def _profiles_path(self) -> Path:
+        # Station-local, next to settings.json
+        return Path(self.settings_path).parent / PROFILES_NAME
+
+    def _eta_text(self, n_bytes: int, src: str, archive: str, proxy: str) -> str:
+        """
+        "ETA ~4 min (card reader)" from the measured / observed volume profiles.
+        """
+        if not self.job:
+            return ""
+        service = self._drive_watcher.service
+        profiles = VolumeProfiles(self._profiles_path())
+
+        def _profile(root):
+            d = service.drive(root)
+            return profiles.get(d.serial) if d and d.serial else None
 
-    def _set_copy_running_ui(self, running: bool):
-        # Disable inputs while copying
-        self.continue_btn.setEnabled(not running)
-        self.source_combo.setEnabled(not running)
-        self.source_refresh_btn.setEnabled(not running)
+        dests = [_profile(archive)] + ([_profile(proxy)] if self.job.keep_originals_on_proxy else [])
+        seconds, bottleneck = estimate_copy_seconds(n_bytes, _profile(src), dests)
+        return f"ETA ~{max(1, round(seconds / 60))} min ({bottleneck})"
 
-        # If you still have the DEV checkbox:
-        # self.sim_card_chk.setEnabled(not running)
+    def benchmark_clicked(self):
+        if self._thread is not None:
+            return
+        src = self.source_combo.currentData()
+        dests = [self.job.archive_path, self.job.proxy_path] if self.job else []
+        if not src and not any(dests):
+            self._log("Select a card drive to benchmark.")
+            return
+
+        self.benchmark_btn.setEnabled(False)
+        self.continue_btn.setEnabled(False)
+        self._thread = QThread(self)
+        self._bench_worker = BenchmarkWorker(self._profiles_path(), src or "", dests)
+        self._bench_worker.moveToThread(self._thread)
+        self._thread.started.connect(self._bench_worker.run)
+        self._bench_worker.progress.connect(self._log)
+        self._bench_worker.finished.connect(self._on_benchmark_finished)
+        self._bench_worker.finished.connect(self._thread.quit)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._thread.finished.connect(self._clear_worker_refs)
+        self._thread.start()
 
-        # Optional: show state label
+    def _on_benchmark_finished(self, done: dict):
+        for root, p in done.items():
+            line = f"   {root}: read {p.read_mb_s:.0f} MB/s"
+            if p.write_mb_s:
+                line += f", write {p.write_mb_s:.0f} MB/s"
+            self._log(line + f", {p.small_iops:.0f} small files/s")
+        self.benchmark_btn.setEnabled(True)
+        self._update_continue_enabled()
+
+    def _clear_worker_refs(self):
+        self._bench_worker = None
+        self._thread = None
+
+    # ---------- Ingest queue ----------
+    def _update_queue_status(self):
+        if not self.job:
+            return
+        jobs = [self._queue.job(job_id) for job_id in self._card_jobs]
+        running = [f"SD{j.args.sd_index}" for j in jobs if j and j.state == RUNNING]
+        waiting = [f"SD{j.args.sd_index}" for j in jobs if j and j.state == QUEUED]
+        parts = []
         if running:
-            self.space_status.setText(f"Copying SD{self.current_sd_index} to Archive + SSD…")
-        else:
-            # space_status will be updated by space check / waiting state
-            pass
+            parts.append(f"Copying {', '.join(running)}")
+        if waiting:
+            parts.append(f"queued {', '.join(waiting)}")
+        self.queue_status.setText(" | ".join(parts))
+        self.progress.setValue(int(100 * self._cards_done / max(1, self.job.num_cards)))
 
-    def _on_ingest_crashed(self, msg: str):
-        self._set_copy_running_ui(False)
-        self._log(f"❌ Ingest crashed: {msg}")
+    def _offer_held_jobs(self):
+        """
+        Cards left queued / copying when the app last closed come back on hold:
+        resume them in the background or discard them.
+        """
+        held = self._queue.jobs(states=(HELD,))
+        if not held:
+            return
+        lines = "\n".join(
+            f"SD{j.args.sd_index} {j.args.client_project} ({j.args.ingest_date}) from {j.args.sd_root}"
+            for j in held
+        )
+        box = QMessageBox(self)
+        box.setWindowTitle("Unfinished cards")
+        box.setIcon(QMessageBox.Question)
+        box.setText(
+            f"{len(held)} card(s) from an earlier session were not copied:\n\n{lines}\n\n"
+            "Resumed cards are copied in the background, only if the same card is still in its reader."
+        )
+        resume_btn = box.addButton("Resume", QMessageBox.AcceptRole)
+        discard_btn = box.addButton("Discard", QMessageBox.DestructiveRole)
+        box.addButton("Later", QMessageBox.RejectRole)
+        box.exec()
+
+        if box.clickedButton() is resume_btn:
+            resumed = [j.id for j in held if self._queue.resume(j.id)]
+            self._earlier_jobs.update(resumed)
+            self._log(f"Resumed {len(resumed)} unfinished card(s) from an earlier session.")
+        elif box.clickedButton() is discard_btn:
+            n = sum(self._queue.cancel(j.id) for j in held)
+            self._log(f"Discarded {n} unfinished card(s) from an earlier session.")
+
+    def _on_job_changed(self, job):
+        if job.id in self._earlier_jobs:
+            # Not part of this session: just report how it went
+            label = f"Earlier SD{job.args.sd_index} ({job.args.client_project})"
+            if job.state == RUNNING:
+                self._log(f"{label}: copying…")
+            elif job.state == DONE:
+                self._log(f"✅ {label} copied.")
+            elif job.state in (FAILED, CANCELED):
+                err = job.error or (job.result or {}).get("message", "")
+                self._log(f"❌ {label} {job.state.lower()}{': ' + err if err else ''}")
+            if not job.active:
+                self._earlier_jobs.discard(job.id)
+            return
+        if job.tag != self._session_tag or job.id not in self._card_jobs:
+            return
+        if not job.active:
+            self._pending_space.pop(job.id, None)
+            if self._phase == "waiting_card":
+                self.refresh_source_drives()  # that reader is free again
+        if job.state == RUNNING:
+            if self.job and not self.job.keep_originals_on_proxy:
+                self._log(f"Copying SD{job.args.sd_index} to Archive (SSD: proxies only)…")
+            else:
+                self._log(f"Copying SD{job.args.sd_index} to Archive + SSD…")
+        elif job.state == DONE:
+            self._on_ingest_finished(job.args.sd_index, job.result or {})
+        elif job.state == FAILED:
+            if job.result:
+                self._on_ingest_finished(job.args.sd_index, job.result)
+            else:
+                self._on_ingest_crashed(job.args.sd_index, job.error)
+        elif job.state == QUEUED and job.error:
+            self._log(f"SD{job.args.sd_index} {job.error}")  # drive busy in another process
+        elif job.state == CANCELED:
+            self._card_jobs.pop(job.id, None)
+        self._update_queue_status()
+        self._check_session_done()
+
+    def _check_session_done(self):
+        if not self.job or self._phase in ("done", "failed"):
+            return
+        if any(j and j.active for j in map(self._queue.job, self._card_jobs)):
+            return
+        if self._session_failed:
+            self._phase = "failed"
+            self.queue_status.setText("")
+            # Recorded so failure rates show up in the analytics
+            self._write_ledger("FAILED")
+        elif self._phase == "copying":
+            self._log("✅ All cards ingested.")
+            self.queue_status.setText("")
+            # move to completion UI
+            self._finish_ui()
+
+    def _session_failed_stop(self):
+        # Stop the session here: nothing else of it gets copied
+        self._session_failed = True
+        self._phase = "failing"
+        for job_id in list(self._card_jobs):
+            self._queue.cancel(job_id)
+        self.continue_btn.setEnabled(False)
+        self.source_combo.setEnabled(False)
+        self.instruction.setText("❌ Ingest failed")
+
+    def _on_ingest_crashed(self, sd_index: int, msg: str):
+        self._log(f"❌ SD{sd_index} ingest crashed: {msg}")
+        self._session_failed_stop()
         # You can also pop a QMessageBox here.
 
-    def _on_ingest_finished(self, result: dict):
-        self._set_copy_running_ui(False)
+    def _on_ingest_finished(self, sd_index: int, result: dict):
+        self._session_bytes += int(result.get("bytes_copied") or 0)
+        self._session_copy_seconds += float(result.get("copy_seconds") or 0)
+        if result.get("metrics"):
+            self._session_cards.append(result["metrics"])
 
         if result.get("ok"):
-            self._log(f"✅ SD{self.current_sd_index} copy OK.")
-            # Advance to next card or finish session
-            if self.current_sd_index < self.job.num_cards:
-                self.current_sd_index += 1
-                self._log(f"Insert next card: SD{self.current_sd_index}")
-                self._phase = "waiting_card"
-                self.refresh_source_drives()
-                self._update_continue_enabled()
-            else:
-                self._log("✅ All cards ingested.")
-                # move to completion UI
-                self._finish_ui()
+            self._cards_done += 1
+            self._log(f"✅ SD{sd_index} copy OK.")
+            media = result.get("media") or {}
+            if media.get("clips"):
+                self._log(
+                    f"   {media['clips']} clips, {media['duration_s'] / 60:.0f} min "
+                    f"({', '.join(media.get('codecs', []))})"
+                )
+            m = result.get("metrics") or {}
+            if m.get("archive_seconds"):
+                speeds = f"Archive {m['archive_mb_s']:.0f} MB/s"
+                if m.get("ssd_seconds"):
+                    speeds += f", SSD {m['ssd_mb_s']:.0f} MB/s"
+                if m.get("retries"):
+                    speeds += f", {m['retries']} retries"
+                self._log(f"   {m['files']} files, {self._fmt_bytes(m['bytes'])} ({speeds})")
+            est = result.get("estimate") or {}
+            if est.get("seconds") and result.get("copy_seconds"):
+                self._log(
+                    f"   copy took {result['copy_seconds'] / 60:.1f} min "
+                    f"(estimated {est['seconds'] / 60:.1f} min, slowest leg: {est['bottleneck']})"
+                )
+            manifest = result.get("manifest") or {}
+            if "error" in manifest:
+                self._log(f"⚠️ File manifest not recorded: {manifest['error']}")
+            proxy = result.get("proxy") or {}
+            if proxy:
+                icon = "✅" if proxy.get("ok") else "⚠️"
+                self._log(f"{icon} {proxy.get('message', '')}")
+                for f in proxy.get("failed", []):
+                    self._log(f"   proxy failed: {f}")
         else:
-            self._phase = "failed"
-            self._log(f"❌ FAILED: {result.get('message', 'Unknown error')}")
+            self._log(f"❌ SD{sd_index} FAILED: {result.get('message', 'Unknown error')}")
             # Optional: show logs if provided
             a_log = result.get("archive_log")
             s_log = result.get("ssd_log")
             if a_log or s_log:
                 self._log(f"Archive log: {a_log}")
                 self._log(f"SSD log: {s_log}")
-            # Stop session here
+            self._session_failed_stop()
             # self._finish_failed_ui()
 
     def _show_success_dialog(self):
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTabWidget, QTableWidget, QTableWidgetItem,
+    QHeaderView, QDialogButtonBox
+)
+
+from ..services.ledger_analytics import ledger_stats
+
+
+def _fmt_bytes(n) -> str:
+    n = n or 0
+    if n >= 1024 ** 4:
+        return f"{n / 1024 ** 4:.2f} TB"
+    return f"{n / 1024 ** 3:.1f} GB"
+
+
+def _fmt_rate(r) -> str:
+    return f"{(r or 0) * 100:.0f}%"
+
+
+class LedgerAnalyticsDialog(QDialog):
+    """
+    Totals per client / project / day / drive pair, computed in SQLite.
+    Sessions recorded before bytes/durations were logged count as 0 bytes.
+    """
+    RANGES = [
+        ("Last 30 days", 30),
+        ("Last 90 days", 90),
+        ("Last 12 months", 365),
+        ("All time", 0),
+    ]
+
+    # (tab title, stats key, [(column label, row key, formatter)])
+    TABLES = [
+        ("Clients", "clients", [
+            ("Client", "client", str), ("Sessions", "sessions", str), ("Cards", "cards", str),
+            ("Data", "bytes", _fmt_bytes), ("Failed", "failure_rate", _fmt_rate),
+        ]),
+        ("Projects", "projects", [
+            ("Client", "client", str), ("Project", "project", str), ("Sessions", "sessions", str),
+            ("Cards", "cards", str), ("Data", "bytes", _fmt_bytes), ("Last", "last_session", str),
+        ]),
+        ("Per day", "per_day", [
+            ("Day", "day", str), ("Sessions", "sessions", str), ("Cards", "cards", str),
+            ("Data", "bytes", _fmt_bytes),
+        ]),
+        ("Drive pairs", "drive_pairs", [
+            ("MyBook", "archive_drive", str), ("SSD", "proxy_drive", str), ("Sessions", "sessions", str),
+            ("Data", "bytes", _fmt_bytes), ("Avg MB/s", "mb_s", lambda v: "" if v is None else f"{v:.0f}"),
+            ("Failed", "failure_rate", _fmt_rate),
+        ]),
+        ("Archive drives", "archives", [
+            ("MyBook", "archive_drive", str), ("Data written", "bytes", _fmt_bytes),
+            ("Ingest days", "days", str), ("Last", "last_session", str),
+        ]),
+        ("Card speeds", "card_speeds", [
+            ("MyBook", "archive_drive", str), ("Month", "month", str), ("Cards", "cards", str),
+            ("Archive MB/s", "archive_mb_s", lambda v: "" if v is None else f"{v:.0f}"),
+            ("SSD MB/s", "ssd_mb_s", lambda v: "" if v is None else f"{v:.0f}"),
+            ("Retries", "retries", str),
+        ]),
+    ]
+
+    def __init__(self, ledger_path: Path, parent=None):
+        super().__init__(parent)
+        self.ledger_path = Path(ledger_path)
+        self.setWindowTitle("Ledger Analytics")
+        self.resize(900, 600)
+
+        root = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Range"))
+        self.range_combo = QComboBox()
+        for label, days in self.RANGES:
+            self.range_combo.addItem(label, days)
+        self.range_combo.setCurrentIndex(len(self.RANGES) - 1)
+        self.range_combo.currentIndexChanged.connect(self.refresh)
+        top.addWidget(self.range_combo)
+        top.addStretch(1)
+        root.addLayout(top)
+
+        self.summary_lbl = QLabel("")
+        self.summary_lbl.setWordWrap(True)
+        root.addWidget(self.summary_lbl)
+
+        self.tabs = QTabWidget()
+        self._tables: dict[str, QTableWidget] = {}
+        for title, key, cols in self.TABLES:
+            t = QTableWidget(0, len(cols))
+            t.setHorizontalHeaderLabels([c[0] for c in cols])
+            t.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            t.verticalHeader().setVisible(False)
+            t.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+            t.horizontalHeader().setStretchLastSection(True)
+            self._tables[key] = t
+            self.tabs.addTab(t, title)
+        root.addWidget(self.tabs, 1)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        root.addWidget(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        days = self.range_combo.currentData() or 0
+        since = (date.today() - timedelta(days=days)).isoformat() if days else ""
+        try:
+            stats = ledger_stats(self.ledger_path, since=since)
+        except Exception as e:
+            self.summary_lbl.setText(f"Failed to read ledger: {e}")
+            return
+
+        tot = stats["totals"]
+        per_day = [d["bytes"] or 0 for d in stats["per_day"]]
+        avg_day = sum(per_day) / len(per_day) if per_day else 0
+        self.summary_lbl.setText(
+            f"<b>{tot['sessions']}</b> sessions, <b>{tot['cards']}</b> cards, "
+            f"<b>{_fmt_bytes(tot['bytes'])}</b> ingested "
+            f"({tot['first_day'] or '-'} → {tot['last_day'] or '-'}). "
+            f"Failed: {tot['failed']} ({_fmt_rate(tot['failure_rate'])}). "
+            f"Average per ingest day: {_fmt_bytes(avg_day)}."
+        )
+
+        for _title, key, cols in self.TABLES:
+            t = self._tables[key]
+            rows = stats[key]
+            t.setRowCount(len(rows))
+            for r, row in enumerate(rows):
+                for c, (_label, field, fmt) in enumerate(cols):
+                    value = row.get(field)
+                    t.setItem(r, c, QTableWidgetItem("" if value is None and fmt is str else fmt(value)))
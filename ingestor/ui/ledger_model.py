@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from ..services.ledger_partitions import connect_all
+from ..services.ledger import (
+    count_sessions, max_session_id, page_sessions, search_filter, sessions_after,
+)
+
+
+PAGE_SIZE = 500
+
+
+def _format_datetime(value: str) -> str:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%y %H:%M")
+    except Exception:
+        return value
+
+
+class LedgerTableModel(QAbstractTableModel):
+    """
+    Read-only, lazily loaded view over the ledger's sessions table.
+
+    Only PAGE_SIZE rows are fetched at a time (canFetchMore/fetchMore), so the
+    view stays responsive however long the ledger gets. Sorting and filtering
+    are done by SQLite on the stored types, not on display text.
+
+    The model remembers the highest row id it has seen; fetch_new() only asks
+    SQLite for rows after it, so tailing costs O(new sessions).
+    """
+
+    def __init__(self, ledger_path: Path, columns: List[str], labels: List[str], parent=None):
+        super().__init__(parent)
+        self.ledger_path = Path(ledger_path)
+        self.columns = columns
+        self.labels = labels
+        self.error = ""
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows: List[sqlite3.Row] = []
+        self._total = 0
+        self._order_by = "session_started_at"
+        self._descending = True
+        self._where = ""
+        self._params: tuple = ()
+        self._last_id = 0
+        self._known_total: Optional[int] = None
+
+        self.reload()
+
+    # ---------- data source ----------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect_all(self.ledger_path)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def set_filter(self, where: str, params: tuple = (), total: Optional[int] = None) -> None:
+        self._where = where
+        self._params = params
+        self._known_total = total
+        self.reload()
+
+    def set_search(self, text: str) -> None:
+        try:
+            f = search_filter(self._connection(), text)
+        except Exception as e:
+            self.error = f"Failed to read ledger: {e}"
+            return
+        self.set_filter(f.where, f.params, f.count)
+
+    def reload(self) -> None:
+        self.beginResetModel()
+        self._rows = []
+        try:
+            conn = self._connection()
+            self._last_id = max_session_id(conn)
+            if self._known_total is not None:
+                self._total, self._known_total = self._known_total, None
+            else:
+                self._total = count_sessions(conn, self._where, self._params)
+            self.error = ""
+        except Exception as e:
+            self._total = 0
+            self.error = f"Failed to read ledger: {e}"
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def total_rows(self) -> int:
+        return self._total
+
+    def _key(self, row) -> tuple:
+        return (row[self._order_by], row["id"])
+
+    def _insert_position(self, key: tuple) -> int:
+        """
+        Where a row with this sort key belongs among the loaded rows
+        (binary search; loaded rows are sorted by (order_by, id)).
+        """
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = self._key(self._rows[mid])
+            before = mid_key > key if self._descending else mid_key < key
+            if before:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def fetch_new(self) -> int:
+        """
+        Pulls in sessions added since the last read. Returns how many matched.
+        """
+        try:
+            conn = self._connection()
+            new_rows = sessions_after(conn, self._last_id, where=self._where, params=self._params)
+            self._last_id = max(self._last_id, max_session_id(conn))
+        except Exception as e:
+            self.error = f"Failed to read ledger: {e}"
+            return 0
+
+        for row in new_rows:
+            self._total += 1
+            pos = self._insert_position(self._key(row))
+            # Past the loaded window and more pages pending: keyset paging will pick it up
+            if pos == len(self._rows) and len(self._rows) < self._total - 1:
+                continue
+            self.beginInsertRows(QModelIndex(), pos, pos)
+            self._rows.insert(pos, row)
+            self.endInsertRows()
+        return len(new_rows)
+
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.labels):
+            return self.labels[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = self._rows[index.row()]
+        col = self.columns[index.column()]
+        value = row[col]
+        if col in ("session_started_at", "session_finished_at"):
+            return _format_datetime(str(value))
+        return "" if value is None else str(value)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last[self._order_by], last["id"])
+        try:
+            page = page_sessions(
+                self._connection(),
+                order_by=self._order_by,
+                descending=self._descending,
+                after=after,
+                limit=PAGE_SIZE,
+                where=self._where,
+                params=self._params,
+            )
+        except Exception as e:
+            self.error = f"Failed to read ledger: {e}"
+            self._total = len(self._rows)
+            return
+        if not page:
+            self._total = len(self._rows)
+            return
+
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.AscendingOrder) -> None:
+        if not 0 <= column < len(self.columns):
+            return
+        self._order_by = self.columns[column]
+        self._descending = order == Qt.DescendingOrder
+        self.reload()
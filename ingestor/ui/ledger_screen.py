@@ -1,36 +1,61 @@
 from __future__ import annotations
 
-import csv
 from pathlib import Path
-from typing import List, Dict
 from datetime import datetime
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QFileSystemWatcher, Qt, QTimer
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
-    QTableWidget, QTableWidgetItem, QDialog, QDialogButtonBox, QFormLayout, QMessageBox, QComboBox, QSpinBox
+    QTableView, QHeaderView, QDialog, QDialogButtonBox, QFormLayout, QMessageBox, QComboBox, QSpinBox,
+    QFileDialog
 )
 
 from ..ui.widgets import title_label, section_label, hline
-from ..services.ledger import append_session_row
+from ..services.ledger import append_session_row, export_csv
+from ..ui.ledger_model import LedgerTableModel
+from ..ui.ledger_analytics_dialog import LedgerAnalyticsDialog
+from ..ui.catalog_dialog import CatalogDialog
+from ..services.footage_catalog import CATALOG_NAME
 from ..models import JobConfig
 
 
 class LedgerScreen(QWidget):
     """
-    Simple ledger viewer for ingest_ledger.csv
-    - Loads CSV (if exists)
-    - Displays in a table
-    - Text search filters rows (client/project/drive/status/date)
+    Simple ledger viewer for ingest_ledger.db (SQLite)
+    - Virtualized table (rows load page by page from SQLite)
+    - Click a header to sort (by real dates / numbers)
+    - Text search (FTS index) filters rows; field:value scopes a word, e.g. client:Iriya status:FAILED
+    - Watches the db (and its -wal) and only pulls in sessions added since the last read
     """
+    # Friendly subset / order of the ledger columns
+    COLUMNS = [
+        "session_started_at",
+        # "session_finished_at",
+        # "status",
+        # "mode",
+        "client",
+        "project",
+        "num_cards",
+        "archive_drive",
+        "proxy_drive",
+        # "keep_originals_on_proxy",
+    ]
+    WIDTHS = {
+        "session_started_at": 140,
+        "client": 140,
+        "project": 300,
+        "num_cards": 80,
+        "archive_drive": 160,
+        "proxy_drive": 160,
+    }
+    TAIL_DEBOUNCE_MS = 300
+    SEARCH_DEBOUNCE_MS = 200
+
     def __init__(self, ledger_path: Path, on_back = None):
         super().__init__()
         self.ledger_path = Path(ledger_path)
         self.on_back = on_back
 
-        self._headers: List[str] = []
-        self._rows: List[Dict[str, str]] = []
-
         root = QVBoxLayout(self)
         root.setSpacing(10)
 
@@ -50,10 +75,17 @@ class LedgerScreen(QWidget):
         actions = QHBoxLayout()
         actions.addWidget(QLabel("Search"))
         self.search_edit = QLineEdit()
-        self.search_edit.setPlaceholderText("Type to filter (client, project, drives, status, dates...)")
-        self.search_edit.textChanged.connect(self.apply_filter)
+        self.search_edit.setPlaceholderText("Type to filter (e.g. iriya 2024  or  client:Iriya status:FAILED)")
+        self.search_edit.returnPressed.connect(self.apply_filter)
         actions.addWidget(self.search_edit, 1)
 
+        # Search once typing pauses, not on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.apply_filter)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+
         self.add_btn = QPushButton("Add")
         self.add_btn.clicked.connect(self.open_add_dialog)
         actions.addWidget(self.add_btn)
@@ -61,133 +93,115 @@ class LedgerScreen(QWidget):
         self.refresh_btn = QPushButton("Refresh")
         self.refresh_btn.clicked.connect(self.refresh)
         actions.addWidget(self.refresh_btn)
+
+        self.analytics_btn = QPushButton("Analytics")
+        self.analytics_btn.clicked.connect(self.open_analytics)
+        actions.addWidget(self.analytics_btn)
+
+        self.catalog_btn = QPushButton("Find Clip")
+        self.catalog_btn.clicked.connect(self.open_catalog)
+        actions.addWidget(self.catalog_btn)
+
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.clicked.connect(self.export_clicked)
+        actions.addWidget(self.export_btn)
         root.addLayout(actions)
 
         root.addWidget(hline())
 
-        root.addWidget(section_label("Sessions"))
-
-        self.table = QTableWidget(0, 0)
+        sessions_row = QHBoxLayout()
+        sessions_row.addWidget(section_label("Sessions"))
+        sessions_row.addStretch(1)
+        self.count_lbl = QLabel("")
+        self.count_lbl.setStyleSheet("color: #666;")
+        sessions_row.addWidget(self.count_lbl)
+        root.addLayout(sessions_row)
+
+        self.error_lbl = QLabel("")
+        self.error_lbl.setStyleSheet("color: #e06c75;")
+        self.error_lbl.setVisible(False)
+        root.addWidget(self.error_lbl)
+
+        # Rows are pulled from SQLite a page at a time as you scroll
+        self.model = LedgerTableModel(
+            self.ledger_path,
+            columns=self.COLUMNS,
+            labels=[self._pretty(h) for h in self.COLUMNS],
+            parent=self,
+        )
+
+        self.table = QTableView()
         # self.table.setAlternatingRowColors(True)
-        # self.table.setSelectionBehavior(self.table.selectRow)
-        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table.verticalHeader().setVisible(False)
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.DescendingOrder)  # newest first
         root.addWidget(self.table, 1)
 
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Fixed)  # manual widths only
+        header.setStretchLastSection(False)
+        for col, name in enumerate(self.COLUMNS):
+            self.table.setColumnWidth(col, self.WIDTHS.get(name, 140))  # default width if not specified
+
+        model = self.model
+        self.destroyed.connect(lambda *_: model.close())
+
+        # Ingests write from another thread / process; coalesce bursts of change events
+        self._tail_timer = QTimer(self)
+        self._tail_timer.setSingleShot(True)
+        self._tail_timer.setInterval(self.TAIL_DEBOUNCE_MS)
+        self._tail_timer.timeout.connect(self.tail)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_ledger_changed)
+        self._watch_ledger_files()
+
         # hint = QLabel("Tip: Click a column header to sort.")
         # hint.setStyleSheet("color: #666;")
         # root.addWidget(hint)
         #
         self.refresh()
 
-    def _format_datetime(self, value: str) -> str:
-        try:
-            dt = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-            return dt.strftime("%d/%m/%y %H:%M")
-        except Exception:
-            return value
-
     def refresh(self):
-        self._headers, self._rows = self._load_csv(self.ledger_path)
-        self._populate_table(self._headers, self._rows)
         self.apply_filter()
 
-    def apply_filter(self):
-        query = (self.search_edit.text() or "").strip().lower()
-        if not query:
-            self._populate_table(self._headers, self._rows)
-            return
-
-        filtered: List[Dict[str, str]] = []
-        for r in self._rows:
-            blob = "  ".join(str(v) for v in r.values()).lower()
-            if query in blob:
-                filtered.append(r)
-
-        self._populate_table(self._headers, filtered)
+    def _watch_ledger_files(self):
+        # -wal appears/disappears with connections and some tools replace files; (re)add what exists
+        wanted = [str(self.ledger_path), str(self.ledger_path) + "-wal"]
+        watched = set(self._watcher.files())
+        missing = [p for p in wanted if p not in watched and Path(p).exists()]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_ledger_changed(self, _path: str):
+        self._watch_ledger_files()
+        if self.isVisible():
+            self._tail_timer.start()
+
+    def tail(self):
+        """
+        Appends sessions written since the last read (no full reload).
+        """
+        self.model.fetch_new()
+        self._update_status()
+
+    def showEvent(self, event):
+        # Catch up on whatever was ingested while the window was hidden
+        super().showEvent(event)
+        self.tail()
 
-    @staticmethod
-    def _load_csv(path: Path):
-        if not path.exists():
-            return [], []
-
-        try:
-            with path.open("r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                headers = list(reader.fieldnames or [])
-                rows = [dict(row) for row in reader]
-                return headers, rows
-        except Exception as e:
-            # Show error in UI
-            return [], [{"error": f"Failed to read ledger: {e}"}]
-
-    def _populate_table(self, headers: List[str], rows: List[Dict[str, str]]):
-        self.table.setSortingEnabled(False)
-
-        if not headers and rows and "error" in rows[0]:
-            self.table.setColumnCount(1)
-            self.table.setHorizontalHeaderLabels(["Error"])
-            self.table.setRowCount(1)
-            self.table.setItem(0, 0, QTableWidgetItem(rows[0]["error"]))
-            self.table.resizeColumnsToContents()
-            self.table.setSortingEnabled(False)
-            return
-
-        # Choose a friendly subset / order if headers match the known ledger schema
-        preferred = [
-            "session_started_at",
-            # "session_finished_at",
-            # "status",
-            # "mode",
-            "client",
-            "project",
-            "num_cards",
-            "archive_drive",
-            "proxy_drive",
-            # "keep_originals_on_proxy",
-        ]
-        if headers:
-            ordered = [h for h in preferred if h in headers]
-            # ordered = [h for h in preferred if h in headers] + [h for h in headers if h not in preferred]
-        else:
-            ordered = preferred
-
-        self.table.setColumnCount(len(ordered))
-        self.table.setHorizontalHeaderLabels([self._pretty(h) for h in ordered])
-        self.table.setRowCount(len(rows))
-
-        for i, r in enumerate(rows):
-            for j, h in enumerate(ordered):
-                val = str(r.get(h, ""))
-                if h in ("session_started_at", "session_finished_at"):
-                    val = self._format_datetime(val)
-                item = QTableWidgetItem(val)
-                # Keep sorting as text; for dates this is fine given ISO-like strings
-                item.setData(Qt.DisplayRole, val)
-                self.table.setItem(i, j, item)
-
-        # self.table.resizeColumnsToContents()
-        from PySide6.QtWidgets import QHeaderView
-        # self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Fixed)  # manual widths only
-        header.setStretchLastSection(False)
-
-        widths = {
-            "session_started_at": 140,
-            "client": 140,
-            "project": 300,
-            "num_cards": 80,
-            "archive_drive": 160,
-            "proxy_drive": 160,
-        }
+    def apply_filter(self):
+        self._search_timer.stop()
+        self.model.set_search(self.search_edit.text())
+        self._update_status()
 
-        for col, name in enumerate(ordered):  # ordered = list of column keys in display order
-            self.table.setColumnWidth(col, widths.get(name, 140))  # default width if not specified
-
-        self.table.setSortingEnabled(True)
+    def _update_status(self):
+        self.error_lbl.setText(self.model.error)
+        self.error_lbl.setVisible(bool(self.model.error))
+        self.count_lbl.setText(f"{self.model.total_rows()} sessions")
 
     @staticmethod
     def _pretty(header: str) -> str:
@@ -205,6 +219,24 @@ class LedgerScreen(QWidget):
         #     self.back_btn.clicked.connect(self.on_back)
         #     header_row.addWidget(self.back_btn)
 
+    def open_analytics(self):
+        LedgerAnalyticsDialog(self.ledger_path, parent=self).exec()
+
+    def open_catalog(self):
+        # Station-local, next to the ledger
+        CatalogDialog(self.ledger_path.with_name(CATALOG_NAME), parent=self).exec()
+
+    def export_clicked(self):
+        default = str(self.ledger_path.with_name("ingest_ledger_export.csv"))
+        path, _ = QFileDialog.getSaveFileName(self, "Export Ledger", default, "CSV files (*.csv)")
+        if not path:
+            return
+        try:
+            n = export_csv(self.ledger_path, Path(path))
+            QMessageBox.information(self, "Export Ledger", f"Exported {n} rows to:\n{path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Ledger", f"Could not export ledger:\n{e}")
+
     def open_add_dialog(self):
         # You can adjust which fields you want to allow manual entry for:
         # We’ll keep it simple: date/time, client, project, archive, ssd, status, note
@@ -258,7 +290,7 @@ class LedgerScreen(QWidget):
                 append_session_row(self.ledger_path, started_at=job_date,
                                    finished_at=job_date, status='OK', job=job)
                 dlg.accept()
-                self.refresh()  # reload + reapply filter
+                self.tail()
             except Exception as e:
                 QMessageBox.critical(dlg, "Failed", f"Could not write to ledger:\n{e}")
 
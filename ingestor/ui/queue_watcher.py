@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QObject, Signal
+
+from ..services.ingest_queue import IngestQueue
+
+
+class QueueWatcher(QObject):
+    """
+    Qt side of the ingest queue: `job_changed` carries the IngestJob on every
+    state change, delivered on the GUI thread (queued across threads by Qt).
+    """
+    job_changed = Signal(object)
+
+    def __init__(self, queue: IngestQueue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        unsubscribe = self.queue.subscribe(self.job_changed.emit)
+        self.destroyed.connect(lambda *_: unsubscribe())
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from pathlib import Path
 
+from PySide6.QtCore import QStringListModel, Qt, QThread, QTimer
 from PySide6.QtGui import QColor
 
 from ..services.settings_store import load_settings, save_settings, AppSettings
@@ -9,25 +11,30 @@ from ..services.settings_store import load_settings, save_settings, AppSettings
 # from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QSpinBox, QCheckBox, QMessageBox, QComboBox, QRadioButton, QButtonGroup, QGraphicsDropShadowEffect
+    QSpinBox, QCheckBox, QMessageBox, QComboBox, QRadioButton, QButtonGroup, QGraphicsDropShadowEffect,
+    QCompleter
 )
 
 from ..models import JobConfig, ProjectSummary
 from ..ui.widgets import title_label, section_label, hline
-from ..services.drives_windows import list_windows_drives, drive_display
-# from ..services.drives_windows import list_removable_drives, drive_display
+from ..services.drive_service import PROBE_TIMEOUT_S
+from ..ui.drive_watcher import DriveWatcher
 
-from ..services.projects_list import load_recent_projects
+from ..services.project_search import ProjectIndex
+from ..services.projects_worker import ProjectsWorker
 
 
 class SetupScreen(QWidget):
     """
     Screen 1 (Project Setup) — UI skeleton + Existing Project UI.
 
-    Existing Project list is read from a local JSON registry file (UI-only for now).
+    Existing Project list comes from scanning the archive drives (cached by folder
+    mtimes) plus the local JSON registry file. Typing in it shows ranked fuzzy
+    matches (most recently ingested first).
     """
     # def __init__(self, on_start, projects_registry_path: Path, on_open_ledger):
-    def __init__(self, on_start, projects_registry_path: Path, on_open_ledger, settings_path: Path):
+    def __init__(self, on_start, projects_registry_path: Path, on_open_ledger, settings_path: Path,
+                 ledger_path: Path | None = None):
         super().__init__()
         self.on_start = on_start
         self._suppress_settings_save = True
@@ -36,7 +43,11 @@ class SetupScreen(QWidget):
 
         self.job = JobConfig()
         self._projects: list[ProjectSummary] = []
+        self._project_index = ProjectIndex([])
+        self._projects_thread: QThread | None = None  # archive scan + recency, in the background
+        self._projects_again = False
         self.settings_path = settings_path
+        self.ledger_path = ledger_path
 
         # self.setStyleSheet("""QWidget {background-color: rgba(17, 24, 39, 0.9); border-radius: 16px;}""")
         root = QVBoxLayout(self)
@@ -79,6 +90,16 @@ class SetupScreen(QWidget):
         self.existing_combo.setEditable(True)  # type-to-filter
         self.existing_combo.setInsertPolicy(QComboBox.NoInsert)
 
+        # Type-ahead: we rank the matches ourselves, the completer just shows them
+        self._completer_model = QStringListModel(self)
+        self._completer = QCompleter(self._completer_model, self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self._completer.setMaxVisibleItems(12)
+        self.existing_combo.setCompleter(self._completer)
+        self.existing_combo.lineEdit().textEdited.connect(self._on_project_typed)
+        self._completer.activated[str].connect(self._on_project_picked)
+
         self.refresh_projects_btn = QPushButton("Refresh Projects")
         self.refresh_projects_btn.clicked.connect(self.refresh_projects)
 
@@ -112,7 +133,7 @@ class SetupScreen(QWidget):
         root.addWidget(QLabel("MyBook"))
         self.archive_combo = QComboBox()
         self.archive_refresh_btn = QPushButton("רענן")
-        self.archive_refresh_btn.clicked.connect(self.refresh_drives)
+        self.archive_refresh_btn.clicked.connect(self.refresh_drives_clicked)
         self.archive_combo.currentIndexChanged.connect(self.on_archive_changed)
 
         row_a = QHBoxLayout()
@@ -124,7 +145,7 @@ class SetupScreen(QWidget):
         root.addWidget(QLabel("SSD"))
         self.proxy_combo = QComboBox()
         self.proxy_refresh_btn = QPushButton("רענן")
-        self.proxy_refresh_btn.clicked.connect(self.refresh_drives)
+        self.proxy_refresh_btn.clicked.connect(self.refresh_drives_clicked)
         self.proxy_combo.currentIndexChanged.connect(self.on_proxy_changed)
 
         row_p = QHBoxLayout()
@@ -157,7 +178,7 @@ class SetupScreen(QWidget):
         # root.addWidget(section_label("Safety Mode"))
         self.keep_originals_chk = QCheckBox("Keep a full copy of original footage on the Proxy SSD")
         self.keep_originals_chk.setChecked(True)
-        # root.addWidget(self.keep_originals_chk)
+        root.addWidget(self.keep_originals_chk)
         #
         # hint2 = QLabel("Recommended for urgent projects and quick fixes.")
         # hint2.setStyleSheet("color: #666;")
@@ -191,23 +212,19 @@ class SetupScreen(QWidget):
         self.keep_originals_chk.stateChanged.connect(self.validate)
 
         # Init
-        self.refresh_drives()
-
+        # Drives come from the background drive service: never waited for here. Until its
+        # first poll is in, the combos say "Scanning drives…" and `changed` fills them.
         self._settings = load_settings(self.settings_path)
-        # prevent save spam while restoring
-        self._suppress_settings_save = True
-        try:
-            if self._settings.last_archive_root:
-                idx = self.archive_combo.findData(self._settings.last_archive_root)
-                if idx != -1:
-                    self.archive_combo.setCurrentIndex(idx)
-
-            if self._settings.last_proxy_root:
-                idx = self.proxy_combo.findData(self._settings.last_proxy_root)
-                if idx != -1:
-                    self.proxy_combo.setCurrentIndex(idx)
-        finally:
-            self._suppress_settings_save = False
+        # Last session's drives get picked once they show up (unless the user picked others)
+        self._restore_archive = self._settings.last_archive_root
+        self._restore_proxy = self._settings.last_proxy_root
+        self._drive_watcher = DriveWatcher(parent=self)
+        self._drive_watcher.changed.connect(self._on_drives_changed)
+        self._drive_list: list[tuple[str, str]] = []
+        self._drives_scanning = True
+        self.refresh_drives()
+        # A station with nothing but skipped volumes never gets a `changed` - stop saying "Scanning"
+        QTimer.singleShot(int(PROBE_TIMEOUT_S * 1000) + 500, self._on_drive_scan_timeout)
 
         self.refresh_projects()
         self.on_mode_changed()
@@ -229,11 +246,20 @@ class SetupScreen(QWidget):
             if not archive_root and not proxy_root:
                 return
 
-            s = AppSettings(
+            # Keep the other settings (e.g. proxy cache size, auto-start) as they are now -
+            # the ingest screen may have changed them since we loaded (cached read, no re-parse)
+            current = load_settings(self.settings_path)
+            archive_roots = current.archive_roots
+            if archive_root and archive_root not in archive_roots:
+                archive_roots = [*archive_roots, archive_root]
+            s = replace(
+                current,
                 last_archive_root=archive_root,
                 last_proxy_root=proxy_root,
+                archive_roots=archive_roots,
             )
             save_settings(self.settings_path, s)
+            self._settings = s
         except Exception:
             pass
 
@@ -266,19 +292,70 @@ class SetupScreen(QWidget):
 
     # ---------- Projects list (UI only) ----------
     def refresh_projects(self):
-        self._projects = load_recent_projects(self.projects_registry_path)
-
+        # Archive drives used before + whatever is plugged in now (drives without the base folder cost one stat).
+        # Drives the drive service saw time out are skipped - their projects stay known from the scan cache.
+        if self._projects_thread is not None:
+            self._projects_again = True
+            return
+        settings = getattr(self, "_settings", None)
+        roots = list(settings.archive_roots) if settings else []
+        roots += [d.root for d in self._drive_watcher.drives()]
+        stalled = {d.root for d in self._drive_watcher.drives() if not d.responsive}
+        roots = [r for r in roots if r not in stalled]
+
+        self.refresh_projects_btn.setEnabled(False)
+        self._projects_thread = QThread(self)
+        self._projects_worker = ProjectsWorker(self.projects_registry_path, roots, self.ledger_path)
+        self._projects_worker.moveToThread(self._projects_thread)
+        self._projects_thread.started.connect(self._projects_worker.run)
+        self._projects_worker.finished.connect(self._on_projects_loaded)
+        self._projects_worker.finished.connect(self._projects_thread.quit)
+        self._projects_thread.finished.connect(self._projects_thread.deleteLater)
+        self._projects_thread.finished.connect(self._on_projects_thread_done)
+        self._projects_thread.start()
+
+    def _on_projects_thread_done(self):
+        self._projects_thread = None
+        self.refresh_projects_btn.setEnabled(True)
+        if self._projects_again:
+            self._projects_again = False
+            self.refresh_projects()
+
+    def _on_projects_loaded(self, projects: list, recency: dict):
+        self._project_index = ProjectIndex(projects, recency)
+        self._projects = self._project_index.by_recency
+
+        # The list may land after a project was already picked - keep it
+        selected = self.existing_combo.currentData()
         self.existing_combo.blockSignals(True)
         self.existing_combo.clear()
         self.existing_combo.addItem("Select a project...", None)
 
         for p in self._projects:
-            label = f"{p.client} — {p.project}"
-            self.existing_combo.addItem(label, p)
+            self.existing_combo.addItem(self._project_label(p), p)
+        if isinstance(selected, ProjectSummary):
+            idx = self.existing_combo.findText(self._project_label(selected))
+            if idx != -1:
+                self.existing_combo.setCurrentIndex(idx)
 
         self.existing_combo.blockSignals(False)
         self.validate()
 
+    @staticmethod
+    def _project_label(p: ProjectSummary) -> str:
+        return f"{p.client} — {p.project}"
+
+    def _on_project_typed(self, text: str):
+        matches = self._project_index.search(text, limit=20)
+        self._completer_model.setStringList([self._project_label(p) for p in matches])
+        if matches:
+            self._completer.complete()
+
+    def _on_project_picked(self, label: str):
+        idx = self.existing_combo.findText(label)
+        if idx != -1:
+            self.existing_combo.setCurrentIndex(idx)
+
     def on_existing_selected(self):
         if not self.rb_existing.isChecked():
             return
@@ -292,19 +369,20 @@ class SetupScreen(QWidget):
 
     # ---------- Drives ----------
     def refresh_drives(self):
-        prev_archive = self.job.archive_path
-        prev_proxy = self.job.proxy_path
+        prev_archive = self.job.archive_path or self._restore_archive
+        prev_proxy = self.job.proxy_path or self._restore_proxy
 
-        drives = list_windows_drives() or []
-        # drives = list_removable_drives() or []
+        self._drives_scanning = self._drives_scanning and not self._drive_watcher.service.wait_ready(0)
+        self._drive_list = [(d.root, d.display) for d in self._drive_watcher.drives()]
+        placeholder = "Scanning drives…" if self._drives_scanning else "Select a drive..."
 
         def fill_combo(combo, prev_value):
             combo.blockSignals(True)
             combo.clear()
-            combo.addItem("Select a drive...", "")
+            combo.addItem(placeholder, "")
 
-            for root, label in drives:
-                combo.addItem(drive_display(root, label), root)
+            for root, display in self._drive_list:
+                combo.addItem(display, root)
 
             if prev_value:
                 idx = combo.findData(prev_value)
@@ -316,14 +394,39 @@ class SetupScreen(QWidget):
         fill_combo(self.archive_combo, prev_archive)
         fill_combo(self.proxy_combo, prev_proxy)
 
-        # Update display strings after combos are populated
-        self.on_archive_changed()
-        self.on_proxy_changed()
+        # Update display strings after combos are populated - a refill isn't a choice, so nothing is saved
+        suppress, self._suppress_settings_save = self._suppress_settings_save, True
+        try:
+            self.on_archive_changed()
+            self.on_proxy_changed()
+        finally:
+            self._suppress_settings_save = suppress
         self.validate()
 
+    def refresh_drives_clicked(self):
+        self._drive_watcher.refresh()
+        self.refresh_drives()
+
+    def _on_drives_changed(self, drives: list):
+        # Free space changes all the time; only rebuild the combos when drives come / go / rename
+        if self._drives_scanning:
+            self.refresh_drives()
+            if not self._drives_scanning:
+                self.refresh_projects()  # now with the mounted drives too
+        elif [(d.root, d.display) for d in drives] != self._drive_list:
+            self.refresh_drives()
+
+    def _on_drive_scan_timeout(self):
+        if self._drives_scanning:
+            self._drives_scanning = False
+            self.refresh_drives()
+            self.refresh_projects()
+
     def on_archive_changed(self):
         root = self.archive_combo.currentData()
         self.job.archive_path = root if isinstance(root, str) else ""
+        if not self._suppress_settings_save:
+            self._restore_archive = ""  # picked by hand
         self.job.archive_drive_display = self.archive_combo.currentText() if self.job.archive_path else ""
         self._save_settings()
         self.validate()
@@ -331,6 +434,8 @@ class SetupScreen(QWidget):
     def on_proxy_changed(self):
         root = self.proxy_combo.currentData()
         self.job.proxy_path = root if isinstance(root, str) else ""
+        if not self._suppress_settings_save:
+            self._restore_proxy = ""  # picked by hand
         self.job.proxy_drive_display = self.proxy_combo.currentText() if self.job.proxy_path else ""
         self._save_settings()
         self.validate()